@@ -0,0 +1,208 @@
+"""Offline benchmark of the tdc.js pipeline over the recorded corpus in ``tests/corpus``.
+
+Stages are timed separately: ``parse`` (JS parse), ``opmap`` (:func:`parse_opcode_mapping`),
+``opcodes`` (:func:`parse_opcodes`), ``execute`` (building the stack from the opmap and opcodes
+above, and the top-level vm), ``getInfo`` and ``getData``.
+
+.. code-block:: sh
+
+    python benchmarks/bench.py --out bench.json
+    python benchmarks/bench.py --baseline benchmarks/baseline.json --threshold 0.25
+
+With ``--baseline``, the exit code is 1 if the p50 of any stage regressed by more than
+``threshold``. Regenerate the baseline after a change of what a stage covers, on the machine
+that compares against it:
+
+.. code-block:: sh
+
+    python benchmarks/bench.py --out benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from statistics import mean
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+import pyjsparser as jsparser
+
+from chaosvm.parse import parse_opcode_mapping, parse_opcodes, split_vm
+from chaosvm.proxy.dom import Window
+from chaosvm.stack import ChaosStack
+from chaosvm.vm import ChaosVM
+
+CORPUS = Path(__file__).parent.parent / "tests" / "corpus"
+STAGES = ("parse", "opmap", "opcodes", "execute", "getInfo", "getData")
+VM_STAGES = ("execute", "getInfo", "getData")
+MOUSE_TRACK = [(50, 42), (50, 55)]
+MIN_DELTA = 1e-4
+"""p50 changes below this (in seconds) are considered noise"""
+
+Stats = Dict[str, float]
+
+
+class CountingVM(ChaosVM):
+    """A :class:`ChaosVM` counting executed instructions. Nested frames inherit the class."""
+
+    executed = 0
+
+    def __init__(self, *args, **kwds) -> None:
+        super().__init__(*args, **kwds)
+        self.ops = [self._counted(op) for op in self.ops]
+
+    @staticmethod
+    def _counted(op: Callable):
+        def counted():
+            CountingVM.executed += 1
+            return op()
+
+        return counted
+
+
+def summary(samples: List[float]) -> Stats:
+    s = sorted(samples)
+    rank = lambda q: s[min(len(s) - 1, int(q * len(s)))]  # noqa: E731
+    return dict(mean=mean(s), p50=rank(0.5), p99=rank(0.99), min=s[0], n=len(s))
+
+
+def new_window() -> Window:
+    win = Window(top=True)
+    win.add_mouse_track(MOUSE_TRACK)
+    return win
+
+
+def run_once(js: str, vm=ChaosVM) -> Dict[str, Callable[[], object]]:
+    """Build the stage callables for one pass. Each one depends on the previous ones."""
+    st: dict = {}
+
+    def parse():
+        st["ast"] = jsparser.parse(js)
+        st["parts"] = split_vm(st["ast"])
+
+    def opmap():
+        st["opmap"] = parse_opcode_mapping(st["parts"].vm_declare)
+
+    def opcodes():
+        st["opcodes"] = parse_opcodes(st["parts"].payload, st["parts"].opdata.copy())
+
+    def execute():
+        # as load_vm does, but on the opmap and opcodes of the stages above
+        st["win"] = win = new_window()
+        parts = st["parts"]
+        win[parts.new_date] = win.Date
+        win[parts.date_attr] = lambda attr, args: getattr(win.Date, attr)(*args)
+        win[parts.win_attr] = parts.win_value
+        stack = win["__TENCENT_CHAOS_STACK"] = ChaosStack(st["opmap"], st["opcodes"], pc=parts.pc)
+        return stack(win, vm)
+
+    def getInfo():
+        return st["win"].TDC.getInfo(None)
+
+    def getData():
+        return st["win"].TDC.getData(None, True)
+
+    return dict(
+        parse=parse,
+        opmap=opmap,
+        opcodes=opcodes,
+        execute=execute,
+        getInfo=getInfo,
+        getData=getData,
+    )
+
+
+def bench_script(js: str, repeat: int) -> Dict[str, Stats]:
+    samples: Dict[str, List[float]] = {k: [] for k in STAGES}
+    for _ in range(repeat):
+        for name, stage in run_once(js).items():
+            t = perf_counter()
+            stage()
+            samples[name].append(perf_counter() - t)
+    result = {k: summary(v) for k, v in samples.items()}
+
+    for name, stage in run_once(js, CountingVM).items():
+        CountingVM.executed = 0
+        tracemalloc.start()
+        stage()
+        result[name]["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+        if name in VM_STAGES:
+            result[name]["instructions"] = CountingVM.executed
+            result[name]["ips"] = CountingVM.executed / result[name]["mean"]
+    return result
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Return a message for each stage whose p50 is slower than baseline by `threshold`."""
+    regressions = []
+    for script, stages in current["results"].items():
+        for stage, stat in stages.items():
+            try:
+                base = baseline["results"][script][stage]["p50"]
+            except KeyError:
+                continue
+            ratio = stat["p50"] / base
+            if ratio > 1 + threshold and stat["p50"] - base > MIN_DELTA:
+                regressions.append(
+                    f"{script}.{stage}: p50 {stat['p50'] * 1e3:.2f}ms vs "
+                    f"{base * 1e3:.2f}ms baseline (+{(ratio - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def report(results: dict, file=sys.stdout):
+    print(
+        f"{'script':<10}{'stage':<10}{'mean':>10}{'p50':>10}{'p99':>10}{'ips':>12}{'peak':>10}",
+        file=file,
+    )
+    for script, stages in results["results"].items():
+        for stage, s in stages.items():
+            ips = f"{s['ips']:.0f}" if "ips" in s else "-"
+            print(
+                f"{script:<10}{stage:<10}{s['mean'] * 1e3:>8.2f}ms{s['p50'] * 1e3:>8.2f}ms"
+                f"{s['p99'] * 1e3:>8.2f}ms{ips:>12}{s['peak_kib']:>7.0f}KiB",
+                file=file,
+            )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    parser.add_argument("-o", "--out", type=Path, help="write results as json")
+    parser.add_argument("--baseline", type=Path, help="baseline json to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = dict(
+        meta=dict(
+            python=platform.python_version(),
+            implementation=platform.python_implementation(),
+            machine=platform.machine(),
+            repeat=args.repeat,
+        ),
+        results={
+            p.stem: bench_script(p.read_text(encoding="utf8"), args.repeat)
+            for p in sorted(args.corpus.glob("*.js"))
+        },
+    )
+    report(results)
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for msg in regressions:
+            print("REGRESSION", msg)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""End-to-end load test: fetch, parse, execute and ``getData`` against a local stand-in for the
+captcha endpoint, which serves the recorded scripts in ``tests/corpus``.
+
+The server answers ``GET /tdc.js`` with one of the scripts, gzipped if the client accepts it,
+and moves to the next script every ``--rotate`` seconds, as the endpoint rotates versions.
+``--clients`` simulated clients each fetch a script and run a session to its payload, until
+``--requests`` are done, in threads, processes or asyncio tasks.
+
+.. code-block:: sh
+
+    python benchmarks/load.py --clients 8 --requests 200 --mode process --rotate 2
+
+Reported are requests/s, latency percentiles, cpu time per request, and RSS growth of this
+process (and the peak RSS of workers, in process mode).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from time import perf_counter, thread_time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.request import Request, urlopen
+
+from chaosvm.session import Session
+
+CORPUS = Path(__file__).parent.parent / "tests" / "corpus"
+MODES = ("thread", "process", "asyncio")
+MOUSE_TRACK = [(50, 42), (50, 55)]
+PERCENTILES = (50, 90, 99)
+
+
+class Sample(NamedTuple):
+    latency: float
+    """seconds from the request to the payload"""
+    cpu: float
+    """cpu seconds of the client, fetch included"""
+    version: str
+
+
+class ScriptServer(ThreadingHTTPServer):
+    """Serve `scripts` at ``/tdc.js``, the next one every `rotate` seconds; never if 0."""
+
+    daemon_threads = True
+
+    def __init__(self, scripts: List[Tuple[str, bytes]], rotate: float, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), ScriptHandler)
+        self.scripts = [(name, body, gzip.compress(body)) for name, body in scripts]
+        self.rotate = rotate
+        self.started = perf_counter()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/tdc.js"
+
+    def current(self) -> Tuple[str, bytes, bytes]:
+        if not self.rotate:
+            return self.scripts[0]
+        i = int((perf_counter() - self.started) / self.rotate)
+        return self.scripts[i % len(self.scripts)]
+
+    def start(self) -> Thread:
+        t = Thread(target=self.serve_forever, name="tdc.js server", daemon=True)
+        t.start()
+        return t
+
+
+class ScriptHandler(BaseHTTPRequestHandler):
+    server: ScriptServer
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/tdc.js":
+            self.send_error(404)
+            return
+        name, body, gz = self.server.current()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/javascript")
+        self.send_header("X-Version", name)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gz
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_session(js_vm: str, seq: int) -> bytes:
+    return Session(js_vm, "1.2.3.4", mouse_track=MOUSE_TRACK, seed=seq).result().payload
+
+
+def client(url: str, seq: int) -> Sample:
+    """One simulated client: fetch the script and run a session to its payload."""
+    t, c = perf_counter(), thread_time()
+    with urlopen(Request(url, headers={"Accept-Encoding": "gzip"})) as r:
+        body = r.read()
+        if r.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        version = r.headers.get("X-Version", "")
+    run_session(body.decode("utf8"), seq)
+    return Sample(perf_counter() - t, thread_time() - c, version)
+
+
+async def aclient(url: str, seq: int, pool: Executor) -> Sample:
+    """:func:`client` with the fetch on the event loop, and the session in `pool`."""
+    t = perf_counter()
+    host, _, rest = url[len("http://") :].partition("/")
+    hostname, _, port = host.partition(":")
+    reader, writer = await asyncio.open_connection(hostname, int(port))
+    writer.write(
+        f"GET /{rest} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n"
+        "Connection: close\r\n\r\n".encode()
+    )
+    head, _, body = (await reader.read(-1)).partition(b"\r\n\r\n")
+    writer.close()
+    headers = dict(
+        line.split(": ", 1) for line in head.decode("latin1").split("\r\n")[1:] if ": " in line
+    )
+    if headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+
+    def work() -> float:
+        c = thread_time()
+        run_session(body.decode("utf8"), seq)
+        return thread_time() - c
+
+    cpu = await asyncio.get_running_loop().run_in_executor(pool, work)
+    return Sample(perf_counter() - t, cpu, headers.get("X-Version", ""))
+
+
+def rss() -> int:
+    """Resident set size of this process in bytes; the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            from os import sysconf
+
+            return int(f.read().split()[1]) * sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def children_peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+
+
+def drive(url: str, clients: int, requests: int, mode: str) -> List[Sample]:
+    if mode == "asyncio":
+
+        async def main():
+            sem = asyncio.Semaphore(clients)
+
+            async def one(seq: int):
+                async with sem:
+                    return await aclient(url, seq, pool)
+
+            return await asyncio.gather(*(one(i) for i in range(requests)))
+
+        with ThreadPoolExecutor(clients, thread_name_prefix="chaosvm") as pool:
+            return list(asyncio.run(main()))
+
+    pool_cls = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+    with pool_cls(clients) as ex:
+        # start every worker before the clock, as a deployed service would be
+        list(ex.map(int, range(clients)))
+        return list(ex.map(client, [url] * requests, range(requests)))
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def report(samples: List[Sample], elapsed: float, rss_growth: int, mode: str) -> Dict:
+    latency = sorted(s.latency for s in samples)
+    versions: Dict[str, int] = {}
+    for s in samples:
+        versions[s.version] = versions.get(s.version, 0) + 1
+    r = {
+        "requests": len(samples),
+        "requests_per_s": len(samples) / elapsed,
+        "latency_ms": {f"p{p}": percentile(latency, p) * 1000 for p in PERCENTILES},
+        "cpu_ms_per_request": sum(s.cpu for s in samples) / len(samples) * 1000,
+        "rss_growth_mb": rss_growth / 2**20,
+        "versions": versions,
+    }
+    if mode == "process" and (peak := children_peak_rss()) is not None:
+        r["worker_peak_rss_mb"] = peak / 2**20
+    return r
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="end-to-end load test against a local tdc.js server")
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("-c", "--clients", type=int, default=4)
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    parser.add_argument("--mode", default="thread", choices=MODES)
+    parser.add_argument("--rotate", type=float, default=5, help="seconds per version, 0: never")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("-o", "--out", type=Path, help="write the report as json")
+    args = parser.parse_args()
+
+    scripts = [(p.stem, p.read_bytes()) for p in sorted(args.corpus.glob("*.js"))]
+    server = ScriptServer(scripts, args.rotate, args.port)
+    server.start()
+    try:
+        rss0 = rss()
+        t = perf_counter()
+        samples = drive(server.url, args.clients, args.requests, args.mode)
+        r = report(samples, perf_counter() - t, rss() - rss0, args.mode)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(
+        f"{args.mode}, {args.clients} clients: {r['requests']} requests, "
+        f"{r['requests_per_s']:.2f}/s, cpu {r['cpu_ms_per_request']:.1f} ms/request"
+    )
+    print("latency " + "  ".join(f"{k} {v:.1f} ms" for k, v in r["latency_ms"].items()))
+    print(f"rss growth {r['rss_growth_mb']:.1f} MB, versions {r['versions']}")
+    if "worker_peak_rss_mb" in r:
+        print(f"worker peak rss {r['worker_peak_rss_mb']:.1f} MB")
+    if args.out:
+        args.out.write_text(json.dumps(r, indent=2))
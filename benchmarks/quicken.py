@@ -0,0 +1,117 @@
+"""Benchmark of quickened arithmetic sites, see :mod:`chaosvm.quicken`, over the recorded corpus
+in ``tests/corpus``.
+
+Each script runs ``execute``, ``getInfo`` and ``getData`` with and without quickening. Reported
+are the p50 of both, the sites specialized and deoptimized, and the functions with the most
+executed bitwise and arithmetic instructions, i.e. the hash and encoding loops of tdc.js, with
+the share of those instructions that ran a specialized handler.
+
+.. code-block:: sh
+
+    python benchmarks/quicken.py -n 20 --top 5
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+import pyjsparser as jsparser
+
+from chaosvm.parse import VmParts, load_vm, split_vm
+from chaosvm.proxy.dom import Window
+from chaosvm.quicken import SPECIALIZATIONS
+from chaosvm.stack import ChaosStack
+from chaosvm.vm import QUICK_OPS, ChaosVM
+
+CORPUS = Path(__file__).parent.parent / "tests" / "corpus"
+MOUSE_TRACK = [(50, 42), (50, 55)]
+SPECIALIZED = frozenset(QUICK_OPS[2:])
+
+
+class ProfilingVM(ChaosVM):
+    """Count executed arithmetic instructions by function entry. Nested frames inherit it."""
+
+    hot: Dict[int, Counter] = {}
+
+    def __init__(self, pc: int, *args, **kwds) -> None:
+        super().__init__(pc, *args, **kwds)
+        counter = ProfilingVM.hot.setdefault(pc, Counter())
+        self.ops = [self._counted(counter, op) for op in self.ops]
+
+    @staticmethod
+    def _counted(counter: Counter, op):
+        name = op.__name__
+        if name in SPECIALIZED:
+            kind = "specialized"
+        elif name in SPECIALIZATIONS or name == "adaptive":
+            kind = "generic"
+        else:
+            return op
+
+        def counted():
+            counter[kind] += 1
+            return op()
+
+        return counted
+
+
+def session(parts: VmParts, quicken: bool, vm=ChaosVM) -> ChaosStack:
+    win = Window(top=True)
+    win.add_mouse_track(MOUSE_TRACK)
+    stack = load_vm(parts, win)
+    if not quicken:
+        stack.quick = None
+    stack(win, vm)
+    win.TDC.getInfo(None)
+    win.TDC.getData(None, True)
+    return stack
+
+
+def timeit(parts: VmParts, quicken: bool, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t = perf_counter()
+        session(parts, quicken)
+        samples.append(perf_counter() - t)
+    return median(samples)
+
+
+def hot_functions(parts: VmParts, top: int) -> List[Tuple[int, int, float]]:
+    """:return: entry, arithmetic instructions and specialized share of the `top` functions."""
+    ProfilingVM.hot = {}
+    session(parts, True, ProfilingVM)
+    rows = []
+    for entry, c in ProfilingVM.hot.items():
+        if n := c["specialized"] + c["generic"]:
+            rows.append((entry, n, c["specialized"] / n))
+    return sorted(rows, key=lambda r: -r[1])[:top]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = ArgumentParser(description="benchmark quickened arithmetic sites")
+    parser.add_argument("--corpus", type=Path, default=CORPUS)
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    parser.add_argument("--top", type=int, default=3, help="hot functions to show per script")
+    args = parser.parse_args(argv)
+
+    for p in sorted(args.corpus.glob("*.js")):
+        parts = split_vm(jsparser.parse(p.read_text(encoding="utf8")))
+        quick = session(parts, True).quick
+        assert quick is not None
+        on, off = timeit(parts, True, args.repeat), timeit(parts, False, args.repeat)
+        print(
+            f"{p.stem:<10}quickened {on * 1e3:7.2f}ms  generic {off * 1e3:7.2f}ms  "
+            f"speedup {off / on:5.2f}x  sites {quick.specialized} specialized, "
+            f"{quick.deoptimized} deoptimized"
+        )
+        for entry, n, share in hot_functions(parts, args.top):
+            print(f"{'':<10}function @{entry:<6} {n:>7} arithmetic  {share:6.1%} specialized")
+
+
+if __name__ == "__main__":
+    main()
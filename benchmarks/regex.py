@@ -0,0 +1,79 @@
+"""Benchmark of regex-heavy collectors, with and without the compiled-pattern cache.
+
+A collector sniffs the browser and versions out of the user agent with ``RegExp`` and
+``String.match``/``replace``/``split``, as tdc.js does. ``cold`` clears the cache of
+:func:`chaosvm.proxy.regexp.compile` and the one of :mod:`re` before each round, ``warm`` keeps
+them.
+
+.. code-block:: sh
+
+    python benchmarks/regex.py --rounds 200
+"""
+
+from __future__ import annotations
+
+import re
+from argparse import ArgumentParser
+from statistics import median
+from time import perf_counter
+from typing import Callable, List
+
+from chaosvm.proxy import regexp
+from chaosvm.proxy.builtins import RegExp, String
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.6099.110 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+    "Version/17.1 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Linux; Android 13; Pixel 7) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/119.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Mobile/15E148 MicroMessenger/8.0.44(0x18002c2d) NetType/WIFI",
+]
+BROWSERS = ["MicroMessenger", "Edg", "Chrome", "Firefox", "Version", "MSIE", "Trident"]
+
+
+def collect(ua: str):
+    s = String(ua)
+    for name in BROWSERS:
+        m = s.match(RegExp(name + r"/(\d+(?:\.\d+)*)", "i"))
+        if m:
+            break
+    mobile = RegExp(r"\b(?:Mobile|Android|iPhone)\b").test(ua)
+    os = s.match(RegExp(r"\(([^;)]+)"))
+    words = String(s.replace(RegExp(r"[()]", "g"), " ")).split(RegExp(r"\s+"))
+    versions = s.match(RegExp(r"\d+(?:[._]\d+)+", "g"))
+    return m, mobile, os, words, versions
+
+
+def clear():
+    regexp.compile.cache_clear()
+    re.purge()
+
+
+def bench(rounds: int, before: Callable[[], object]) -> List[float]:
+    times = []
+    for _ in range(rounds):
+        before()
+        t = perf_counter()
+        for ua in USER_AGENTS:
+            collect(ua)
+        times.append(perf_counter() - t)
+    return times
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="benchmark regex-heavy collectors")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    results = dict(warm=[], cold=[])
+    # alternate so that both see the same machine noise
+    for _ in range(5):
+        results["cold"] += bench(args.rounds // 5, clear)
+        results["warm"] += bench(args.rounds // 5, lambda: None)
+    for name, times in results.items():
+        print(f"{name:<5} p50 {median(times) * 1e3:8.3f} ms  min {min(times) * 1e3:8.3f} ms")
+    print(f"speedup {median(results['cold']) / median(results['warm']):.2f}x")
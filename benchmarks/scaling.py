@@ -0,0 +1,64 @@
+"""Benchmark of session throughput against the number of workers of a
+:class:`~chaosvm.executor.SessionExecutor`, over the recorded corpus in ``tests/corpus``.
+
+Workers go in powers of two up to the cpu count. ``threads`` only scale on a free-threaded
+build, and ``interpreters`` needs Python 3.14+.
+
+.. code-block:: sh
+
+    python benchmarks/scaling.py --sessions 64 --backend threads
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from os import cpu_count
+from pathlib import Path
+from time import perf_counter
+from typing import List
+
+from chaosvm.executor import SessionExecutor, gil_enabled, has_interpreters
+
+CORPUS = Path(__file__).parent.parent / "tests" / "corpus"
+MOUSE_TRACK = [(50, 42), (50, 55)]
+
+
+def throughput(scripts: List[str], sessions: int, workers: int, backend: str) -> float:
+    """:return: sessions per second."""
+    with SessionExecutor(workers, backend) as ex:
+        # warm up every worker, e.g. imports of a subinterpreter
+        for f in [ex.submit(scripts[0], "1.2.3.4", dom="light") for _ in range(workers)]:
+            f.result()
+        t = perf_counter()
+        futures = [
+            ex.submit(scripts[i % len(scripts)], "1.2.3.4", seed=i, mouse_track=MOUSE_TRACK)
+            for i in range(sessions)
+        ]
+        for f in futures:
+            f.result()
+        return sessions / (perf_counter() - t)
+
+
+def worker_counts(limit: int) -> List[int]:
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="benchmark session throughput scaling")
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--backend", default="auto", choices=("auto", "interpreters", "threads"))
+    parser.add_argument("--max-workers", type=int, default=cpu_count() or 1)
+    args = parser.parse_args()
+
+    scripts = [p.read_text(encoding="utf8") for p in sorted(CORPUS.glob("*.js"))]
+    print(f"gil enabled: {gil_enabled()}, subinterpreters: {has_interpreters()}")
+    base = None
+    for n in worker_counts(args.max_workers):
+        rate = throughput(scripts, args.sessions, n, args.backend)
+        base = base or rate
+        print(f"{n:>3} workers  {rate:8.2f} sessions/s  speedup {rate / base:5.2f}x")
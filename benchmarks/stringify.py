@@ -0,0 +1,69 @@
+"""Benchmark of ``JSON.stringify`` against the ``json.dumps`` encoder it replaced.
+
+The payload looks like what a collector stringifies in ``getData``: a few hundred fields of
+strings and numbers, and a mouse track as an array of arrays.
+
+.. code-block:: sh
+
+    python benchmarks/stringify.py --rounds 200
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from json import JSONEncoder, dumps
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable, List
+
+from chaosvm.proxy.builtins import NULL, Array, Object, Proxy, String
+from chaosvm.proxy.serialize import stringify
+
+
+class LegacyEncoder(JSONEncoder):
+    """The encoder of ``JSON.stringify`` before :mod:`chaosvm.proxy.serialize`."""
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, String):
+            return o._s
+        if isinstance(o, Array):
+            return [o[i] for i in range(o.length)]
+        if isinstance(o, Proxy):
+            return o.__dict__
+        if o is NULL.s:
+            return None
+        return super().default(o)
+
+
+def payload(points: int = 200, fields: int = 200) -> Object:
+    o = Object()
+    for i in range(fields):
+        o[f"f{i}"] = String(f"value {i}") if i % 3 else i * 1.5
+    o.track = Array(*(Array(i, i * 2, i * 16) for i in range(points)))
+    o.env = Object(ua=String("Mozilla/5.0"), screen=Array(1920, 1080), touch=NULL())
+    return o
+
+
+def bench(rounds: int, f: Callable[[], object]) -> List[float]:
+    times = []
+    for _ in range(rounds):
+        t = perf_counter()
+        f()
+        times.append(perf_counter() - t)
+    return times
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="benchmark JSON.stringify")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    o = payload()
+    results = dict(legacy=[], stringify=[])
+    # alternate so that both see the same machine noise
+    for _ in range(5):
+        results["legacy"] += bench(args.rounds // 5, lambda: dumps(o, cls=LegacyEncoder))
+        results["stringify"] += bench(args.rounds // 5, lambda: stringify(o))
+    for name, times in results.items():
+        print(f"{name:<9} p50 {median(times) * 1e3:8.3f} ms  min {min(times) * 1e3:8.3f} ms")
+    print(f"speedup {median(results['legacy']) / median(results['stringify']):.2f}x")
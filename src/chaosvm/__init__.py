@@ -1,7 +1,42 @@
-from typing import List, Optional, Tuple
+from __future__ import annotations
 
-from chaosvm.parse import parse_vm
-from chaosvm.proxy.dom import Window
+from importlib import import_module
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from chaosvm.cache import CachedTDC, ResultCache
+    from chaosvm.clock import VirtualClock
+    from chaosvm.executor import SessionExecutor
+    from chaosvm.fetch import ScriptFetcher
+    from chaosvm.image import ImageCache, ImageStore
+    from chaosvm.parse import parse_vm
+    from chaosvm.proxy.dom import Window
+    from chaosvm.registry import OpmapRegistry
+    from chaosvm.replay import TapeStore
+    from chaosvm.session import Session
+    from chaosvm.track import Track
+
+_LAZY = dict(
+    CachedTDC="chaosvm.cache",
+    ResultCache="chaosvm.cache",
+    VirtualClock="chaosvm.clock",
+    ImageCache="chaosvm.image",
+    ImageStore="chaosvm.image",
+    OpmapRegistry="chaosvm.registry",
+    parse_vm="chaosvm.parse",
+    ScriptFetcher="chaosvm.fetch",
+    Session="chaosvm.session",
+    SessionExecutor="chaosvm.executor",
+    TapeStore="chaosvm.replay",
+    Window="chaosvm.proxy.dom",
+)
+"""public names and their modules, imported on first access"""
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def prepare(
@@ -10,7 +45,14 @@ def prepare(
     ua="",
     href="",
     referer="",
-    mouse_track: Optional[List[Tuple[int, int]]] = None,
+    mouse_track: Optional[Track] = None,
+    *,
+    seed: Optional[int] = None,
+    clock: Optional[VirtualClock] = None,
+    cache: Optional[ResultCache] = None,
+    dom: Optional[str] = None,
+    registry: Optional[OpmapRegistry] = None,
+    images: Optional[ImageCache] = None,
 ):
     """Create a window and get its :class:`TDC` object.
 
@@ -18,21 +60,34 @@ def prepare(
     :param ip: fake ipv4 address, default as an internal fake ip.
     :param ua: fake user agent, default as an internal windows UA.
     :param referer: fake referer, default as an internal referer.
-    :param mouse_track: __Deprecated__ . Used in slide captcha.
+    :param mouse_track: Used in slide captcha. A list, iterator or array of ``(x, y)`` or
+        ``(x, y, t)`` points, see :mod:`chaosvm.track`.
+    :param seed: run deterministically, with ``Math.random`` seeded by this value.
+    :param clock: time source of ``Date`` and timers. Default as a :class:`VirtualClock`
+        if `seed` is given, otherwise the wall clock.
+    :param cache: serve results of the same script, config and seed from this cache.
+        Requires `seed`.
+    :param dom: dom backend of the window, ``lxml`` (the reference) or ``light``.
+    :param registry: reuse the handlers of op functions seen before, see :mod:`chaosvm.registry`.
+    :param images: run on the program image of the script if a supervisor published it, see
+        :mod:`chaosvm.image`.
 
-    :return: a :class:`TDC` object.
+    :return: a :class:`TDC` object. Use :class:`Session` to get the window and the decoded
+        results as well.
     """
-    win = Window(top=True)
-    if ip:
-        win.RTCPeerConnection._ip = ip
-    if ua:
-        win.navigator.userAgent = ua
-    if href:
-        win.location.href = href
-    if referer:
-        win.location.referer = referer
-    if mouse_track:
-        win.add_mouse_track(mouse_track)
-
-    parse_vm(js_vm, win)(win)
-    return win.TDC
+    from chaosvm.session import Session
+
+    return Session(
+        js_vm,
+        ip,
+        ua,
+        href,
+        referer,
+        mouse_track,
+        seed=seed,
+        clock=clock,
+        cache=cache,
+        dom=dom,
+        registry=registry,
+        images=images,
+    ).tdc
@@ -0,0 +1,121 @@
+"""Result cache of deterministic sessions.
+
+A session created by :func:`chaosvm.prepare` with a ``seed`` is a pure function of the script,
+the environment config and the seed. Its ``getInfo``/``getData`` results can then be stored and
+served again without running the vm.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from copy import copy
+from hashlib import sha256
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from chaosvm.proxy.builtins import Proxy
+from chaosvm.proxy.dom import TDC
+
+Call = Tuple[str, str]
+"""method name and ``repr`` of its arguments"""
+
+
+class ResultCache:
+    """An in-memory LRU of session results.
+
+    :param maxsize: max sessions to keep. Least recently used sessions are evicted first.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._store: OrderedDict[str, Dict[Tuple[Call, ...], Any]] = OrderedDict()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(js_vm: str, config: dict, seed: int) -> str:
+        """Key of a session. `config` must be json serializable."""
+        h = sha256(js_vm.encode())
+        h.update(json.dumps(config, sort_keys=True, default=repr).encode())
+        h.update(str(seed).encode())
+        return h.hexdigest()
+
+    def entry(self, key: str) -> Dict[Tuple[Call, ...], Any]:
+        """Get the result table of a session, creating it if not exists."""
+        if key in self._store:
+            self._store.move_to_end(key)
+            return self._store[key]
+        self._store[key] = table = {}
+        while len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+        return table
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def clear(self):
+        self._store.clear()
+        self.hits = self.misses = 0
+
+
+class CachedTDC:
+    """A :class:`TDC` answering from a cache entry. The vm is built and replayed on the first
+    call whose history is not in the entry, and answers all later calls.
+
+    Since every call may consume the seeded random and advance the clock, a result is keyed by
+    all the calls before it.
+    """
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        table: Dict[Tuple[Call, ...], Any],
+        build: Callable[[], TDC],
+    ) -> None:
+        self._cache = cache
+        self._table = table
+        self._build = build
+        self._tdc: Optional[TDC] = None
+        self._history: List[Tuple[str, tuple]] = []
+
+    def _call(self, name: str, args: tuple):
+        self._history.append((name, args))
+        key = tuple((n, repr(a)) for n, a in self._history)
+        if self._tdc is None and key in self._table:
+            self._cache.hits += 1
+            r = self._table[key]
+        else:
+            self._cache.misses += 1
+            r = getattr(self._live(), name)(*args)
+            self._table[key] = copy(r) if isinstance(r, Proxy) else r
+        return copy(r) if isinstance(r, Proxy) else r
+
+    def derive(self, name: str, f: Callable[[], Any]):
+        """A value computed by `f` from the live window after the calls so far, such as a
+        decoded result. It is stored in the entry, so that a cache hit gets the same value
+        without the window.
+        """
+        key = tuple((n, repr(a)) for n, a in self._history) + ((name, ""),)
+        if self._tdc is None and key in self._table:
+            return self._table[key]
+        self._table[key] = r = f()
+        return r
+
+    def _live(self) -> TDC:
+        """Build the vm and replay the calls before the current one."""
+        if self._tdc is None:
+            self._tdc = tdc = self._build()
+            for name, args in self._history[:-1]:
+                getattr(tdc, name)(*args)
+        return self._tdc
+
+    def getInfo(self, *args):
+        return self._call("getInfo", args)
+
+    def getData(self, *args):
+        return self._call("getData", args)
+
+    def setData(self, *args):
+        return self._call("setData", args)
+
+    def clearTc(self, *args):
+        return self._call("clearTc", args)
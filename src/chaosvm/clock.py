@@ -0,0 +1,62 @@
+"""Time sources of a window. Times are epoch milliseconds."""
+
+from time import time
+
+EPOCH_MS = 1700000000000
+"""default start of a :class:`VirtualClock`"""
+
+
+class Clock:
+    """A time source which the event loop can move forward, instead of sleeping."""
+
+    def now(self) -> int:
+        raise NotImplementedError
+
+    def peek(self) -> int:
+        """Read the time without the side effects of :meth:`now`."""
+        return self.now()
+
+    def advance(self, ms: float):
+        raise NotImplementedError
+
+
+class WallClock(Clock):
+    """The wall clock, plus the time skipped by :meth:`advance`."""
+
+    def __init__(self) -> None:
+        self.skipped = 0
+
+    def __repr__(self) -> str:
+        return f"WallClock(skipped={self.skipped})"
+
+    def now(self) -> int:
+        return int(time() * 1000) + self.skipped
+
+    def advance(self, ms: float):
+        self.skipped += int(ms)
+
+
+class VirtualClock(Clock):
+    """A clock that only moves when it is read or advanced.
+
+    :param start: time of the first reading.
+    :param tick: how far each reading advances the clock, so that successive ``Date`` differ.
+    """
+
+    def __init__(self, start: int = EPOCH_MS, tick: int = 1) -> None:
+        self.t = start
+        self.tick = tick
+
+    def __repr__(self) -> str:
+        return f"VirtualClock(start={self.t}, tick={self.tick})"
+
+    def now(self) -> int:
+        t = self.t
+        self.t += self.tick
+        return t
+
+    def peek(self) -> int:
+        return self.t
+
+    def advance(self, ms: float):
+        self.t += int(ms)
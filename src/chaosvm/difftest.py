@@ -0,0 +1,291 @@
+"""Differential testing of vm engines.
+
+A reference engine and a candidate engine run the same tdc.js in the same seeded environment.
+The reference records its state after every instruction, and the candidate is checked against
+that record step by step. The first divergent instruction is reported, so a speed-up that
+changes the output of ``getData`` is caught before upstream rejects our tickets.
+
+An engine is a :class:`~chaosvm.vm.ChaosVM` subclass that dispatches through ``self.ops``.
+With `optimized`, the candidate runs with unboxed slots and quickened dispatch, as a
+:class:`~chaosvm.stack.ChaosStack` runs it, and the reference runs plain: every variable boxed
+and every instruction dispatched through the opmap.
+
+.. code-block:: sh
+
+    python -m chaosvm.difftest tests/corpus/tdc_a.js --candidate mypkg.fast:FastVM
+    python -m chaosvm.difftest tests/corpus/tdc_a.js --candidate chaosvm.vm:ChaosVM --optimized
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from random import Random
+from typing import Any, Callable, Collection, List, NamedTuple, Optional, Tuple, Type, Union
+
+import pyjsparser as jsparser
+
+from chaosvm.clock import EPOCH_MS, VirtualClock
+from chaosvm.parse import VmParts, load_vm, split_vm
+from chaosvm.proxy.builtins import NULL, Function, String
+from chaosvm.proxy.dom import Window
+from chaosvm.vm import Cell, ChaosVM
+
+Checkpoints = Union[None, Collection[int], Callable[[int], bool]]
+
+
+class Step(NamedTuple):
+    stage: str
+    index: int
+    """count of traced instructions before this one"""
+    depth: int
+    """frame depth, 1 is the outermost frame of the stage"""
+    pc: int
+    """where the instruction starts"""
+    op: str
+    next_pc: int
+    stack: Tuple
+
+    def key(self):
+        return self.stage, self.depth, self.pc, self.next_pc, self.stack
+
+
+class Divergence(NamedTuple):
+    stage: str
+    reason: str
+    expected: Any = None
+    actual: Any = None
+
+    def __str__(self) -> str:
+        return (
+            f"[{self.stage}] {self.reason}\n  expected: {self.expected}\n  actual:   {self.actual}"
+        )
+
+
+class Diverged(Exception):
+    pass
+
+
+_PRIMITIVES = frozenset((type(None), bool, int, float, str))
+
+
+def snapshot(o: Any, depth: int = 2) -> Any:
+    """A comparable value of a stack slot. Proxies compare by class, except strings. A boxed
+    variable compares as its value, so that it matches the same variable unboxed."""
+    t = type(o)
+    if t is Cell:
+        return snapshot(o.v, depth)
+    if t in _PRIMITIVES:
+        return o
+    if t is list or t is tuple:
+        if depth <= 0:
+            return ("list", len(o))
+        return tuple(snapshot(i, depth - 1) for i in o)
+    if t is dict:
+        return ("dict", len(o))
+    # check the type, since isinstance would go through Proxy.__getattribute__
+    if issubclass(t, String):
+        return ("String", o._s)
+    if issubclass(t, NULL):
+        return "null"
+    if issubclass(t, Function):
+        return "function"
+    if issubclass(t, type):
+        return ("class", o.__name__)
+    return t.__name__
+
+
+class Tracer:
+    """Trace every checkpoint instruction of an engine. If `expected` is given, compare each
+    step with it and raise :exc:`Diverged` on the first mismatch."""
+
+    def __init__(
+        self,
+        checkpoints: Checkpoints = None,
+        stack_top: Optional[int] = None,
+        expected: Optional[List[Step]] = None,
+    ) -> None:
+        if checkpoints is None:
+            self.want: Callable[[int], bool] = lambda pc: True
+        elif callable(checkpoints):
+            self.want = checkpoints
+        else:
+            self.want = frozenset(checkpoints).__contains__
+        self.stack_top = stack_top
+        self.expected = expected
+        self.steps: List[Step] = []
+        self.stage = ""
+        self.depth = 0
+
+    def engine(self, base: Type[ChaosVM]) -> Type[ChaosVM]:
+        """Derive a traced engine from `base`."""
+        tracer = self
+
+        class Traced(base):  # type: ignore
+            def __init__(self, *args, **kwds) -> None:
+                super().__init__(*args, **kwds)
+                self.ops = [tracer._wrap(self, op) for op in self.ops]
+
+            def __call__(self):
+                tracer.depth += 1
+                try:
+                    return super().__call__()
+                finally:
+                    tracer.depth -= 1
+
+        Traced.__name__ = Traced.__qualname__ = f"Traced{base.__name__}"
+        return Traced
+
+    def _wrap(self, vm: ChaosVM, op: Callable):
+        name = op.__name__
+
+        def step():
+            pc = vm.pc - 1
+            r = op()
+            if self.want(pc):
+                stack = vm.stack[-self.stack_top :] if self.stack_top else vm.stack
+                self._record(
+                    Step(self.stage, len(self.steps), self.depth, pc, name, vm.pc, snapshot(stack))
+                )
+            return r
+
+        return step
+
+    def _record(self, step: Step):
+        if self.expected is not None:
+            if step.index >= len(self.expected):
+                raise Diverged(Divergence(step.stage, "extra instruction", None, step))
+            if (ref := self.expected[step.index]).key() != step.key():
+                raise Diverged(Divergence(step.stage, "state differs", ref, step))
+        self.steps.append(step)
+
+
+def seeded_window(seed: int, mouse_track=None) -> Window:
+    """Create a window whose ``Math.random`` and ``Date`` are reproducible."""
+    win = Window(top=True, rng=Random(seed), clock=VirtualClock(EPOCH_MS, tick=0))
+    if mouse_track:
+        win.add_mouse_track(mouse_track)
+    return win
+
+
+def run(
+    parts: VmParts,
+    engine: Type[ChaosVM],
+    tracer: Tracer,
+    seed: int = 0,
+    mouse_track=None,
+    optimized: bool = False,
+):
+    """Run the top-level vm, ``getInfo`` and ``getData`` of `parts` under `tracer`.
+
+    :param optimized: run with the escape analysis and the quickening of the stack.
+    :return: snapshot of ``getInfo`` and the ``getData`` string.
+    """
+    win = seeded_window(seed, mouse_track)
+    stack = load_vm(parts, win)
+    vm = tracer.engine(engine)
+    escapes, quick = (stack.escapes, stack.quick) if optimized else (None, None)
+
+    tracer.stage = "execute"
+    win._loop.execute(
+        vm(
+            stack.pc_start,
+            stack.opcode,
+            win,
+            stack.opmap,
+            None,
+            stack.strings,
+            stack.ic,
+            escapes,
+            quick,
+        )
+    )
+    tracer.stage = "getInfo"
+    info = win.TDC.getInfo(None)
+    tracer.stage = "getData"
+    data = win.TDC.getData(None, True)
+    return {k: snapshot(v) for k, v in info.__dict__.items()}, str(data)
+
+
+def diff(
+    js: Union[str, VmParts],
+    candidate: Type[ChaosVM],
+    reference: Type[ChaosVM] = ChaosVM,
+    *,
+    seed: int = 0,
+    checkpoints: Checkpoints = None,
+    stack_top: Optional[int] = None,
+    mouse_track=((50, 42), (50, 55)),
+    optimized: bool = False,
+) -> Optional[Divergence]:
+    """Run `reference` and `candidate` on the same script and seeded environment.
+
+    :param js: tdc.js source, or its :func:`~chaosvm.parse.split_vm` result.
+    :param checkpoints: pcs to compare at, or a predicate of pc. Default is every instruction.
+    :param stack_top: only compare this many slots at the top of the stack.
+    :param optimized: run the candidate with unboxed slots and quickened dispatch, against the
+        reference without them.
+
+    :return: the first divergence, or None if the engines agree.
+    """
+    parts = js if isinstance(js, VmParts) else split_vm(jsparser.parse(js))
+    ref_tracer = Tracer(checkpoints, stack_top)
+    expected = run(parts, reference, ref_tracer, seed, mouse_track)
+
+    tracer = Tracer(checkpoints, stack_top, ref_tracer.steps)
+    try:
+        actual = run(parts, candidate, tracer, seed, mouse_track, optimized)
+    except Diverged as e:
+        return e.args[0]
+    except Exception as e:
+        last = tracer.steps[-1] if tracer.steps else None
+        return Divergence(tracer.stage, f"candidate raised {e!r} after", last, None)
+
+    if len(tracer.steps) < len(ref_tracer.steps):
+        ref = ref_tracer.steps[len(tracer.steps)]
+        return Divergence(ref.stage, "missing instruction", ref, None)
+    if expected[0] != actual[0]:
+        return Divergence("getInfo", "result differs", expected[0], actual[0])
+    if expected[1] != actual[1]:
+        return Divergence("getData", "result differs", expected[1], actual[1])
+
+
+def load_engine(spec: str) -> Type[ChaosVM]:
+    """Import an engine from ``module:qualname``."""
+    mod, _, name = spec.partition(":")
+    o: Any = import_module(mod)
+    for attr in name.split("."):
+        o = getattr(o, attr)
+    return o
+
+
+if __name__ == "__main__":
+    import sys
+    from argparse import ArgumentParser
+    from pathlib import Path
+
+    parser = ArgumentParser(description="compare a vm engine with the reference interpreter")
+    parser.add_argument("script", type=Path, nargs="+")
+    parser.add_argument("--candidate", required=True, help="module:Engine")
+    parser.add_argument("--reference", default="chaosvm.vm:ChaosVM", help="module:Engine")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pc", type=int, action="append", help="checkpoint pc, repeatable")
+    parser.add_argument("--stack-top", type=int)
+    parser.add_argument(
+        "--optimized", action="store_true", help="run the candidate unboxed and quickened"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for script in args.script:
+        d = diff(
+            script.read_text(encoding="utf8"),
+            load_engine(args.candidate),
+            load_engine(args.reference),
+            seed=args.seed,
+            checkpoints=args.pc,
+            stack_top=args.stack_top,
+            optimized=args.optimized,
+        )
+        print(f"{script}: {d or 'ok'}")
+        failed |= d is not None
+    sys.exit(1 if failed else 0)
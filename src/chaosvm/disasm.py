@@ -0,0 +1,363 @@
+"""Disassembler of :class:`~chaosvm.stack.ChaosStack` programs.
+
+Instructions are decoded by following the control flow from the entry of the program and
+from the entries of the functions created by ``vm_factory``. They are grouped into basic
+blocks, which end at ``jump``, ``je``, ``stop``, ``throw`` and at the bounds of try regions
+(``stepin``/``stepout``). The static max stack depth of each function is computed over its
+blocks.
+
+.. code-block:: sh
+
+    python -m chaosvm.disasm tests/corpus/tdc_a.js
+    python -m chaosvm.disasm tests/corpus/tdc_a.js --dot | dot -Tsvg > tdc_a.svg
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from functools import lru_cache
+from sys import intern
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from chaosvm.stack import ChaosStack
+from chaosvm.vm import BuiltinOps
+
+NARGS = dict(
+    inst=1,
+    assign=1,
+    inst_arr=1,
+    realloc=1,
+    stepin=2,
+    jump=1,
+    je=1,
+    outcall=1,
+    wincall=1,
+    new=1,
+    new_attr=1,
+    concat=1,
+    getobj=1,
+    swap=1,
+    n2list=1,
+)
+"""operand count of handlers with fixed operands. ``zstr``, ``null`` and ``vm_factory`` are
+decoded specially, other handlers have no operand."""
+
+EFFECT = dict(
+    inst=1,
+    undefined=1,
+    null=1,
+    isnull=1,
+    true=1,
+    false=1,
+    inst_arr=1,
+    drop=-1,
+    vm_factory=1,
+    ge=-1,
+    geq=-1,
+    eq=-1,
+    refeq=-1,
+    contains=-1,
+    add=-1,
+    sub=-1,
+    mul=-1,
+    div=-1,
+    mod=-1,
+    bitor=-1,
+    bitand=-1,
+    xor=-1,
+    lshift=-1,
+    rshift=-1,
+    urshift=-1,
+    zstr=1,
+    group=-1,
+    grgetattr=-1,
+    delattr=1,
+    grobj=-1,
+    getobj=1,
+    copy=1,
+    arr_popleft=2,
+)
+"""net stack effect of handlers. Calls pop their arguments, ``realloc`` sets the depth, and
+other handlers keep the depth."""
+
+CALLS = frozenset(("outcall", "wincall", "new", "new_attr"))
+TERMINATORS = frozenset(("jump", "je", "stop", "throw", "stepin", "stepout", "?"))
+
+
+@lru_cache(maxsize=None)
+def op_names() -> Tuple[str, ...]:
+    """Handler names in the order of ``BuiltinOps.ops``, i.e. the values of an opmap."""
+    return tuple(f.__name__ for f in BuiltinOps(0, (0,), None, {}).ops)  # type: ignore
+
+
+class Instr(NamedTuple):
+    pc: int
+    op: str
+    """handler name. ``isnull`` is a ``null`` fused with the ``refeq`` after it, and ``?`` is
+    an opcode out of the opmap or the program."""
+    args: Tuple[Any, ...]
+    """operands. ``zstr`` has the decoded string, ``vm_factory`` has the entry pc, the
+    captured slots as ``{slot: outer slot}`` and the argument slots."""
+    next_pc: int
+
+    def __str__(self) -> str:
+        args = " ".join(repr(i) if isinstance(i, str) else str(i) for i in self.args)
+        return f"{self.pc:>6}  {self.op:<12}{args}".rstrip()
+
+
+class Block(NamedTuple):
+    start: int
+    instrs: List[Instr]
+    succs: List[Tuple[int, str]]
+    """successors and the kinds of the edges: ``next``, ``jump``, ``true`` or ``except``"""
+
+
+class Function(NamedTuple):
+    entry: int
+    entry_depth: int
+    """stack depth when the function starts"""
+    blocks: Dict[int, Block]
+    max_depth: int
+    """static max stack depth"""
+
+
+class Program(NamedTuple):
+    functions: Dict[int, Function]
+    """functions by entry pc. The first one is the entry of the program."""
+
+    def listing(self) -> str:
+        lines = []
+        for f in self.functions.values():
+            lines.append(f"function {f.entry} (entry stack {f.entry_depth}, max {f.max_depth})")
+            for b in sorted(f.blocks.values()):
+                lines.append(f"  block {b.start}:")
+                lines.extend(f"  {i}" for i in b.instrs)
+                if b.succs:
+                    lines.append("          -> " + ", ".join(f"{k} {pc}" for pc, k in b.succs))
+            lines.append("")
+        return "\n".join(lines)
+
+    def dot(self) -> str:
+        """The control-flow graph in Graphviz dot, with a cluster per function."""
+        lines = ["digraph chaosvm {", '  node [shape=box fontname="monospace"];']
+        for f in self.functions.values():
+            lines.append(f"  subgraph cluster_{f.entry} {{")
+            lines.append(f'    label="function {f.entry} (max stack {f.max_depth})";')
+            for b in sorted(f.blocks.values()):
+                text = "".join(_escape(str(i).strip()) + "\\l" for i in b.instrs)
+                lines.append(f'    b{b.start} [label="{text}"];')
+            lines.append("  }")
+        edges = set()
+        for f in self.functions.values():
+            for b in f.blocks.values():
+                for pc, kind in b.succs:
+                    edges.add((b.start, pc, kind))
+        style = dict(next="", jump="", true=' [label="true"]')
+        for start, pc, kind in sorted(edges):
+            attr = style.get(kind, ' [style=dashed label="except"]')
+            lines.append(f"  b{start} -> b{pc}{attr};")
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def _escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def decode(stack: ChaosStack, pc: int) -> Instr:
+    """Decode the instruction at `pc`."""
+    code, opmap = stack.opcode, stack.opmap
+    names = op_names()
+
+    def name(at: int) -> str:
+        if at < len(code) and code[at] in opmap:
+            return names[opmap[code[at]]]
+        return "?"
+
+    op = name(pc)
+    if op == "?":
+        return Instr(pc, op, (), pc + 1)
+    if op == "zstr":
+        s, at = bytearray(), pc + 1
+        while name(at) == "concat" and at + 1 < len(code):
+            s.append(code[at + 1])
+            at += 2
+        return Instr(pc, op, (s.decode(errors="replace"),), at)
+    if op == "null":
+        if name(pc + 1) == "refeq":
+            return Instr(pc, "isnull", (), pc + 2)
+        return Instr(pc, op, (), pc + 1)
+    if op == "vm_factory":
+        entry, alen, ulen = code[pc + 1 : pc + 4]
+        at = pc + 4
+        captured = dict(zip(code[at : at + 2 * alen : 2], code[at + 1 : at + 2 * alen : 2]))
+        at += 2 * alen
+        return Instr(pc, op, (entry, captured, tuple(code[at : at + ulen])), at + ulen)
+    n = NARGS.get(op, 0)
+    return Instr(pc, op, tuple(code[pc + 1 : pc + 1 + n]), pc + 1 + n)
+
+
+def successors(i: Instr) -> List[Tuple[int, str]]:
+    if i.op == "jump":
+        return [(i.args[0], "jump")]
+    if i.op == "je":
+        return [(i.next_pc, "next"), (i.args[0], "true")]
+    if i.op in ("stop", "throw", "?"):
+        return []
+    if i.op == "stepin":
+        return [(i.next_pc, "next"), (i.args[0], "except")]
+    return [(i.next_pc, "next")]
+
+
+def entry_depth(i: Instr) -> int:
+    """Stack depth when the function created by the ``vm_factory`` instruction `i` starts."""
+    _, captured, params = i.args
+    return max(3, 1 + max(params or (0,)), 1 + max(captured, default=-1))
+
+
+def effect(i: Instr, depth: int) -> int:
+    """Stack depth after `i`."""
+    if i.op == "realloc":
+        return i.args[0]
+    if i.op in CALLS:
+        return depth - i.args[0]
+    return depth + EFFECT.get(i.op, 0)
+
+
+def walk(stack: ChaosStack) -> Tuple[Dict[int, Instr], Dict[int, int]]:
+    """Decode the instructions reachable from the entry of `stack` and from the entries of
+    ``vm_factory`` functions.
+
+    :return: instructions by pc, and function entries with their stack depth at start.
+    """
+    instrs: Dict[int, Instr] = {}
+    entries: Dict[int, int] = {stack.pc_start: 2}
+    todo = deque([stack.pc_start])
+    while todo:
+        pc = todo.popleft()
+        if pc in instrs:
+            continue
+        instrs[pc] = i = decode(stack, pc)
+        if i.op == "vm_factory" and i.args[0] not in entries:
+            entries[i.args[0]] = entry_depth(i)
+            todo.append(i.args[0])
+        todo.extend(pc for pc, _ in successors(i))
+    return instrs, entries
+
+
+def disassemble(stack: ChaosStack) -> Program:
+    """Decode the reachable instructions of `stack` and build its control-flow graph."""
+    instrs, entries = walk(stack)
+    leaders = set(entries)
+    for i in instrs.values():
+        if i.op in TERMINATORS:
+            leaders.update(pc for pc, _ in successors(i))
+
+    blocks: Dict[int, Block] = {}
+    for start in sorted(leaders):
+        body, pc = [], start
+        while True:
+            body.append(i := instrs[pc])
+            if i.op in TERMINATORS or i.next_pc in leaders:
+                break
+            pc = i.next_pc
+        blocks[start] = Block(start, body, successors(i))
+
+    functions = {pc: _function(blocks, pc, depth) for pc, depth in entries.items()}
+    return Program(functions)
+
+
+def _function(blocks: Dict[int, Block], entry: int, depth: int) -> Function:
+    owned: Dict[int, Block] = {}
+    depth_in: Dict[int, int] = {entry: depth}
+    todo = deque([entry])
+    # a loop growing the stack has no bound; give up on it after some rounds
+    budget = 16 * len(blocks)
+    while todo and budget:
+        budget -= 1
+        start = todo.popleft()
+        b = owned[start] = blocks[start]
+        d, handler = depth_in[start], None
+        for i in b.instrs:
+            if i.op == "stepin":
+                handler = d
+            d = effect(i, d)
+        for pc, kind in b.succs:
+            out = handler if kind == "except" else d
+            if out is not None and out > depth_in.get(pc, -1):
+                depth_in[pc] = out
+                todo.append(pc)
+
+    max_depth = depth
+    for start, b in owned.items():
+        d = depth_in[start]
+        for i in b.instrs:
+            max_depth = max(max_depth, d := effect(i, d))
+    return Function(entry, depth, owned, max_depth)
+
+
+def string_pool(
+    stack: ChaosStack, instrs: Optional[Dict[int, Instr]] = None
+) -> Dict[int, Tuple[str, int]]:
+    """Fold the string literals of `stack`, which ``zstr`` builds from a run of ``concat``.
+
+    :param instrs: instructions of `stack` as :func:`walk` returns, decoded again if not given.
+    :return: by the pc after each ``zstr``, its interned string and the pc after its run.
+    """
+    pool = {}
+    for i in (instrs or walk(stack)[0]).values():
+        if i.op != "zstr":
+            continue
+        run = bytes(tuple(stack.opcode[i.pc + 2 : i.next_pc : 2]))  # not the raw int32 of a view
+        try:
+            pool[i.pc + 1] = intern(run.decode()), i.next_pc
+        except UnicodeDecodeError:
+            pass  # left to fail at runtime
+    return pool
+
+
+def escapes(
+    stack: ChaosStack, program: Optional[Tuple[Dict[int, Instr], Dict[int, int]]] = None
+) -> Dict[int, FrozenSet[int]]:
+    """Escape analysis of the variables of each function in `stack`.
+
+    A slot escapes if a ``vm_factory`` reachable in the function captures it. Only escaping
+    slots are boxed in a :class:`~chaosvm.vm.Cell`, so that the closure and the frame share
+    them; others are stored unboxed.
+
+    :param program: :func:`walk` of `stack`, done again if not given.
+    :return: escaping slots by function entry.
+    """
+    instrs, entries = program or walk(stack)
+    result = {}
+    for entry in entries:
+        slots, seen, todo = set(), set(), [entry]
+        while todo:
+            if (pc := todo.pop()) in seen or (i := instrs.get(pc)) is None:
+                continue
+            seen.add(pc)
+            if i.op == "vm_factory":
+                slots.update(i.args[1].values())
+            todo.extend(pc for pc, _ in successors(i))
+        result[entry] = frozenset(slots)
+    return result
+
+
+def load(js_vm: str) -> ChaosStack:
+    from chaosvm.parse import parse_vm
+    from chaosvm.proxy.dom import Window
+
+    return parse_vm(js_vm, Window())
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from pathlib import Path
+
+    parser = ArgumentParser(description="disassemble a tdc.js")
+    parser.add_argument("script", type=Path)
+    parser.add_argument("--dot", action="store_true", help="print the graph in Graphviz dot")
+    args = parser.parse_args()
+
+    prog = disassemble(load(args.script.read_text(encoding="utf8")))
+    print(prog.dot() if args.dot else prog.listing())
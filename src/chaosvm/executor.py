@@ -0,0 +1,97 @@
+"""Run sessions in parallel in one process.
+
+A window shares no mutable state with other windows, so sessions can run side by side in
+
+- ``interpreters``: one subinterpreter per worker, each with its own GIL (PEP 684), via
+  :class:`concurrent.futures.InterpreterPoolExecutor` of Python 3.14+. lxml cannot be imported
+  in a subinterpreter, so the sessions use the ``light`` dom. Arguments and results are copied
+  between interpreters, so a `cache` or `registry` is a copy in the worker.
+- ``threads``: a thread pool. Sessions run in parallel on a free-threaded build (PEP 703), and
+  share `cache` and `registry` objects. With the GIL, they only run concurrently.
+
+``auto`` picks ``threads`` on a free-threaded build, ``interpreters`` if available, and
+``threads`` otherwise.
+
+.. code-block:: python
+
+    with SessionExecutor(workers=4) as ex:
+        futures = [ex.submit(js_vm, ip, seed=i) for i in range(100)]
+        results = [f.result() for f in futures]
+"""
+
+from __future__ import annotations
+
+import sys
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from os import cpu_count
+from typing import Any, Optional
+
+from chaosvm.session import Result, Session
+
+BACKENDS = ("auto", "interpreters", "threads")
+
+
+def gil_enabled() -> bool:
+    """Whether the GIL is enabled, which is always the case before Python 3.13."""
+    f = getattr(sys, "_is_gil_enabled", None)
+    return True if f is None else f()
+
+
+def has_interpreters() -> bool:
+    """Whether :class:`concurrent.futures.InterpreterPoolExecutor` is available."""
+    import concurrent.futures
+
+    return hasattr(concurrent.futures, "InterpreterPoolExecutor")
+
+
+def run_session(js_vm: str, ip: str, kw: dict) -> Result:
+    """Run a :class:`~chaosvm.session.Session` to its :class:`~chaosvm.session.Result`.
+    This is the task of the workers."""
+    with Session(js_vm, ip, **kw) as s:
+        return s.result()
+
+
+class SessionExecutor:
+    """A pool of workers running sessions, see the module docstring for the backends.
+
+    :param workers: number of workers, default as the cpu count.
+    :param backend: one of :obj:`BACKENDS`.
+    """
+
+    def __init__(self, workers: Optional[int] = None, backend: str = "auto") -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}, expect one of {BACKENDS}")
+        if backend == "auto":
+            backend = "interpreters" if gil_enabled() and has_interpreters() else "threads"
+        elif backend == "interpreters" and not has_interpreters():
+            raise RuntimeError("subinterpreters require Python 3.14+")
+
+        self.workers = workers or cpu_count() or 1
+        self.backend = backend
+        self.parallel = backend == "interpreters" or not gil_enabled()
+        """whether sessions run in parallel, rather than only concurrently"""
+        self._pool: Executor
+        if backend == "interpreters":
+            from concurrent.futures import InterpreterPoolExecutor  # type: ignore
+
+            self._pool = InterpreterPoolExecutor(self.workers)
+        else:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="chaosvm")
+
+    def submit(self, js_vm: str, ip: str, **kw: Any) -> Future[Result]:
+        """Run a session in a worker. Keywords are those of :class:`~chaosvm.session.Session`.
+
+        :return: a future of the session :class:`~chaosvm.session.Result`.
+        """
+        if self.backend == "interpreters":
+            kw.setdefault("dom", "light")
+        return self._pool.submit(run_session, js_vm, ip, kw)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
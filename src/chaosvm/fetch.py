@@ -0,0 +1,338 @@
+"""Fetch tdc.js, and keep its latest version ready to run.
+
+A :class:`ScriptFetcher` gets a script url through a :class:`ConnectionPool`, which keeps
+connections alive between requests and decodes ``gzip`` and ``deflate`` bodies. Fetched scripts
+go to a :class:`ScriptStore` by the sha256 of their content, with the ``ETag`` and
+``Last-Modified`` of the url, so later requests are conditional and a ``304`` costs no body.
+
+The fetcher refreshes the script in a background thread every `interval` seconds. A new
+version is parsed into a :class:`~chaosvm.stack.ChaosStack` of an in-process program image,
+see :meth:`chaosvm.image.ImageCache.preload`, before it replaces the current version. Sessions
+given the image cache run on it, so a rotation never parses on the request path:
+
+.. code-block:: python
+
+    with ScriptFetcher(url, store="scripts") as fetcher:
+        fetcher.start()
+        with Session(fetcher.get(), ip, images=fetcher.images) as s:
+            r = s.result()
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import zlib
+from hashlib import sha256
+from http.client import HTTPConnection, HTTPException, HTTPMessage, HTTPSConnection
+from pathlib import Path
+from threading import Event, Lock, Thread
+from time import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+from chaosvm import metrics
+from chaosvm.image import ImageCache
+from chaosvm.registry import OpmapRegistry
+
+log = logging.getLogger(__name__)
+
+VERSION = 1
+"""format of the store index"""
+
+Response = Tuple[int, HTTPMessage, bytes]
+"""status, headers and the decoded body"""
+
+
+def decode(body: bytes, encoding: Optional[str]) -> bytes:
+    """Decode a body of the given ``Content-Encoding``."""
+    encoding = (encoding or "identity").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:  # raw deflate, as some servers send
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    if encoding == "identity":
+        return body
+    raise ValueError(f"unsupported content encoding {encoding!r}")
+
+
+class ConnectionPool:
+    """Idle HTTP connections by scheme and host, reused by later requests.
+
+    :param maxsize: idle connections to keep per host.
+    :param timeout: socket timeout in seconds.
+    """
+
+    def __init__(self, maxsize: int = 4, timeout: float = 10.0) -> None:
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str], List[HTTPConnection]] = {}
+        self._lock = Lock()
+        self.requests = self.connections = 0
+
+    def _connect(self, scheme: str, netloc: str) -> HTTPConnection:
+        self.connections += 1
+        cls = HTTPSConnection if scheme == "https" else HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        """``GET`` `url`, asking for a compressed body."""
+        u = urlsplit(url)
+        key = (u.scheme, u.netloc)
+        path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+        headers = {"Accept-Encoding": "gzip, deflate", **(headers or {})}
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._connect(*key)
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                break
+            except (HTTPException, ConnectionError):
+                conn.close()
+                if not reused:
+                    raise
+                # the server closed an idle connection
+                conn, reused = None, False
+        self.requests += 1
+        if resp.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.maxsize:
+                    idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return resp.status, resp.headers, decode(body, resp.headers.get("Content-Encoding"))
+
+    def close(self):
+        """Close the idle connections."""
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            c.close()
+
+
+class Entry(NamedTuple):
+    """The version of a url in the store, and its validators."""
+
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched: float = 0
+    """when it was fetched or revalidated, in seconds since the epoch"""
+
+
+class ScriptStore:
+    """Scripts by the sha256 of their content, and the :class:`Entry` of each url.
+
+    :param directory: persist scripts and the index of urls in this directory. In memory if
+        not given.
+    """
+
+    def __init__(self, directory: Union[str, Path, None] = None) -> None:
+        self.directory = None if directory is None else Path(directory)
+        self._scripts: Dict[str, bytes] = {}
+        self._entries: Dict[str, Entry] = {}
+        self._lock = Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if (index := self.directory / "index.json").exists():
+                data = json.loads(index.read_text(encoding="utf8"))
+                if data.get("version") == VERSION:
+                    self._entries = {url: Entry(*e) for url, e in data["urls"].items()}
+
+    def __contains__(self, digest: str) -> bool:
+        return self.get(digest) is not None
+
+    def put(self, body: bytes) -> str:
+        """Store a script.
+
+        :return: its sha256.
+        """
+        digest = sha256(body).hexdigest()
+        if self.directory is None:
+            self._scripts[digest] = body
+            return digest
+        path = self.directory / f"{digest}.js"
+        if not path.exists():
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        if self.directory is None:
+            return self._scripts.get(digest)
+        try:
+            return (self.directory / f"{digest}.js").read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def entry(self, url: str) -> Optional[Entry]:
+        return self._entries.get(url)
+
+    def record(self, url: str, entry: Entry):
+        """Set the entry of `url`, and save the index if persisted."""
+        with self._lock:
+            self._entries[url] = entry
+            if self.directory is None:
+                return
+            index = self.directory / "index.json"
+            tmp = index.with_name(f".{index.name}.{os.getpid()}.tmp")
+            data = dict(version=VERSION, urls={u: list(e) for u, e in self._entries.items()})
+            tmp.write_text(json.dumps(data), encoding="utf8")
+            os.replace(tmp, index)
+
+
+class ScriptFetcher:
+    """The latest version of the script at `url`. See the module docstring.
+
+    :param store: a :class:`ScriptStore`, or its directory. Default as an in-memory store.
+    :param images: where new versions are preloaded. Default as a new
+        :class:`~chaosvm.image.ImageCache`.
+    :param registry: resolve opmaps of new versions through this registry.
+    :param interval: seconds between background refreshes.
+    :param keep: versions to keep preloaded. Older ones are retired from `images`.
+    :param headers: extra request headers, e.g. ``User-Agent`` and ``Referer``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        store: Union[ScriptStore, str, Path, None] = None,
+        images: Optional[ImageCache] = None,
+        registry: Optional[OpmapRegistry] = None,
+        pool: Optional[ConnectionPool] = None,
+        interval: float = 60.0,
+        keep: int = 2,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.url = url
+        self.store = store if isinstance(store, ScriptStore) else ScriptStore(store)
+        self.images = ImageCache() if images is None else images
+        self.registry = registry
+        self.pool = ConnectionPool() if pool is None else pool
+        self.interval = interval
+        self.keep = keep
+        self.headers = headers or {}
+        self.versions: List[Tuple[str, str]] = []
+        """digest and source of the preloaded versions, the current one last"""
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self.not_modified = 0
+        """refreshes answered with ``304``"""
+
+    @property
+    def current(self) -> Optional[str]:
+        """sha256 of the current version"""
+        return self.versions[-1][0] if self.versions else None
+
+    def get(self) -> str:
+        """The current version. On the first call, it is fetched, or read from the store if the
+        server cannot be reached."""
+        if not self.versions:
+            try:
+                self.refresh()
+            except (OSError, HTTPException):
+                if (e := self.store.entry(self.url)) is None:
+                    raise
+                if (body := self.store.get(e.digest)) is None:
+                    raise
+                log.warning("cannot fetch %s, using stored %s", self.url, e.digest, exc_info=True)
+                self._install(e.digest, body.decode())
+        return self.versions[-1][1]
+
+    @metrics.timed("chaosvm_fetch_seconds")
+    def refresh(self) -> bool:
+        """Revalidate the script, and install a new version if it changed.
+
+        :return: whether a new version is installed.
+        """
+        headers = dict(self.headers)
+        entry = self.store.entry(self.url)
+        if entry is not None and entry.digest in self.store:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        status, resp, body = self.pool.request(self.url, headers)
+        if status == 304 and entry is not None:
+            self.not_modified += 1
+            self.store.record(self.url, entry._replace(fetched=time()))
+            if self.current == entry.digest:
+                return False
+            body = self.store.get(entry.digest)  # type: ignore
+        elif status != 200:
+            raise HTTPError(self.url, status, f"unexpected status {status}", resp, None)
+
+        digest = self.store.put(body)
+        etag, last_modified = resp.get("ETag"), resp.get("Last-Modified")
+        if status == 304:
+            etag, last_modified = entry.etag, entry.last_modified  # type: ignore
+        self.store.record(self.url, Entry(digest, etag, last_modified, time()))
+        if digest == self.current:
+            return False
+        self._install(digest, body.decode())
+        return True
+
+    def _install(self, digest: str, js_vm: str):
+        # parse before the version is visible, not in the first session of it
+        self.images.preload(js_vm, self.registry)
+        with self._lock:
+            self.versions = [v for v in self.versions if v[0] != digest] + [(digest, js_vm)]
+            retired = self.versions[: -self.keep]
+            self.versions = self.versions[-self.keep :]
+        for _, js in retired:
+            self.images.retire(js)
+        metrics.count("chaosvm_script_versions_total")
+
+    def start(self):
+        """Refresh in a background thread every :attr:`interval` seconds."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="chaosvm fetcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                log.warning("refreshing %s failed", self.url, exc_info=True)
+
+    def stop(self):
+        """Stop refreshing in the background."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop refreshing and close the connections."""
+        self.stop()
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
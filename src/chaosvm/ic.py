@@ -0,0 +1,187 @@
+"""Inline caches of property loads.
+
+A load site is the pc of a ``getattr``, ``grgetattr`` or ``get_global``. The receiver type and
+the property name at a site are almost always the same, so a site keeps a getter specialized
+for each ``(type, name)`` it has seen, for up to :attr:`InlineCache.size` pairs. The getter
+knows where the name resolved:
+
+- on a proxy instance, the class attribute or descriptor found in the MRO. Instances are
+  written all the time, so the instance dict is still checked on every hit, before class
+  attributes which are not data descriptors.
+- on other objects, nothing but that they are looked up by ``obj[name]``. This includes proxy
+  classes: windows derive their own, e.g. :meth:`~chaosvm.proxy.builtins.Math.with_rng`, and
+  a value cached per class, like a bound classmethod, would keep them alive on a shared stack.
+
+Writing or deleting an attribute of any proxy class clears all caches, see :class:`ProxyType`.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+from types import GetSetDescriptorType, MemberDescriptorType
+from typing import Any, Callable, Dict, Optional, Tuple
+from weakref import WeakSet
+
+_caches: WeakSet[InlineCache] = WeakSet()
+_caches_lock = Lock()
+"""guards :data:`_caches`, which windows in other threads add to"""
+
+MISS = object()
+
+Getter = Callable[[Any], Any]
+"""loads a property from a receiver"""
+
+
+def invalidate():
+    """Clear all inline caches."""
+    with _caches_lock:
+        caches = list(_caches)
+    for c in caches:
+        c.clear()
+
+
+class ProxyType(type):
+    """Metaclass of :class:`~chaosvm.proxy.builtins.Proxy`. Writing or deleting a class
+    attribute invalidates the inline caches."""
+
+    def __setattr__(cls, name: str, value) -> None:
+        super().__setattr__(name, value)
+        invalidate()
+
+    def __delattr__(cls, name: str) -> None:
+        super().__delattr__(name)
+        invalidate()
+
+
+def _mro_lookup(tp: type, name: str):
+    for k in tp.__mro__:
+        if name in k.__dict__:
+            return k.__dict__[name]
+    return MISS
+
+
+def _plain(tp: type) -> bool:
+    """Whether ``obj[name]`` of `tp` is ``Proxy.__getattribute__`` over the default lookup, or
+    ``Compact.__getattribute__`` which checks the overflow dict first."""
+    from chaosvm.proxy.builtins import Compact, Proxy
+
+    if getattr(tp, "__getitem__", None) not in (Proxy.__getattribute__, Compact.__getattribute__):
+        return False
+    mro = tp.__mro__
+    return not any("__getattribute__" in k.__dict__ for k in mro[mro.index(Proxy) + 1 : -1])
+
+
+def resolve(obj, name) -> Getter:
+    """Specialize the load of `name` for receivers like `obj`."""
+    tp = type(obj)
+    if type(name) is not str or not _plain(tp):
+        return lambda o: o[name]
+
+    from chaosvm.proxy.builtins import Compact, _overflow_of
+
+    a = _mro_lookup(tp, name)
+    get = _resolve(tp, name, a)
+    if a is MISS or type(a) is MemberDescriptorType or tp.__getitem__ is not Compact.__getitem__:
+        return get
+
+    # a property in the overflow dict of a compact proxy shadows the class attribute
+    def load_shadowed(o):
+        if (d := _overflow_of(o)) is not None and (v := d.get(name, MISS)) is not MISS:
+            return v
+        return get(o)
+
+    return load_shadowed
+
+
+def _resolve(tp: type, name: str, a) -> Getter:
+    missing = tp._missing
+    if hasattr(type(a), "__set__") or hasattr(type(a), "__delete__"):
+        get = a.__get__
+
+        def load_data(o):
+            try:
+                return get(o, tp)
+            except AttributeError:
+                return missing(o, name)
+
+        return load_data
+
+    if not tp.__dictoffset__:
+        if a is MISS:
+            return lambda o: missing(o, name)
+        if hasattr(type(a), "__get__"):
+            get = a.__get__
+            return lambda o: get(o, tp)
+        return lambda o: a
+
+    # the instance dict goes before the class attribute
+    vars_of = next(
+        d for k in tp.__mro__ if isinstance(d := k.__dict__.get("__dict__"), GetSetDescriptorType)
+    ).__get__
+    if a is MISS:
+
+        def load_absent(o):
+            if (v := vars_of(o).get(name, MISS)) is MISS:
+                return missing(o, name)
+            return v
+
+        return load_absent
+    if hasattr(type(a), "__get__"):
+        get = a.__get__
+
+        def load_desc(o):
+            if (v := vars_of(o).get(name, MISS)) is MISS:
+                return get(o, tp)
+            return v
+
+        return load_desc
+    return lambda o: vars_of(o).get(name, a)
+
+
+class InlineCache:
+    """Inline caches of the load sites of a program.
+
+    :param size: receiver types a site caches. A site seeing more is megamorphic and is not
+        cached any more.
+    """
+
+    def __init__(self, size: int = 4) -> None:
+        self.size = size
+        self.sites: Dict[int, Optional[Dict[Tuple[type, Any], Getter]]] = {}
+        """getters of each site by receiver type and name. ``None`` marks a megamorphic site."""
+        self.hits = self.misses = 0
+        with _caches_lock:
+            _caches.add(self)
+
+    def clear(self):
+        """Drop all entries. Counters are kept."""
+        self.sites.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / ((self.hits + self.misses) or 1)
+
+    def load(self, pc: int, obj, name):
+        """``obj[name]`` at the site `pc`."""
+        try:
+            get = self.sites[pc][type(obj), name]  # type: ignore
+        except (KeyError, TypeError):
+            return self._miss(pc, obj, name)
+        self.hits += 1
+        return get(obj)
+
+    def _miss(self, pc: int, obj, name):
+        site = self.sites.get(pc, MISS)
+        if site is None:
+            return obj[name]
+        self.misses += 1
+        if site is MISS:
+            self.sites[pc] = site = {}
+        elif len(site) >= self.size:
+            self.sites[pc] = None
+            return obj[name]
+        try:
+            get = site[type(obj), name] = resolve(obj, name)
+        except TypeError:  # unhashable name
+            return obj[name]
+        return get(obj)
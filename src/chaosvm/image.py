@@ -0,0 +1,384 @@
+"""Program images shared by worker processes.
+
+Every session parses its tdc.js and builds its own opcode tuple, so a pool of workers holds a
+copy of the program of each script version per worker. An :class:`ImageStore` in the
+supervisor parses a version once and publishes its program image: the opcodes as int32, the
+opmap, and the globals the loader installs into a window. Workers attach to an image with an
+:class:`ImageCache` and run sessions on a :class:`~chaosvm.stack.ChaosStack` over a read-only
+view of it, so the opcodes of a version are in physical memory once.
+
+An image is a :mod:`multiprocessing.shared_memory` segment, or a file mapped with :mod:`mmap`
+if a `directory` is given. Its name is derived from the script, so a worker finds it from the
+``js_vm`` of a session.
+
+The supervisor counts publications of a version, and retires it when the count drops to zero:
+the image is flagged as retired and unlinked. A worker counts the sessions running on each
+image, and unmaps a retired image once its last session is closed. New sessions of a retired
+version parse the script as before.
+
+An :class:`ImageCache` can also :meth:`~ImageCache.preload` an image into the memory of its
+own process, e.g. for a new version fetched by :mod:`chaosvm.fetch`, so that the first session
+of the version does not parse it.
+
+.. code-block:: python
+
+    # supervisor
+    store = ImageStore()
+    store.publish(js_vm)
+    ...
+    store.retire(js_vm)
+
+    # worker
+    images = ImageCache()
+    with Session(js_vm, ip, images=images) as s:
+        r = s.result()
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from chaosvm.proxy.dom import Window
+    from chaosvm.registry import OpmapRegistry
+    from chaosvm.stack import ChaosStack
+
+MAGIC = b"CVMI"
+VERSION = 1
+"""format of an image"""
+
+_HEADER = struct.Struct("=4sBBxxiIII")
+"""magic, version, retired, pc, loader bytes, opmap pairs, opcodes"""
+_RETIRED = 5
+"""offset of the retired flag"""
+
+
+def image_name(js_vm: str) -> str:
+    """Name of the image of `js_vm`, short enough for a shared memory name on every platform."""
+    return "chaosvm-" + sha256(js_vm.encode()).hexdigest()[:20]
+
+
+def build_image(js_vm: str, registry: Optional[OpmapRegistry] = None) -> bytes:
+    """Parse `js_vm` into its program image."""
+    from chaosvm.parse import parse_opcodes, resolve_vm
+
+    parts, opmap = resolve_vm(js_vm, registry)
+    opcode = array("i", parse_opcodes(parts.payload, parts.opdata.copy()))
+    loader = json.dumps([parts.new_date, parts.date_attr, parts.win_attr, parts.win_value])
+    lb = loader.encode()
+    lb += b" " * (-len(lb) % 4)  # int32 alignment
+    pairs = array("i", [i for kv in opmap.items() for i in kv])
+    header = _HEADER.pack(MAGIC, VERSION, 0, parts.pc, len(lb), len(opmap), len(opcode))
+    return header + lb + pairs.tobytes() + opcode.tobytes()
+
+
+_tracker_lock = Lock()
+
+
+def _attach(name: str):
+    from multiprocessing import resource_tracker, shared_memory
+
+    try:
+        return shared_memory.SharedMemory(name, track=False)  # type: ignore
+    except TypeError:
+        pass
+    # before Python 3.13, attaching registers the segment to be unlinked when this process exits
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class _Segment:
+    """A mapped image, in shared memory, or in a file under `directory`."""
+
+    def __init__(self, name: str, directory: Optional[Path], data: Optional[bytes] = None):
+        self.name = name
+        self.path = None if directory is None else directory / f"{name}.img"
+        if self.path is not None:
+            if data is not None:
+                tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, self.path)
+            with open(self.path, "r+b" if data is not None else "rb") as f:
+                access = mmap.ACCESS_WRITE if data is not None else mmap.ACCESS_READ
+                self._mmap: Optional[mmap.mmap] = mmap.mmap(f.fileno(), 0, access=access)
+            self.buf = memoryview(self._mmap)
+            return
+
+        from multiprocessing import shared_memory
+
+        self._mmap = None
+        if data is None:
+            self._shm = _attach(name)
+        else:
+            self._shm = shared_memory.SharedMemory(name, create=True, size=len(data))
+            self._shm.buf[: len(data)] = data
+        self.buf = self._shm.buf
+
+    def close(self):
+        """Unmap the segment. Views of it that are still referred to keep it mapped."""
+        try:
+            if self._mmap is None:
+                self._shm.close()
+            else:
+                self.buf.release()
+                self._mmap.close()
+        except BufferError:
+            pass
+
+    def unlink(self):
+        if self.path is None:
+            self._shm.unlink()
+        else:
+            self.path.unlink(missing_ok=True)
+
+
+class _LocalSegment:
+    """An image in the memory of this process."""
+
+    path = None
+
+    def __init__(self, name: str, data: bytes) -> None:
+        self.name = name
+        self.buf = memoryview(bytearray(data))
+
+    def close(self):
+        self.buf.release()
+
+    def unlink(self):
+        pass
+
+
+class ImageStore:
+    """Program images published by a supervisor.
+
+    :param directory: publish mapped files in this directory instead of shared memory.
+    :param registry: resolve opmaps through this registry, see :mod:`chaosvm.registry`.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path, None] = None,
+        registry: Optional[OpmapRegistry] = None,
+    ) -> None:
+        self.directory = None if directory is None else Path(directory)
+        self.registry = registry
+        self._images: Dict[str, Tuple[_Segment, int]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, js_vm: str) -> bool:
+        return image_name(js_vm) in self._images
+
+    def publish(self, js_vm: str) -> str:
+        """Publish the image of `js_vm`, or count one more publication of it.
+
+        :return: the image name.
+        """
+        name = image_name(js_vm)
+        with self._lock:
+            if name in self._images:
+                seg, refs = self._images[name]
+                self._images[name] = seg, refs + 1
+            else:
+                data = build_image(js_vm, self.registry)
+                self._images[name] = _Segment(name, self.directory, data), 1
+        return name
+
+    def retire(self, js_vm: str) -> bool:
+        """Count one retirement of `js_vm`. The last one flags its image as retired and unlinks
+        it; workers unmap it when their sessions on it are closed.
+
+        :return: whether the image was retired.
+        """
+        name = image_name(js_vm)
+        with self._lock:
+            if (entry := self._images.get(name)) is None:
+                return False
+            seg, refs = entry
+            if refs > 1:
+                self._images[name] = seg, refs - 1
+                return False
+            del self._images[name]
+        self._retire(seg)
+        return True
+
+    def close(self):
+        """Retire all images."""
+        with self._lock:
+            segs = [seg for seg, _ in self._images.values()]
+            self._images.clear()
+        for seg in segs:
+            self._retire(seg)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _retire(seg: _Segment):
+        seg.buf[_RETIRED] = 1
+        seg.close()
+        seg.unlink()
+
+
+class ProgramImage:
+    """An image attached or preloaded by a worker. See :meth:`ImageCache.acquire`."""
+
+    def __init__(self, seg: Union[_Segment, _LocalSegment]) -> None:
+        self._seg = seg
+        self.name = seg.name
+        magic, version, _, self.pc, nloader, npairs, nopcode = _HEADER.unpack_from(seg.buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{seg.name} is not a program image of version {VERSION}")
+        at = _HEADER.size
+        self.loader: Tuple[str, str, str, str] = tuple(
+            json.loads(bytes(seg.buf[at : at + nloader]))
+        )  # type: ignore
+        """``new_date``, ``date_attr``, ``win_attr`` and ``win_value``, see
+        :class:`~chaosvm.parse.VmParts`"""
+        at += nloader
+        pairs = seg.buf[at : at + 8 * npairs].cast("i")
+        self.opmap = dict(zip(pairs[::2], pairs[1::2]))
+        pairs.release()
+        at += 8 * npairs
+        self.opcode = seg.buf[at : at + 4 * nopcode].cast("i")
+        """view of the opcodes, read-only if shared"""
+        self.refs = 0
+        """sessions of this worker running on the image"""
+        self._stack: Optional[ChaosStack] = None
+
+    @property
+    def retired(self) -> bool:
+        return bool(self._seg.buf[_RETIRED])
+
+    def stack(self) -> ChaosStack:
+        """The stack of the image, built on the first call and shared by later sessions.
+
+        It is not quickened: a :class:`~chaosvm.quicken.Quickening` keeps a handler per pc,
+        which would be a private copy of the program in each worker again.
+        """
+        if self._stack is None:
+            from chaosvm.stack import ChaosStack
+
+            self._stack = ChaosStack(self.opmap, self.opcode, pc=self.pc, quicken=False)
+        return self._stack
+
+    def load(self, window: Window) -> ChaosStack:
+        """Install the tdc.js globals into `window` and give its stack, as
+        :func:`~chaosvm.parse.load_vm` does."""
+        new_date, date_attr, win_attr, win_value = self.loader
+        window[new_date] = window.Date
+        window[date_attr] = lambda attr, args: getattr(window.Date, attr)(*args)
+        window[win_attr] = win_value
+        stack = self.stack()
+        window["__TENCENT_CHAOS_STACK"] = stack
+        return stack
+
+    def _close(self):
+        self._stack = None
+        self.opcode.release()
+        self._seg.close()
+
+
+class ImageCache:
+    """Images attached by a worker, by name.
+
+    :param directory: attach mapped files in this directory, as given to the
+        :class:`ImageStore`.
+    """
+
+    def __init__(self, directory: Union[str, Path, None] = None) -> None:
+        self.directory = None if directory is None else Path(directory)
+        self._images: Dict[str, ProgramImage] = {}
+        self._lock = Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def acquire(self, js_vm: str) -> Optional[ProgramImage]:
+        """Count a session on the image of `js_vm`, attaching it if needed.
+
+        :return: the image, or ``None`` if it is not published or retired.
+        """
+        name = image_name(js_vm)
+        with self._lock:
+            if (image := self._images.get(name)) is None:
+                try:
+                    image = ProgramImage(_Segment(name, self.directory))
+                except (FileNotFoundError, ValueError):
+                    self.misses += 1
+                    return None
+                self._images[name] = image
+            if image.retired:
+                if not image.refs:
+                    del self._images[name]
+                    image._close()
+                self.misses += 1
+                return None
+            image.refs += 1
+            self.hits += 1
+            return image
+
+    def release(self, image: ProgramImage):
+        """End a session on `image`. A retired image is unmapped after its last session."""
+        with self._lock:
+            image.refs -= 1
+            if image.refs or not image.retired:
+                return
+            if self._images.get(image.name) is image:
+                del self._images[image.name]
+        image._close()
+
+    def preload(self, js_vm: str, registry: Optional[OpmapRegistry] = None) -> ProgramImage:
+        """Parse `js_vm` into an image in this process, and build its stack, unless an image of
+        it is attached already. Later sessions of `js_vm` run on it.
+
+        :param registry: resolve the opmap through this registry.
+        """
+        name = image_name(js_vm)
+        with self._lock:
+            if (image := self._images.get(name)) is not None and not image.retired:
+                return image
+        image = ProgramImage(_LocalSegment(name, build_image(js_vm, registry)))
+        image.stack()
+        with self._lock:
+            if (cur := self._images.get(name)) is not None and not cur.retired:
+                return cur
+            self._images[name] = image
+        return image
+
+    def retire(self, js_vm: str) -> bool:
+        """Retire the image of `js_vm` that this cache preloaded. It is freed after its last
+        session.
+
+        :return: whether there was such an image.
+        """
+        name = image_name(js_vm)
+        with self._lock:
+            image = self._images.get(name)
+            if image is None or not isinstance(image._seg, _LocalSegment):
+                return False
+            image._seg.buf[_RETIRED] = 1
+            if image.refs:
+                return True
+            del self._images[name]
+        image._close()
+        return True
@@ -0,0 +1,187 @@
+"""Event loop of a window.
+
+Timers are kept in a heap ordered by due time. Instead of sleeping, the loop moves the window's
+clock straight to the next due timer. Microtasks, e.g. ``Promise.then`` callbacks, run after the
+current task and before the next one, as in a browser.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from chaosvm.clock import Clock, WallClock
+
+log = logging.getLogger(__name__)
+F = TypeVar("F", bound=Callable)
+
+_current: ContextVar[Optional[EventLoop]] = ContextVar("chaosvm_loop", default=None)
+
+
+def current_loop() -> Optional[EventLoop]:
+    """The loop running in this context, if any."""
+    return _current.get()
+
+
+class Timer:
+    __slots__ = ("callback", "args", "interval")
+
+    def __init__(self, callback: Callable, args: tuple, interval: Optional[int]) -> None:
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        """repeat every this many ms, or None if it only fires once"""
+
+
+class EventLoop:
+    """Task and microtask queues of a window.
+
+    :param clock: time source of the window, default as the wall clock.
+    :param max_tasks: a :meth:`run` stops after so many tasks, in case of runaway intervals.
+    """
+
+    def __init__(self, clock: Optional[Clock] = None, max_tasks: int = 10000) -> None:
+        self.clock = clock or WallClock()
+        self.max_tasks = max_tasks
+        self._heap: List[Tuple[int, int, int]] = []
+        """(due, seq, timer id)"""
+        self._timers: Dict[int, Timer] = {}
+        self._micro: Deque[Tuple[Callable, tuple]] = deque()
+        self._seq = 0
+        self._oneshot = 0
+        self.window: Any = None
+        """the window of this loop, if any"""
+
+    def call_later(
+        self, ms: float, callback: Callable, *args, interval: Optional[float] = None
+    ) -> int:
+        """Schedule `callback` after `ms`, and every `interval` ms thereafter if given.
+
+        :return: timer id, see :meth:`cancel`.
+        """
+        self._seq += 1
+        tid = self._seq
+        self._timers[tid] = Timer(
+            callback, args, None if interval is None else max(int(interval or 0), 1)
+        )
+        if interval is None:
+            self._oneshot += 1
+        self._push(tid, ms)
+        return tid
+
+    def _push(self, tid: int, ms: Any):
+        try:
+            ms = max(int(ms or 0), 0)
+        except (TypeError, ValueError):
+            ms = 0
+        self._seq += 1
+        heapq.heappush(self._heap, (self.clock.peek() + ms, self._seq, tid))
+
+    def cancel(self, tid: Any):
+        """Cancel a timer. Unknown ids are ignored, as ``clearTimeout`` does."""
+        if (timer := self._timers.pop(tid, None)) and timer.interval is None:
+            self._oneshot -= 1
+
+    def queue_microtask(self, callback: Callable, *args):
+        self._micro.append((callback, args))
+
+    def run_microtasks(self):
+        while self._micro:
+            callback, args = self._micro.popleft()
+            self._call(callback, args)
+
+    def _call(self, callback: Callable, args: tuple):
+        token = _current.set(self)
+        try:
+            callback(*args)
+        except Exception:
+            # an uncaught error ends the task, not the page
+            log.warning("uncaught error in %r", callback, exc_info=True)
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def active(self):
+        """Make this loop current, so that promises queue their callbacks on it."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def close(self):
+        """Drop pending tasks and the window, so that nothing is kept alive by this loop."""
+        self._heap.clear()
+        self._timers.clear()
+        self._micro.clear()
+        self._oneshot = 0
+        self.window = None
+
+    def execute(self, script: Callable[[], Any], until: Optional[float] = None):
+        """Run `script` as the first task, then :meth:`run` the loop.
+
+        :return: what `script` returns. Its errors are raised, unlike those of later tasks.
+        """
+        with self.active():
+            r = script()
+        self.run(until)
+        return r
+
+    def task(self, f: F) -> F:
+        """Make a call of `f` from outside the loop :meth:`execute` it, so that the timers and
+        microtasks it schedules run before it returns. Calls from a task of the loop are
+        direct."""
+
+        @wraps(f)
+        def task(*args, **kwds):
+            if _current.get() is self:
+                return f(*args, **kwds)
+            return self.execute(lambda: f(*args, **kwds))
+
+        return task  # type: ignore
+
+    def run(self, until: Optional[float] = None) -> int:
+        """Run due tasks in order, moving the clock to each of them.
+
+        :param until: run timers due within this many ms from now, intervals included.
+            By default, run until no one-shot timer is pending; intervals due before that fire
+            as well.
+        :return: number of tasks run.
+        """
+        self.run_microtasks()
+        deadline = None if until is None else self.clock.peek() + int(until)
+        n = 0
+        while self._heap and n < self.max_tasks:
+            if deadline is None and not self._oneshot:
+                break
+            due, _, tid = self._heap[0]
+            if deadline is not None and due > deadline:
+                break
+            heapq.heappop(self._heap)
+            if (timer := self._timers.get(tid)) is None:
+                continue  # cancelled
+
+            if (skip := due - self.clock.peek()) > 0:
+                self.clock.advance(skip)
+            if timer.interval is None:
+                del self._timers[tid]
+                self._oneshot -= 1
+            else:
+                self._push(tid, timer.interval)
+
+            n += 1
+            self._call(timer.callback, timer.args)
+            self.run_microtasks()
+
+        if deadline is not None and (skip := deadline - self.clock.peek()) > 0:
+            self.clock.advance(skip)
+        return n
+
+    def __len__(self) -> int:
+        """Pending timers."""
+        return len(self._timers)
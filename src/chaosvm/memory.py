@@ -0,0 +1,140 @@
+"""Memory accounting of a session.
+
+:func:`measure` runs :func:`chaosvm.prepare`, ``getInfo`` and ``getData`` under :mod:`tracemalloc`.
+It reports the peak and retained memory, broken down by the types of the objects allocated in
+the session, and by the stacks of vm frames still kept alive by closures.
+
+.. code-block:: sh
+
+    python -m chaosvm.memory tests/corpus/tdc_a.js
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+from typing import Dict, List, NamedTuple, Tuple
+
+from chaosvm.proxy.builtins import Proxy
+from chaosvm.vm import Cell, ChaosVM
+
+
+class TypeUsage(NamedTuple):
+    count: int
+    size: int
+    """shallow size in bytes"""
+
+
+class MemoryReport(NamedTuple):
+    peak: int
+    """peak traced bytes during the session"""
+    retained: int
+    """traced bytes still allocated while the session is alive"""
+    proxies: Dict[str, TypeUsage]
+    """retained proxies by class name"""
+    others: Dict[str, TypeUsage]
+    """other retained objects by type name"""
+    vm_frames: int
+    """retained vm frames, i.e. frames captured by vm functions"""
+    vm_stack: TypeUsage
+    """slots and shallow size of the stacks of the retained vm frames"""
+    vm_cells: int
+    """variable cells in the retained stacks"""
+
+    def format(self, top: int = 10) -> str:
+        lines = [
+            f"peak      {self.peak / 1024:10.1f} KiB",
+            f"retained  {self.retained / 1024:10.1f} KiB",
+            f"vm stack  {self.vm_stack.size / 1024:10.1f} KiB "
+            f"({self.vm_frames} frames, {self.vm_stack.count} slots, {self.vm_cells} cells)",
+        ]
+        for title, usage in (("proxies", self.proxies), ("others", self.others)):
+            lines.append(f"{title}:")
+            items = sorted(usage.items(), key=lambda i: i[1].size, reverse=True)[:top]
+            for name, u in items:
+                lines.append(f"  {name:<40}{u.count:>8}{u.size / 1024:>10.1f} KiB")
+        return "\n".join(lines)
+
+
+def _usage(objs: List[object]) -> Dict[str, TypeUsage]:
+    usage: Dict[str, Tuple[int, int]] = {}
+    for o in objs:
+        name = type(o).__qualname__
+        n, size = usage.get(name, (0, 0))
+        usage[name] = n + 1, size + sys.getsizeof(o)
+    return {k: TypeUsage(*v) for k, v in usage.items()}
+
+
+def measure(js_vm: str, ip: str = "", warmup: bool = True, **kw) -> MemoryReport:
+    """Run a session and account for its memory. Keyword arguments are passed to
+    :func:`chaosvm.prepare`.
+
+    :param warmup: run a session before measuring, so that lazy imports are not counted.
+    """
+    from chaosvm import prepare
+
+    if warmup:
+        tdc = prepare(js_vm, ip, **kw)
+        tdc.getInfo(None)
+        tdc.getData(None, True)
+        del tdc
+
+    gc.collect()
+    # tracemalloc.get_object_traceback misses objects with a managed dict, so objects of the
+    # session are told by identity. Holding the old objects keeps their ids from being reused.
+    before = gc.get_objects()
+    old = {id(o) for o in before}
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        tdc = prepare(js_vm, ip, **kw)
+        tdc.getInfo(None)
+        tdc.getData(None, True)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+
+        # objects allocated in the session and still alive
+        objs = [
+            o for o in gc.get_objects() if id(o) not in old and o is not before and o is not old
+        ]
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    # type checks, since isinstance would go through Proxy.__getattribute__
+    proxies = [o for o in objs if issubclass(type(o), Proxy)]
+    others = [o for o in objs if not issubclass(type(o), Proxy)]
+    frames = [o for o in others if issubclass(type(o), ChaosVM)]
+    stack = TypeUsage(
+        sum(len(f.stack) for f in frames), sum(sys.getsizeof(f.stack) for f in frames)
+    )
+    cells = sum(type(i) is Cell for f in frames for i in f.stack)
+    del tdc
+    return MemoryReport(
+        peak=peak - base,
+        retained=current - base,
+        proxies=_usage(proxies),
+        others=_usage(others),
+        vm_frames=len(frames),
+        vm_stack=stack,
+        vm_cells=cells,
+    )
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from pathlib import Path
+
+    parser = ArgumentParser(description="memory report of a tdc.js session")
+    parser.add_argument("script", type=Path)
+    parser.add_argument("--ip", default="1.2.3.4")
+    parser.add_argument("--dom", choices=["lxml", "light"])
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    report = measure(args.script.read_text(encoding="utf8"), args.ip, dom=args.dom)
+    print(report.format(args.top))
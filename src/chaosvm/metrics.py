@@ -0,0 +1,207 @@
+"""Operational metrics.
+
+Metrics go to the :data:`sink` set by :func:`set_sink`. Without one, which is the default,
+a hook is a check of a module global, and the vm runs its uncounted loop.
+
+========================================  =========  ==========================================
+name                                      kind       of
+========================================  =========  ==========================================
+``chaosvm_parse_vm_seconds``              histogram  :func:`~chaosvm.parse.parse_vm`
+``chaosvm_parse_opcode_mapping_seconds``  histogram  :func:`~chaosvm.parse.parse_opcode_mapping`
+``chaosvm_execute_seconds``               histogram  top-level execution of a stack
+``chaosvm_getinfo_seconds``               histogram  ``TDC.getInfo``
+``chaosvm_getdata_seconds``               histogram  ``TDC.getData``
+``chaosvm_fetch_seconds``                 histogram  a refresh of :mod:`chaosvm.fetch`
+``chaosvm_instructions_total``            counter    instructions executed
+``chaosvm_exceptions_caught_total``       counter    exceptions caught by a try in the vm
+``chaosvm_sessions_total``                counter    :class:`~chaosvm.session.Session` created
+``chaosvm_replays_total``                 counter    tapes replayed, see :mod:`chaosvm.replay`
+``chaosvm_replay_divergences_total``      counter    replays that fell back to a live window
+``chaosvm_specializations_total``         counter    sites quickened, see :mod:`chaosvm.quicken`
+``chaosvm_deoptimizations_total``         counter    quickened sites that missed their types
+``chaosvm_script_versions_total``         counter    script versions fetched and preloaded
+========================================  =========  ==========================================
+
+.. code-block:: python
+
+    from chaosvm import metrics
+
+    sink = metrics.PrometheusSink()
+    metrics.set_sink(sink)
+    sink.serve(9464)  # text exposition at http://127.0.0.1:9464/metrics
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock, Thread
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+F = TypeVar("F", bound=Callable)
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""default upper bounds of histogram buckets, in seconds"""
+
+
+class Sink:
+    """Receives metrics. The base class drops them."""
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add `value` to the counter `name`."""
+
+    def observe(self, name: str, value: float) -> None:
+        """Record `value` into the histogram `name`."""
+
+
+sink: Optional[Sink] = None
+"""where metrics go. ``None`` disables them."""
+
+
+def set_sink(s: Optional[Sink]) -> Optional[Sink]:
+    """Set :data:`sink` and return the previous one."""
+    global sink
+    prev, sink = sink, s
+    return prev
+
+
+def count(name: str, value: float = 1) -> None:
+    if sink is not None:
+        sink.count(name, value)
+
+
+def observe(name: str, value: float) -> None:
+    if sink is not None:
+        sink.observe(name, value)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorate a function to record its duration, errors included, into the histogram
+    `name`."""
+
+    def decorator(f: F) -> F:
+        @wraps(f)
+        def wrapper(*args, **kwds):
+            if sink is None:
+                return f(*args, **kwds)
+            t = perf_counter()
+            try:
+                return f(*args, **kwds)
+            finally:
+                observe(name, perf_counter() - t)
+
+        wrapper.__metric__ = name  # type: ignore
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+class CallbackSink(Sink):
+    """Pass every metric to `callback` as ``(kind, name, value)``, where `kind` is
+    ``counter`` or ``histogram``."""
+
+    def __init__(self, callback: Callable[[str, str, float], None]) -> None:
+        self.callback = callback
+
+    def count(self, name: str, value: float = 1) -> None:
+        self.callback("counter", name, value)
+
+    def observe(self, name: str, value: float) -> None:
+        self.callback("histogram", name, value)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        """per bucket, not cumulative. The last one is ``+Inf``."""
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MemorySink(Sink):
+    """Keep counters and histograms in memory. Thread-safe.
+
+    :param buckets: histogram buckets, in seconds.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = Lock()
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            if (h := self.histograms.get(name)) is None:
+                h = self.histograms[name] = Histogram(self.buckets)
+            h.observe(value)
+
+    def clear(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+def _number(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class PrometheusSink(MemorySink):
+    """A :class:`MemorySink` exposed in the Prometheus text format."""
+
+    def exposition(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, v in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {_number(v)}")
+            for name, h in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                acc = 0
+                for le, n in zip(h.buckets, h.counts):
+                    acc += n
+                    lines.append(f'{name}_bucket{{le="{le}"}} {acc}')
+                lines.append(f'{name}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{name}_sum {_number(h.sum)}")
+                lines.append(f"{name}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9464, addr: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve :meth:`exposition` at ``/metrics`` from a daemon thread. Call ``shutdown()``
+        of the returned server to stop."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        exposition = self.exposition
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exposition().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
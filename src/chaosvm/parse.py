@@ -1,16 +1,30 @@
+import re
 from base64 import b64decode
 from collections import defaultdict
 from hashlib import md5
-from typing import Any, Callable, Dict, Iterable, List, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 from urllib.parse import unquote
 
-import pyjsparser as jsparser
-
-from chaosvm.proxy.dom import Date, Window
+from chaosvm import metrics
+from chaosvm.proxy.dom import Window
 from chaosvm.stack import ChaosStack
 from chaosvm.stxhash import syntax_hash
 from chaosvm.vm import OP_FEATS
 
+if TYPE_CHECKING:
+    from chaosvm.registry import OpmapRegistry
+
 
 def path_get(d: Union[dict, list], *path: Union[str, int]) -> Any:
     o = d
@@ -23,18 +37,34 @@ def first(pred: Callable, it: Iterable):
     return next(filter(pred, it))
 
 
-def parse_vm(vm_js: str, window: Window):
-    ast = jsparser.parse(vm_js)
-    assert isinstance(ast, dict)
-
+class VmParts(NamedTuple):
+    """The pieces of a tdc.js AST that are needed to build a :class:`ChaosStack`."""
+
+    new_date: str
+    """window attribute holding ``Date``"""
+    date_attr: str
+    """window attribute holding the ``Date`` method proxy"""
+    win_attr: str
+    """window attribute holding a raw literal"""
+    win_value: str
+    pc: int
+    """where the top-level vm starts"""
+    payload: str
+    """base64 opcode payload"""
+    opdata: List[int]
+    """opcodes which are not encoded in :obj:`.payload`, as ``[index, code, ...]``"""
+    vm_declare: Optional[dict]
+    """AST of ``__TENCENT_CHAOS_VM``, ``None`` if the parts are scanned, see :func:`scan_vm`"""
+
+
+def split_vm(ast: dict) -> VmParts:
+    """Locate the pieces of a parsed tdc.js."""
     bodies = [i for i in ast["body"] if i["type"] != "EmptyStatement"]
 
     new_date = path_get(bodies, 0, "expression", "left", "property", "name")
-    window[new_date] = Date
     date_attr = path_get(bodies, 1, "expression", "left", "property", "name")
-    window[date_attr] = lambda attr, args: getattr(Date, attr)(*args)
     win_attr = path_get(bodies, 2, "expression", "left", "property", "name")
-    window[win_attr] = path_get(bodies, 2, "expression", "right", "raw")
+    win_value = path_get(bodies, 2, "expression", "right", "raw")
 
     stack_dcl = first(
         lambda i: i["type"] == "VariableDeclaration"
@@ -48,22 +78,120 @@ def parse_vm(vm_js: str, window: Window):
 
     outer_vm = first(lambda i: i["type"] == "CallExpression", ret_expr)
     pc, al_core = outer_vm["arguments"][:2]
-    pc = int(pc["raw"])
 
     data, opdata = path_get(al_core, "arguments", 0, "elements")
-    opcodes = parse_opcodes(data["raw"], [int(i["value"]) for i in opdata["elements"]])
 
     vm_dcl = first(
         lambda i: i["type"] == "FunctionDeclaration"
         and path_get(i, "id", "name") == "__TENCENT_CHAOS_VM",
         stack_bodies,
     )
+    return VmParts(
+        new_date,
+        date_attr,
+        win_attr,
+        win_value,
+        int(pc["raw"]),
+        data["raw"],
+        [int(i["value"]) for i in opdata["elements"]],
+        vm_dcl,
+    )
+
+
+_WIN_ASSIGN = re.compile(r"(?:^|[;}\n])\s*window\.([\w$]+)\s*=")
+_WIN_LITERAL = re.compile(r"""=\s*("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|[\w.+-]+)\s*;?\s*$""")
+_STACK_DCL = re.compile(r"var\s+__TENCENT_CHAOS_STACK\s*=\s*function\s*\(\s*\)\s*\{\s*")
+_STACK_RET = re.compile(
+    r"""\s*return\b[^;]*?__TENCENT_CHAOS_VM\(\s*(\d+)\s*,\s*function\s*\(\w*\)\s*\{.*?\}"""
+    r"""\s*\(\s*\[\s*("[A-Za-z0-9+/=]*")\s*,\s*\[([\d\s,]*)\]\s*\]\s*\)""",
+    re.S,
+)
+
+
+def scan_vm(vm_js: str) -> Optional[VmParts]:
+    """Locate the pieces of a tdc.js in its source text, without parsing it.
+
+    The opcode mapping is not scanned: :attr:`VmParts.vm_declare` is ``None``, so the opmap
+    must be known, e.g. from an :class:`~chaosvm.registry.OpmapRegistry`.
+
+    :return: ``None`` if the source is not laid out as expected.
+    """
+    from chaosvm.registry import template_source
+
+    if (dcl := _STACK_DCL.search(vm_js)) is None:
+        return None
+    head = vm_js[: dcl.start()]
+    assigns = list(_WIN_ASSIGN.finditer(head))
+    if len(assigns) != 3 or (lit := _WIN_LITERAL.search(head, assigns[2].end() - 1)) is None:
+        return None
+    if (template := template_source(vm_js)) is None or not vm_js.startswith(template, dcl.end()):
+        return None
+    if (ret := _STACK_RET.match(vm_js, dcl.end() + len(template))) is None:
+        return None
+    pc, payload, opdata = ret.groups()
+    return VmParts(
+        *(m.group(1) for m in assigns),
+        lit.group(1),
+        int(pc),
+        payload,
+        [int(i) for i in opdata.split(",") if i.strip()],
+        None,
+    )
+
+
+@metrics.timed("chaosvm_parse_vm_seconds")
+def parse_vm(vm_js: str, window: Window, registry: Optional["OpmapRegistry"] = None):
+    """Parse a tdc.js and build its :class:`ChaosStack` in `window`.
+
+    :param registry: look the opmap up by the fingerprint of the vm template, and record its
+        op functions if any is new.
+    """
+    parts, opmap = resolve_vm(vm_js, registry)
+    return load_vm(parts, window, opmap)
+
 
-    stack = ChaosStack(parse_opcode_mapping(vm_dcl), opcodes, pc=pc)
+def resolve_vm(
+    vm_js: str, registry: Optional["OpmapRegistry"] = None
+) -> Tuple[VmParts, Dict[int, int]]:
+    """The pieces of a tdc.js and its opmap.
+
+    :param registry: look the opmap up by the fingerprint of the vm template, and record its
+        op functions if any is new. If all of them are known, the pieces are scanned from the
+        source instead of parsing it, see :func:`scan_vm`.
+    """
+    import pyjsparser as jsparser
+
+    if registry is None:
+        parts = split_vm(jsparser.parse(vm_js))
+        return parts, parse_opcode_mapping(parts.vm_declare)
+
+    from chaosvm.registry import fingerprint
+
+    fp = fingerprint(vm_js)
+    scanned = scan_vm(vm_js) if fp is not None and fp in registry else None
+    parts = split_vm(jsparser.parse(vm_js)) if scanned is None else scanned
+    return parts, registry.resolve(fp, lambda: parse_opcode_mapping(parts.vm_declare))
+
+
+def load_vm(parts: VmParts, window: Window, opmap: Optional[Dict[int, int]] = None):
+    """Install the tdc.js globals into `window` and build its :class:`ChaosStack`.
+
+    :param opmap: the opmap if it is known, otherwise it is parsed from the vm template.
+    """
+    window[parts.new_date] = window.Date
+    window[parts.date_attr] = lambda attr, args: getattr(window.Date, attr)(*args)
+    window[parts.win_attr] = parts.win_value
+
+    if opmap is None:
+        assert parts.vm_declare is not None, "the opmap of scanned parts must be given"
+        opmap = parse_opcode_mapping(parts.vm_declare)
+    opcodes = parse_opcodes(parts.payload, parts.opdata.copy())
+    stack = ChaosStack(opmap, opcodes, pc=parts.pc)
     window.__TENCENT_CHAOS_STACK = stack
     return stack
 
 
+@metrics.timed("chaosvm_parse_opcode_mapping_seconds")
 def parse_opcode_mapping(vm_declare: dict) -> Dict[int, int]:
     """Parse operation-code mapping."""
     params = vm_declare["params"]
@@ -110,18 +238,14 @@ def parse_opcodes(b64: str, arr: List[int]) -> List[int]:
 
 
 if __name__ == "__main__":
-    import logging
-
-    import chaosvm.proxy.builtins as builtin
+    from chaosvm.probes import Probes
     from chaosvm.proxy.dom import Window
 
-    logging.basicConfig(
-        filename="log/miss.log", filemode="w", level=logging.DEBUG, format="{message}", style="{"
-    )
-    builtin.log = logging.getLogger(builtin.__name__)
     win = Window()
     win.add_mouse_track([(50, 42), (50, 55)])
-    with open("js/vm.js.bak", encoding="utf8") as f:
+    with open("js/vm.js.bak", encoding="utf8") as f, Probes().active() as probes:
         parse_vm(f.read(), win)(win)
         print(win.TDC.getInfo(None).__dict__)
         print(unquote(win.TDC.getData(None, True)))
+    with open("log/miss.log", "w", encoding="utf8") as f:
+        f.write(probes.report())
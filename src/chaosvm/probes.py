@@ -0,0 +1,103 @@
+"""Missing properties read by a script, i.e. the browser APIs it probes.
+
+A read of a property a proxy does not define is counted in the active :class:`Probes` by
+``(proxy class, property name)``. Counting is a dict increment; the first read of a key also
+records the pc of the vm reading it and writes a debug log.
+
+.. code-block:: python
+
+    s = Session(js_vm, ip)
+    s.result()
+    print(s.probes.report())
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+log = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+Key = Tuple[type, str]
+
+_current: ContextVar[Optional[Probes]] = ContextVar("chaosvm_probes", default=None)
+
+
+def current_probes() -> Optional[Probes]:
+    """The probes active in this context, if any."""
+    return _current.get()
+
+
+class Probe(NamedTuple):
+    owner: str
+    """name of the proxy class"""
+    name: str
+    count: int
+    pc: Optional[int]
+    """pc of the vm at the first read, if read by the vm"""
+
+
+def _vm_pc() -> Optional[int]:
+    from chaosvm.vm import BuiltinOps
+
+    f = sys._getframe(2)
+    while f is not None:
+        if isinstance(o := f.f_locals.get("self"), BuiltinOps):
+            return o.pc
+        f = f.f_back
+    return None
+
+
+class Probes:
+    """Missing property reads of a session."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[Key, int] = {}
+        self.first_pc: Dict[Key, Optional[int]] = {}
+
+    def first(self, owner: type, name: str):
+        """Record the first read of `name` on `owner`."""
+        key = (owner, name)
+        self.counts[key] = 1
+        self.first_pc[key] = pc = _vm_pc()
+        log.debug("%s.%s not defined, first read at pc %s", owner.__name__, name, pc)
+
+    @contextmanager
+    def active(self):
+        """Count missing properties in this context."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def wrap(self, f: F) -> F:
+        """Make `f` count into these probes when called."""
+
+        @wraps(f)
+        def wrapper(*args, **kwds):
+            with self.active():
+                return f(*args, **kwds)
+
+        return wrapper  # type: ignore
+
+    def summary(self) -> List[Probe]:
+        """Probes, the most read first."""
+        probes = [
+            Probe(owner.__name__, str(name), n, self.first_pc.get((owner, name)))
+            for (owner, name), n in self.counts.items()
+        ]
+        probes.sort(key=lambda p: (-p.count, p.owner, p.name))
+        return probes
+
+    def report(self, limit: Optional[int] = None) -> str:
+        """A table of :meth:`summary`, with its first `limit` rows."""
+        probes = self.summary()
+        lines = [f"{len(probes)} missing properties, {sum(self.counts.values())} reads"]
+        lines.extend(f"{p.count:>8}  {p.owner}.{p.name}  (pc {p.pc})" for p in probes[:limit])
+        return "\n".join(lines)
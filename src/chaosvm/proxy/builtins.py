@@ -1,14 +1,25 @@
+from __future__ import annotations
+
 import logging
 import re
 from copy import deepcopy
 from datetime import datetime, timedelta, timezone
-from json import JSONEncoder, dumps
 from math import floor
-from random import random
-from traceback import format_exception
-from typing import Any, Callable, ClassVar, Dict, Optional, Union
+from random import Random, random
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Dict, Optional, Union
+from weakref import WeakValueDictionary
+
+from chaosvm.clock import Clock
+from chaosvm.ic import ProxyType
+from chaosvm.loop import current_loop
+from chaosvm.probes import _current as _probes
+
+from . import regexp
 
-from typing_extensions import Self
+if TYPE_CHECKING:
+    from typing_extensions import Self
 
 log = logging.getLogger(__name__)
 
@@ -17,6 +28,7 @@ __all__ = [
     "NULL",
     "Proxy",
     "Object",
+    "Compact",
     "String",
     "RegExp",
     "Array",
@@ -32,11 +44,12 @@ __all__ = [
 
 
 class NULL:
-    s: Self
+    """JS ``null``. A singleton without attributes, :attr:`s`."""
+
+    __slots__ = ()
+    s: ClassVar[Self]
 
     def __new__(cls):
-        if not hasattr(cls, "s"):
-            cls.s = super().__new__(cls)
         return cls.s
 
     def __getattribute__(self, o):
@@ -48,6 +61,11 @@ class NULL:
     def __getitem__(self, o):
         return self.__getattribute__(o)
 
+    def __setattr__(self, o, v):
+        raise ProxyException(TypeError(f"Cannot set properties of null (setting '{o}')"))
+
+    __setitem__ = __setattr__
+
     def __bool__(self):
         return False
 
@@ -55,7 +73,18 @@ class NULL:
         return "null"
 
 
-class Proxy:
+NULL.s = object.__new__(NULL)
+
+
+class Proxy(metaclass=ProxyType):
+    """A JS object. Its properties are python attributes.
+
+    :class:`Proxy` has no ``__dict__`` itself, so that :class:`Compact` subclasses can do
+    without one. Other subclasses get a ``__dict__`` as usual; :class:`Object` is the plain one.
+    """
+
+    __slots__ = ()
+
     def __init__(self, **kw) -> None:
         super().__init__()
         for k, v in kw.items():
@@ -69,8 +98,14 @@ class Proxy:
         try:
             return super().__getattribute__(name)
         except AttributeError:
-            log.debug("%s.%s not defined", self.__class__.__name__, name)
-            return None
+            return type(self)._missing(self, name)
+
+    def _missing(self, name: str):
+        if (probes := _probes.get()) is not None:
+            try:
+                probes.counts[type(self), name] += 1
+            except KeyError:
+                probes.first(type(self), name)
 
     def __setattr__(self, name: Union[str, float], __value) -> None:
         if isinstance(name, (int, float)):
@@ -118,35 +153,140 @@ class Object(Proxy):
     pass
 
 
-class Date(Proxy):
+class Compact(Proxy):
+    """A proxy whose fields are in ``__slots__``. Properties the script adds go to an overflow
+    dict, which is only created on first use and is exposed as ``__dict__``.
+
+    A property named as a class attribute, e.g. a method, goes to the overflow dict as well,
+    and shadows the class attribute as an instance ``__dict__`` would.
+    """
+
+    __slots__ = ("_overflow",)
+
+    def __new__(cls, *args, **kw):
+        self = object.__new__(cls)
+        object.__setattr__(self, "_overflow", None)
+        return self
+
+    def __getattribute__(self, name: Union[str, float]):
+        # Proxy.__getattribute__ inlined, as it is on the path of every field read
+        if (o := _overflow_of(self)) is not None and name in o:
+            return o[name]
+        if isinstance(name, (int, float)):
+            name = str(name)
+        if name is Symbol.iterator:
+            name = "__iter__"
+        try:
+            return object.__getattribute__(self, name)
+        except AttributeError:
+            return type(self)._missing(self, name)
+
+    def _missing(self, name: str):
+        if (o := _overflow_of(self)) is not None and name in o:
+            return o[name]
+        return Proxy._missing(self, name)
+
+    def __setattr__(self, name: Union[str, float], __value) -> None:
+        try:
+            return Proxy.__setattr__(self, name, __value)
+        except AttributeError:
+            # no slot of the name, or a read-only class attribute
+            pass
+        self.__dict__[str(name)] = __value
+
+    def __delattr__(self, name: Union[str, float]) -> None:
+        if (o := _overflow_of(self)) is not None and str(name) in o:
+            del o[str(name)]
+            return
+        return Proxy.__delattr__(self, name)
+
+    @property
+    def __dict__(self) -> Dict[str, Any]:  # type: ignore
+        if (o := _overflow_of(self)) is None:
+            o = {}
+            object.__setattr__(self, "_overflow", o)
+        return o
+
+    def _fields(self):
+        """the slots that are set, and the overflow dict"""
+        for k in type(self).__mro__:
+            slots = k.__dict__.get("__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name == "__weakref__":
+                    continue
+                try:
+                    yield name, object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+
+    def __copy__(self):
+        o = object.__new__(type(self))
+        for name, v in self._fields():
+            object.__setattr__(o, name, dict(v) if name == "_overflow" and v is not None else v)
+        return o
+
+    def __deepcopy__(self, memo=None):
+        o = object.__new__(type(self))
+        for name, v in self._fields():
+            object.__setattr__(o, name, deepcopy(v, memo))
+        return o
+
+    __getitem__ = __getattribute__
+    __setitem__ = __setattr__
+    __delitem__ = __delattr__
+
+
+_overflow_of = Compact._overflow.__get__  # type: ignore
+
+
+class Date(Compact):
+    __slots__ = ("t",)
     TZ = timezone(timedelta(hours=8))
+    clock: ClassVar[Optional[Clock]] = None
+    """time source of ``new Date()``, default as the wall clock"""
+    t: int
+    """epoch milliseconds"""
 
     def __init__(self, v: Union[int, str, None] = None) -> None:
         super().__init__()
         if isinstance(v, int):
-            self.d = datetime.fromtimestamp(v / 1000, self.TZ)
+            self.t = v
         elif isinstance(v, str):
-            self.d = datetime.fromisoformat(v)
+            self.t = int(datetime.fromisoformat(v).timestamp() * 1000)
+        elif self.clock:
+            self.t = self.clock.now()
         else:
-            self.d = datetime.now(self.TZ)
+            self.t = int(time() * 1000)
+
+    @classmethod
+    def with_clock(cls, clock: Clock) -> type[Date]:
+        """Derive a ``Date`` reading from `clock`."""
+        return type(cls.__name__, (cls,), {"__slots__": (), "clock": clock})
 
     @classmethod
     def now(cls):
         return cls()
 
     def getTime(self):
-        return int(self.d.timestamp() * 1000)
+        return self.t
+
+    def toISOString(self):
+        d = datetime.fromtimestamp(self.t / 1000, timezone.utc)
+        return d.strftime("%Y-%m-%dT%H:%M:%S.") + f"{self.t % 1000:03d}Z"
+
+    def toJSON(self, key=None):
+        return self.toISOString()
 
     def getTimezoneOffset(self):
-        if offset := self.d.utcoffset():
-            return -int(offset.total_seconds() / 60)
-        return 0
+        return -int(self.TZ.utcoffset(None).total_seconds() / 60)
 
     def __sub__(self, o: Self) -> int:
-        return (self.d - o.d).seconds * 1000
+        return self.t - o.t
+
 
+class Number(Compact):
+    __slots__ = ("_i",)
 
-class Number(Proxy):
     def __init__(self, i) -> None:
         self._i = float(i)
 
@@ -159,9 +299,17 @@ class Number(Proxy):
 
 
 class Math(Proxy):
+    rng: ClassVar[Optional[Random]] = None
+    """source of ``Math.random``, default as the global :mod:`random`"""
+
+    @classmethod
+    def with_rng(cls, rng: Random) -> type[Math]:
+        """Derive a ``Math`` drawing from `rng`."""
+        return type(cls.__name__, (cls,), {"rng": rng})
+
     @classmethod
     def random(cls):
-        return random()
+        return cls.rng.random() if cls.rng else random()
 
     @classmethod
     def floor(cls, i: float):
@@ -169,26 +317,21 @@ class Math(Proxy):
 
 
 class JSON(Proxy):
-    class JSJsonEncoder(JSONEncoder):
-        def default(self, o: Any) -> Any:
-            if isinstance(o, String):
-                return o._s
-            if isinstance(o, Array):
-                return [o[i] for i in range(o.length)]
-            if isinstance(o, Proxy):
-                return o.__dict__
-            if o is NULL.s:
-                return None
-            return super().default(o)
-
     @classmethod
     def stringify(cls, o):
-        return String(dumps(o, cls=cls.JSJsonEncoder))
+        from .serialize import stringify
+
+        if (s := stringify(o)) is None:
+            return None
+        return String(s)
 
 
 class Symbol(Proxy):
     tag: str
-    register: ClassVar[Dict[str, Self]] = {}
+    register: ClassVar[WeakValueDictionary[str, Self]] = WeakValueDictionary()
+    """``Symbol.for`` symbols, kept as long as someone holds them, so that the registry of a
+    long-running process does not grow with every key a script makes up"""
+    _register_lock: ClassVar[Lock] = Lock()
     iterator: ClassVar[Self]
 
     def __init__(self, tag: Optional[str] = None) -> None:
@@ -203,13 +346,12 @@ class Symbol(Proxy):
         return f"Symbol({self.tag or ''})"
 
     def __for__(self, key: str):
-        if key not in Symbol.register:
-            Symbol.register[key] = Symbol(key)
-        return Symbol.register[key]
+        with Symbol._register_lock:
+            return Symbol.register.setdefault(key, Symbol(key))
 
     @classmethod
     def keyfor(cls, o: Self):
-        for k, v in cls.register:
+        for k, v in list(cls.register.items()):
             if v is o:
                 return k
 
@@ -217,7 +359,8 @@ class Symbol(Proxy):
 Symbol.iterator = Symbol("Symbol.iterator")
 
 
-class Function(Proxy):
+class Function(Compact):
+    __slots__ = ("__f__", "this")
     this: Proxy
 
     def __init__(self, func: Callable, this: Proxy) -> None:
@@ -243,38 +386,75 @@ class Function(Proxy):
 
 
 class Promise(Proxy):
-    def __init__(self, cb: Callable[[Callable[[Any], None], Callable[[str], None]], Any]) -> None:
+    """A promise. The executor runs at once; reactions run as microtasks of the current
+    event loop, or at once if no loop is running."""
+
+    def __init__(self, cb: Callable[[Callable[[Any], None], Callable[[Any], None]], Any]) -> None:
         super().__init__()
         self.result = None
         self.exc = None
+        self._state = "pending"
+        self._reactions = []
         try:
-            cb(
-                lambda result: setattr(self, "result", result),
-                lambda exc: setattr(self, "exc", exc),
-            )
+            cb(self._resolve, self._reject)
         except BaseException as e:
-            self.exc = e
+            self._reject(e)
+
+    def _resolve(self, result):
+        if self._state != "pending":
+            return
+        if isinstance(result, Promise):
+            result.then(self._resolve, self._reject)
+            return
+        self.result = result
+        self._settle("fulfilled")
+
+    def _reject(self, exc):
+        if self._state != "pending":
+            return
+        self.exc = exc
+        self._settle("rejected")
+
+    def _settle(self, state: str):
+        self._state = state
+        reactions, self._reactions = self._reactions, []
+        for i in reactions:
+            self._schedule(i)
+
+    @staticmethod
+    def _schedule(reaction: Callable[[], None]):
+        if loop := current_loop():
+            loop.queue_microtask(reaction)
+        else:
+            reaction()
 
     def then(
         self,
         resolve: Optional[Union[Function, Callable]] = None,
         reject: Optional[Callable[[BaseException], Any]] = None,
     ):
-        if e := self.exc:
-            if reject:
-                p = Promise(lambda set_result, _: set_result(reject(e)))
-                if isinstance(p.result, Promise):
-                    return p.result
-                return p
-            return self
-
-        if resolve:
-            p = Promise(lambda set_result, _: set_result(resolve(self.result)))
-            if isinstance(p.result, Promise):
-                return p.result
-            return p
-
-        return self
+        def executor(set_result, set_exc):
+            def react():
+                try:
+                    if self._state == "rejected":
+                        if reject:
+                            set_result(reject(self.exc))
+                        else:
+                            set_exc(self.exc)
+                    else:
+                        set_result(resolve(self.result) if resolve else self.result)
+                except BaseException as e:
+                    set_exc(e)
+
+            if self._state == "pending":
+                self._reactions.append(react)
+            else:
+                self._schedule(react)
+
+        return Promise(executor)
+
+    def catch(self, reject: Callable[[BaseException], Any]):
+        return self.then(None, reject)
 
 
 class Array(Proxy):
@@ -351,7 +531,8 @@ class Array(Proxy):
         return self
 
 
-class String(Proxy):
+class String(Compact):
+    __slots__ = ("_s",)
     _s: str
 
     def __init__(self, s: str) -> None:
@@ -366,10 +547,15 @@ class String(Proxy):
     def __len__(self):
         return len(self._s)
 
-    def split(self, sep: Union[str, "RegExp"]):
-        if isinstance(sep, str):
-            return Array(*self._s.split(sep))
-        return Array(*sep.pattern.split(self._s))
+    def split(self, sep: Union[str, Self, "RegExp", None] = None, limit: Optional[int] = None):
+        if limit is not None:
+            limit = int(limit)
+        if sep is None:
+            return Array(*[self._s][:limit])
+        if isinstance(sep, RegExp):
+            return Array(*regexp.split(sep.pattern, self._s, limit))
+        sep = str(sep)
+        return Array(*(list(self._s) if sep == "" else self._s.split(sep))[:limit])
 
     def indexOf(self, sub: Union[str, Self], position: int = 0):
         position = int(position)
@@ -379,18 +565,32 @@ class String(Proxy):
             sub = sub._s
         return self._s.find(sub, position)
 
-    def match(self, reg: "RegExp"):
-        if reg.G:
-            return Array(*reg.pattern.findall(self._s))
-        return reg.exec(self._s)
+    def match(self, reg: Union[str, Self, "RegExp"]):
+        if not isinstance(reg, RegExp):
+            reg = RegExp(reg)
+        if not reg.G:
+            return reg.exec(self._s)
+        reg.lastIndex = 0
+        if found := [m.group() for m in reg.pattern.finditer(self._s)]:
+            return Array(*found)
+        return NULL()
+
+    def replace(self, reg: Union[str, Self, "RegExp"], newstr: Union[str, Self, Function]):
+        """Replace the first match, or all matches of a global regex. A string pattern is
+        matched literally."""
+        if isinstance(reg, RegExp):
+            pattern, count = reg.pattern, 0 if reg.G else 1
+        else:
+            pattern, count = re.compile(re.escape(str(reg))), 1
+        if isinstance(newstr, Function):
+
+            def call(m: re.Match):
+                groups = (Object(**m.groupdict()),) if m.re.groupindex else ()
+                return str(newstr(m.group(), *m.groups(), m.start(), self, *groups))
 
-    def replace(self, reg: Union[str, Self, "RegExp"], newstr: Union[str, Function]):
-        if isinstance(reg, String):
-            reg = reg._s
-        pattern = reg.pattern if isinstance(reg, RegExp) else re.compile(reg)
-        if isinstance(newstr, str):
-            return pattern.sub(newstr, self._s)
-        return pattern.sub(lambda m: str(newstr(m.group(), *m.groups(), m.start(), self)), self._s)
+            return pattern.sub(call, self._s, count)
+        template = str(newstr)
+        return pattern.sub(lambda m: regexp.expand(template, m), self._s, count)
 
     def slice(self, start: int, stop: Optional[int] = None):
         return self._s[slice(start, stop)]
@@ -430,6 +630,8 @@ class ProxyException(Proxy, RuntimeError):
 
     def __init__(self, err: Union[str, BaseException]) -> None:
         if isinstance(err, BaseException):
+            from traceback import format_exception
+
             stack = "".join(format_exception(type(err), err, err.__traceback__))
             super().__init__(err=str(err.args[0]), stack=stack)
         else:
@@ -444,26 +646,49 @@ class ProxyException(Proxy, RuntimeError):
 
 
 class RegExp(Proxy):
-    def __init__(self, pattern: str, modifiers: str = "") -> None:
+    def __init__(
+        self, pattern: Union[str, String, RegExp] = "(?:)", modifiers: Optional[str] = None
+    ) -> None:
         super().__init__()
-        if "g" in modifiers:
-            self.G = True
-            modifiers = modifiers.replace("g", "")
+        if isinstance(pattern, RegExp):
+            source = pattern.source
+            modifiers = pattern.flags if modifiers is None else modifiers
         else:
-            self.G = False
-
-        flags = 0
-        for c in modifiers:
-            flags |= dict(i=re.I, m=re.M)[c]
-
-        self.pattern = re.compile(pattern, flags)
-
-    def exec(self, s: str) -> Union[Array, NULL]:
-        if m := self.pattern.search(s):
-            return Array(m.group(0), *m.groups())
-        return NULL()
+            source = str(pattern)
+        modifiers = "" if modifiers is None else str(modifiers)
+        try:
+            self.pattern = regexp.compile(source, modifiers)
+        except (ValueError, re.error) as e:
+            raise ProxyException(
+                SyntaxError(f"Invalid regular expression: /{source}/{modifiers}: {e}")
+            )
+        self.source = source
+        self.flags = "".join(sorted(modifiers))
+        self.G = self["global"] = "g" in modifiers
+        self.sticky = "y" in modifiers
+        self.ignoreCase = "i" in modifiers
+        self.multiline = "m" in modifiers
+        self.lastIndex = 0
+
+    def exec(self, s: Union[str, String]) -> Union[Array, NULL]:
+        s = str(s)
+        stateful = self.G or self.sticky
+        pos = self.lastIndex if stateful else 0
+        m = None
+        if pos <= len(s):
+            m = self.pattern.match(s, pos) if self.sticky else self.pattern.search(s, pos)
+        if m is None:
+            if stateful:
+                self.lastIndex = 0
+            return NULL()
+        if stateful:
+            self.lastIndex = m.end()
+        r = Array(m.group(), *m.groups())
+        r.index = m.start()
+        r.input = s
+        if m.re.groupindex:
+            r.groups = Object(**m.groupdict())
+        return r
 
     def test(self, s: Union[str, String]):
-        if isinstance(s, String):
-            s = s._s
-        return self.pattern.match(s) is not None
+        return self.exec(s) is not NULL.s
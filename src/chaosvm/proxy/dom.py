@@ -3,19 +3,24 @@ from __future__ import annotations
 import re
 from base64 import b64encode
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple, Union
+from random import Random
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, Union
 from urllib.parse import quote, unquote
 
-from lxml.html import fromstring
-from typing_extensions import Self
-
+from chaosvm.clock import Clock
+from chaosvm.loop import EventLoop, current_loop
 from chaosvm.proxy.builtins import Function
 
 from . import element as ele
 from .builtins import *
 
 if TYPE_CHECKING:
+    from typing_extensions import Self
+
     from chaosvm.stack import ChaosStack
+    from chaosvm.track import Track
+
+    from .light import LightElement
 
 
 class EventTarget:
@@ -34,13 +39,10 @@ class EventTarget:
     ):
         self.__events__[event].append((listener, useCapture))
 
-    def __getattribute__(self, name: str) -> Any:
-        try:
-            return super().__getattribute__(name)
-        except AttributeError:
-            if name in self.__events__:
-                return self.__events__[name][0]
-            raise
+    def _missing(self, name: str):
+        if name in self.__events__:
+            return self.__events__[name][0]
+        return Proxy._missing(self, name)
 
 
 class Location(Proxy):
@@ -63,13 +65,15 @@ class CSSStyleDeclaration(Proxy):
 
 
 class Document(Proxy, EventTarget):
+    _missing = EventTarget._missing
     documentMode = None
     characterSet = "UTF-8"
     cookie = ""
-    location = Location()
+    location: Location
 
     def __init__(self, **kw) -> None:
         super().__init__(**kw)
+        self.location = Location()
         self.documentElement = self.createElement("html")
         self.body = self.createElement("body")
         self.head = self.createElement("head")
@@ -87,6 +91,8 @@ class Document(Proxy, EventTarget):
             )
         ):
             return d[tag]()
+        from lxml.html import fromstring
+
         return ele.HtmlElement(fromstring(f"<{tag}></{tag}>"))
 
     def getElementById(self, name: str):
@@ -98,9 +104,34 @@ class Document(Proxy, EventTarget):
 
     def addEventListener(self, event: str, listener: Function, useCapture: bool = False):
         super().addEventListener(event, listener, useCapture)
-        if event == "mousemove" and self._track:
-            for x, y in self._track:
-                listener(EventTarget.MouseEvent(type="mouseevent", pageX=x, pageY=y))
+        if event == "mousemove" and self._track is not None:
+            from chaosvm.track import feed
+
+            feed(listener, self._track, self._mouse_event, current_loop())
+
+    @staticmethod
+    def _mouse_event(p: tuple):
+        ev = EventTarget.MouseEvent(type="mouseevent", pageX=p[0], pageY=p[1])
+        if len(p) > 2:
+            ev.timeStamp = p[2]
+        return ev
+
+
+class LightDocument(Document):
+    """A :class:`Document` built of :mod:`.light` elements."""
+
+    def createElement(self, tag: str, options=None) -> LightElement:
+        from .light import LIGHT_TAGS, LightElement
+
+        tag = str(tag).lower()
+        return LIGHT_TAGS.get(tag, LightElement)(tag)
+
+    def getElementById(self, name: str):
+        return self.documentElement.get_element_by_id(str(name))
+
+
+DOM_BACKENDS = dict(lxml=Document, light=LightDocument)
+"""document class of each dom backend. ``lxml`` is the reference."""
 
 
 class ServiceWorkerContainer(Proxy):
@@ -109,7 +140,6 @@ class ServiceWorkerContainer(Proxy):
 
 class Navigator(Proxy):
     cookieEnabled = True
-    languages = Array("zh-CN", "en", "en-GB", "en-US")
     userAgent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36 Edg/112.0.1722.64"
     platform = "Win32"
     hardwareConcurrency = 8
@@ -117,7 +147,8 @@ class Navigator(Proxy):
     vendor = "Google Inc."
     appName = "Netscape"
     webdriver = False
-    serviceWorker = ServiceWorkerContainer()
+    languages: Array
+    serviceWorker: ServiceWorkerContainer
 
     class MIDIAccess(Proxy):
         pass
@@ -125,6 +156,11 @@ class Navigator(Proxy):
     # class ServiceWorkerContainer(Proxy):
     #     pass
 
+    def __init__(self, **kw) -> None:
+        super().__init__(**kw)
+        self.languages = Array("zh-CN", "en", "en-GB", "en-US")
+        self.serviceWorker = ServiceWorkerContainer()
+
     def requestMIDIAccess(self, MIDIOptions: Optional[Proxy] = None):
         return Promise(lambda set_result, _: set_result(self.MIDIAccess()))
 
@@ -136,6 +172,7 @@ class Console(Proxy):
 
 class RTCPeerConnection(Proxy):
     _ip = "114.5.1.4"
+    """the local ip in ice candidates. Use :meth:`with_ip` to change it."""
 
     class RPCDataChannel(Proxy):
         def __init__(self, label: str, options: Optional[dict] = None) -> None:
@@ -179,6 +216,11 @@ class RTCPeerConnection(Proxy):
     def setLocalDescription(self, offer):
         self.localDescription = offer
 
+    @classmethod
+    def with_ip(cls, ip: str):
+        """A subclass whose ice candidates carry `ip`, so that each window can have its own."""
+        return type(cls.__name__, (cls,), {"_ip": ip, "__module__": cls.__module__})
+
 
 class Screen(Proxy):
     availHeight = 792
@@ -216,16 +258,17 @@ class MediaQueryList(Proxy):
 
 
 class Window(Proxy, EventTarget):
+    _missing = EventTarget._missing
     TCaptchaReferrer = "https://xui.ptlogin2.qq.com/cgi-bin/xlogin"
     undefined = None
-    document = Document()
-    navigator = Navigator()
-    console = Console()
-    screen = Screen()
-    sessionStorage = SessionStorage()
-    localStorage = SessionStorage()
-    CSS = CSSObjectModel()
-    SyncManager = SyncManager()
+    document: Document
+    navigator: Navigator
+    console: Console
+    screen: Screen
+    sessionStorage: SessionStorage
+    localStorage: SessionStorage
+    CSS: CSSObjectModel
+    SyncManager: SyncManager
 
     innerWidth = 300
     innerHeight = 230
@@ -246,15 +289,62 @@ class Window(Proxy, EventTarget):
     TDC: TDC
     __TENCENT_CHAOS_STACK: ChaosStack
     top: Self
+    _encoded: Optional[Tuple[str, str]] = None
+    """the last ``encodeURIComponent`` call, as the result and its argument"""
 
-    def __init__(self, top=True) -> None:
+    def __init__(
+        self,
+        top=True,
+        rng: Optional[Random] = None,
+        clock: Optional[Clock] = None,
+        dom: Optional[str] = None,
+    ) -> None:
+        """
+        :param rng: source of ``Math.random`` in this window.
+        :param clock: time source of ``Date`` and timers in this window, default as the
+            wall clock.
+        :param dom: backend of the document, a key of :obj:`DOM_BACKENDS`. Default is lxml.
+
+        A window shares no mutable state with other windows, so that windows can run in
+        threads, see :mod:`chaosvm.executor`. An iframe window, with `top` false, takes
+        ``top`` from the window whose loop is running.
+        """
         super().__init__()
-        if top:
-            self.__class__.top = self
+        if top or (loop := current_loop()) is None or loop.window is None:
+            self.top = self
+        else:
+            self.top = loop.window.top
+        self._environment(dom)
+        self._loop = EventLoop(clock)
+        self._loop.window = self
+        if rng:
+            self.Math = Math.with_rng(rng)
+        self.Date = Date.with_clock(self._loop.clock)
+
+    def _environment(self, dom: Optional[str]):
+        """Create the emulated browser objects of this window: document, navigator and so on."""
+        self.document = DOM_BACKENDS[dom or "lxml"]()
+        self.navigator = Navigator()
+        self.console = Console()
+        self.screen = Screen()
+        self.sessionStorage = SessionStorage()
+        self.localStorage = SessionStorage()
+        self.CSS = CSSObjectModel()
+        self.SyncManager = SyncManager()
 
     def __repr__(self):
+        if self.top is None:
+            return "<Window (released)>"
         return "<Window>" if self.top is self else "<Window (Iframe)>"
 
+    def _release(self):
+        """Drop everything this window holds: its document, globals of the script, the vm
+        functions and pending tasks. The window cannot be used afterwards."""
+        self._loop.close()
+        self.__dict__.clear()
+        self.__events__ = defaultdict(list)
+        self.top = None
+
     @property
     def window(self):
         return self
@@ -266,14 +356,19 @@ class Window(Proxy, EventTarget):
     def btoa(self, s: str):
         return b64encode(s.encode()).decode()
 
-    def setTimeout(self, cb: Function, ms: float):
-        cb()
+    def setTimeout(self, cb: Function, ms: float = 0, *args):
+        return self._loop.call_later(ms, cb, *args)
 
     def setInterval(self, func: Function, delay=0, *args):
-        func(*args)
+        return self._loop.call_later(delay, func, *args, interval=delay)
+
+    def clearTimeout(self, tid):
+        self._loop.cancel(tid)
+
+    clearInterval = clearTimeout
 
-    def clearInterval(self, tid):
-        return
+    def queueMicrotask(self, cb: Function):
+        self._loop.queue_microtask(cb)
 
     def parseInt(self, s: str, base: int):
         s = re.split(r"[^\d]", s, maxsplit=1)[0]
@@ -282,7 +377,9 @@ class Window(Proxy, EventTarget):
     def encodeURIComponent(self, s: Union[str, String]):
         if isinstance(s, String):
             s = s._s
-        return String(quote(s))
+        # remembered so that the payload can be decoded without unquoting, see Session.result
+        self._encoded = r = quote(s), s
+        return String(r[0])
 
     def getComputedStyle(self, element: ele.HtmlElement, pseudoElt=None):
         return CSSStyleDeclaration(element)
@@ -290,7 +387,9 @@ class Window(Proxy, EventTarget):
     def matchMedia(self, mediaQueryString: str):
         return MediaQueryList(matches="no-preference" in mediaQueryString)
 
-    def add_mouse_track(self, track: List[Tuple[int, int]]):
+    def add_mouse_track(self, track: Track):
+        """Feed `track` to ``mousemove`` listeners. It can be a list, an iterator or an array
+        of ``(x, y)`` or ``(x, y, t)`` points, see :mod:`chaosvm.track`."""
         self.document._track = track
 
     def decodeURIComponent(self, encodedURI: Union[str, String]):
@@ -0,0 +1,221 @@
+"""A lightweight DOM backend.
+
+Nodes and attributes are plain Python structures. lxml is only imported when markup is parsed
+(``innerHTML = ...``) or serialized (``innerHTML``, ``outerHTML``), and the lxml tree is built
+from the light nodes at that moment. The lxml backend in :mod:`.element` is the reference.
+"""
+
+from __future__ import annotations
+
+from copy import copy
+from typing import Dict, List, Optional, Union
+
+from .builtins import NULL, Compact, Proxy
+from .element import (
+    Canvas,
+    CSSStyleDeclaration,
+    CSSStyleSheet,
+    DOMRect,
+    Iframe,
+    Style,
+    Video,
+)
+
+Child = Union["LightElement", str]
+
+
+class LightElement(Compact):
+    __slots__ = ("_tag", "_attrib", "_children", "_parent", "style", "children")
+    _tag: str
+    _attrib: Dict[str, str]
+    _children: List[Child]
+    _parent: Optional[LightElement]
+    style: CSSStyleDeclaration
+
+    def __init__(self, tag: str, attrib: Optional[Dict[str, str]] = None, **kw) -> None:
+        object.__setattr__(self, "_tag", tag)
+        object.__setattr__(self, "_attrib", {})
+        object.__setattr__(self, "_children", [])
+        object.__setattr__(self, "_parent", None)
+        # skip the lxml constructors of the reference element classes
+        Proxy.__init__(self, children=[], **kw)
+        self._attrib.update(attrib or {})
+        object.__setattr__(self, "style", CSSStyleDeclaration())
+
+    @property
+    def tag(self):
+        return self._tag
+
+    def __getattribute__(self, name: str | float):
+        # not super(), which is the lxml element in subclasses
+        if (r := Proxy.__getattribute__(self, name)) is None:
+            return self._attrib.get(str(name)) or self.style[name]
+        return r
+
+    def __setattr__(self, name: str | float, v):
+        self._attrib[str(name)] = str(v)
+        return v
+
+    def __delattr__(self, name: str | float):
+        return self._attrib.pop(str(name))
+
+    def __contains__(self, name: str | float):
+        return name in self._attrib or name in self.style
+
+    def _adopt(self, o: Child) -> Child:
+        if isinstance(o, LightElement):
+            if o._parent is not None:
+                o._parent._children.remove(o)
+            object.__setattr__(o, "_parent", self)
+        return o
+
+    def appendChild(self, o: Child):
+        self._children.append(self._adopt(o))
+        if isinstance(o, LightElement):
+            return o
+
+    def remove(self):
+        if self._parent is not None:
+            self._parent._children.remove(self)
+            object.__setattr__(self, "_parent", None)
+
+    def removeChild(self, o: LightElement):
+        self._children.remove(o)
+        object.__setattr__(o, "_parent", None)
+
+    def cloneNode(self, deep=False):
+        o = self.__class__(self._tag, self._attrib)
+        object.__setattr__(o, "style", copy(self.style))
+        if deep:
+            for i in self._children:
+                o.appendChild(i.cloneNode(True) if isinstance(i, LightElement) else i)
+        return o
+
+    def insertBefore(self, node: LightElement, ref: Union[LightElement, NULL]):
+        if ref is NULL.s:
+            return self.appendChild(node)
+        self._adopt(node)
+        self._children.insert(self._children.index(ref), node)
+        return node
+
+    def replaceChild(self, new: LightElement, old: LightElement):
+        self._adopt(new)
+        self._children[self._children.index(old)] = new
+        object.__setattr__(old, "_parent", None)
+        return old
+
+    def setAttribute(self, name: str, value):
+        self._attrib[name] = str(value)
+
+    def removeAttribute(self, name: str):
+        del self._attrib[name]
+
+    def getBoundingClientRect(self):
+        x, y, w, h = [self.style[k] for k in ["left", "top", "width", "height"]]
+        x, y, w, h = [int(k[:2]) if k else 0 for k in [x, y, w, h]]
+        return DOMRect(x=x, left=x, y=y, top=y, width=w, height=h, right=x + w, bottom=y + h)
+
+    @property
+    def offsetLeft(self):
+        if i := self.style.left:
+            return int(i[:2])
+        return 0
+
+    def iter(self):
+        """Iterate over this element and its descendant elements in document order."""
+        yield self
+        for i in self._children:
+            if isinstance(i, LightElement):
+                yield from i.iter()
+
+    def get_element_by_id(self, id: str, default=None):
+        return next((i for i in self.iter() if i._attrib.get("id") == id), default)
+
+    def materialize(self):
+        """Build the lxml tree of this element."""
+        from lxml.html import html_parser
+
+        e = html_parser.makeelement(self._tag, self._attrib)
+        last = None
+        for i in self._children:
+            if isinstance(i, LightElement):
+                e.append(last := i.materialize())
+            elif last is None:
+                e.text = (e.text or "") + i
+            else:
+                last.tail = (last.tail or "") + i
+        return e
+
+    @classmethod
+    def from_lxml(cls, e) -> LightElement:
+        """Convert an lxml element, without its tail, into light nodes."""
+        o = LIGHT_TAGS.get(e.tag, LightElement)(e.tag, dict(e.attrib))
+        if e.text:
+            o.appendChild(e.text)
+        for i in e.iterchildren():
+            o.appendChild(cls.from_lxml(i))
+            if i.tail:
+                o.appendChild(i.tail)
+        return o
+
+    @property
+    def innerHTML(self) -> str:
+        from lxml.html import tostring
+
+        e = self.materialize()
+        s = bytearray(e.text.encode()) if e.text else bytearray()
+        for i in e.iterchildren():
+            s += tostring(i)
+        return s.decode()
+
+    @innerHTML.setter
+    def innerHTML(self, s: str):
+        from lxml.html import fragments_fromstring
+
+        self._children.clear()
+        for i in fragments_fromstring(s):
+            if isinstance(i, str):
+                self.appendChild(i)
+                continue
+            self.appendChild(LightElement.from_lxml(i))
+            if i.tail:
+                self.appendChild(i.tail)
+
+    @property
+    def outerHTML(self) -> str:
+        from lxml.html import tostring
+
+        return tostring(self.materialize()).decode()
+
+
+class LightVideo(LightElement, Video):
+    def __init__(self, tag="video", attrib: Optional[Dict[str, str]] = None, **kw) -> None:
+        if attrib is None:
+            attrib = dict(id="preview", width="160", height="120", autoplay="", muted="")
+        super().__init__(tag, attrib, **kw)
+
+
+class LightStyle(LightElement, Style):
+    def __init__(self, tag="style", attrib: Optional[Dict[str, str]] = None, **kw) -> None:
+        kw.setdefault("sheet", CSSStyleSheet())
+        super().__init__(tag, attrib, **kw)
+
+
+class LightIframe(LightElement, Iframe):
+    def __init__(self, tag="iframe", attrib: Optional[Dict[str, str]] = None, **kw) -> None:
+        super().__init__(tag, attrib, **kw)
+
+    @property
+    def contentWindow(self):
+        from .dom import Window
+
+        return Window(top=False, dom="light")
+
+
+class LightCanvas(LightElement, Canvas):
+    def __init__(self, tag="canvas", attrib: Optional[Dict[str, str]] = None, **kw) -> None:
+        super().__init__(tag, attrib, **kw)
+
+
+LIGHT_TAGS = dict(canvas=LightCanvas, iframe=LightIframe, style=LightStyle, video=LightVideo)
+"""tags with their own element class"""
@@ -0,0 +1,187 @@
+"""Translation of JS regular expressions to :mod:`re`.
+
+:func:`translate` rewrites the syntax that differs between the two: named groups and
+backreferences, JS escapes, ``[^]``, and the ASCII meaning of ``\\d``, ``\\w``, ``\\b`` and
+``$``. :func:`compile` keeps the most recently used patterns, keyed by the JS source and
+flags, so a script constructing the same ``RegExp`` again does not translate it again.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import List, Match, Optional, Pattern, Tuple
+
+FLAGS = dict(i=re.I, m=re.M, s=re.S)
+"""JS flags with a python counterpart"""
+JS_FLAGS = frozenset("dgimsuvy")
+"""all JS flags. ``g`` and ``y`` are handled by the caller, ``d``, ``u`` and ``v`` need no flag"""
+
+SPACE = r"\t\n\v\f\r \u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+CLASS_ESCAPES = dict(d="0-9", w="A-Za-z0-9_", s=SPACE)
+"""JS character class escapes, as the content of a python set"""
+BOUNDARY = r"(?:(?<![A-Za-z0-9_])(?=[A-Za-z0-9_])|(?<=[A-Za-z0-9_])(?![A-Za-z0-9_]))"
+NOT_BOUNDARY = r"(?:(?<![A-Za-z0-9_])(?![A-Za-z0-9_])|(?<=[A-Za-z0-9_])(?=[A-Za-z0-9_]))"
+LINE_END = r"\n\r\u2028\u2029"
+SAME_ESCAPES = frozenset("tnrvf")
+"""escapes meaning the same in python"""
+
+_HEX = re.compile(r"[0-9A-Fa-f]+")
+
+
+def _flags(flags: str) -> int:
+    if set(flags) - JS_FLAGS or len(set(flags)) != len(flags):
+        raise ValueError(f"invalid flags {flags!r}")
+    r = 0
+    for c in flags:
+        r |= FLAGS.get(c, 0)
+    return r
+
+
+def _escape(source: str, i: int, in_class: bool, flags: str) -> Tuple[str, int]:
+    """Translate the escape at ``source[i] == "\\\\"``. Return it and the index after it."""
+    if i + 1 >= len(source):
+        raise ValueError("\\ at end of pattern")
+    e, i = source[i + 1], i + 2
+    if e in CLASS_ESCAPES:
+        return (CLASS_ESCAPES[e] if in_class else f"[{CLASS_ESCAPES[e]}]"), i
+    if e in "DWS":
+        return ("\\" + e if in_class else f"[^{CLASS_ESCAPES[e.lower()]}]"), i
+    if e == "b":
+        return (r"\x08" if in_class else BOUNDARY), i
+    if e == "B" and not in_class:
+        return NOT_BOUNDARY, i
+    if e == "k" and source.startswith("<", i):
+        end = source.index(">", i)
+        return f"(?P={source[i + 1 : end]})", end + 1
+    if e == "u":
+        if source.startswith("{", i) and "u" in flags:
+            end = source.index("}", i)
+            return f"\\U{int(source[i + 1 : end], 16):08x}", end + 1
+        if (m := _HEX.match(source, i, i + 4)) and m.end() == i + 4:
+            return "\\u" + m.group(), i + 4
+        return "u", i
+    if e == "x":
+        if (m := _HEX.match(source, i, i + 2)) and m.end() == i + 2:
+            return "\\x" + m.group(), i + 2
+        return "x", i
+    if e == "c" and i < len(source) and source[i].isalpha():
+        return f"\\x{ord(source[i]) % 32:02x}", i + 1
+    if e == "0" and not source[i : i + 1].isdigit():
+        return r"\x00", i
+    if e.isdigit():
+        return "\\" + e, i
+    if e in "pP" and "u" in flags:
+        raise ValueError("unicode property escapes are not supported")
+    if e in SAME_ESCAPES:
+        return "\\" + e, i
+    # identity escapes, e.g. \/ or \a
+    return re.escape(e), i
+
+
+def translate(source: str, flags: str = "") -> Tuple[str, int]:
+    """Translate a JS regex into a python pattern and python flags.
+
+    :raises ValueError: on invalid flags or unsupported syntax.
+    """
+    pyflags = _flags(flags)
+    dotall, multiline = "s" in flags, "m" in flags
+    out: List[str] = []
+    i, n, in_class = 0, len(source), False
+    while i < n:
+        c = source[i]
+        if c == "\\":
+            t, i = _escape(source, i, in_class, flags)
+            out.append(t)
+            continue
+        if in_class:
+            if c == "]":
+                in_class = False
+            # python warns about set operations, which JS does not have
+            out.append("\\" + c if c in "[&~|" else c)
+        elif c == "[":
+            if source.startswith("[^]", i):
+                out.append(r"[\s\S]")
+                i += 3
+                continue
+            if source.startswith("[]", i):
+                out.append("(?!)")
+                i += 2
+                continue
+            in_class = True
+            if source.startswith("[^", i):
+                out.append("[^")
+                i += 1
+            else:
+                out.append("[")
+        elif c == "(" and source.startswith("(?<", i) and source[i + 3 : i + 4] not in "=!":
+            out.append("(?P<")
+            i += 3
+            continue
+        elif c == "$" and not multiline:
+            out.append(r"\Z")
+        elif c == "." and not dotall:
+            out.append(f"[^{LINE_END}]")
+        else:
+            out.append(c)
+        i += 1
+    return "".join(out), pyflags
+
+
+@lru_cache(maxsize=256)
+def compile(source: str, flags: str = "") -> Pattern[str]:
+    """Compile a JS regex. The most recently used patterns are cached.
+
+    :raises ValueError: on invalid flags or unsupported syntax.
+    :raises re.error: if the translated pattern does not compile.
+    """
+    return re.compile(*translate(source, flags))
+
+
+_TEMPLATE = re.compile(r"\$(?:(\$)|(&)|(`)|(')|(\d\d?)|<([^>]*)>)")
+
+
+def expand(template: str, m: Match[str]) -> str:
+    """Expand a JS replacement template, e.g. ``$1`` or ``$<name>``, for the match `m`."""
+    if "$" not in template:
+        return template
+
+    def sub(t: Match[str]) -> str:
+        if t.group(1):
+            return "$"
+        if t.group(2):
+            return m.group()
+        if t.group(3):
+            return m.string[: m.start()]
+        if t.group(4):
+            return m.string[m.end() :]
+        if (d := t.group(5)) is not None:
+            if len(d) == 2 and 1 <= int(d) <= m.re.groups:
+                return m.group(int(d)) or ""
+            if 1 <= int(d[0]) <= m.re.groups:
+                return (m.group(int(d[0])) or "") + d[1:]
+            return t.group()
+        if not m.re.groupindex:
+            return t.group()
+        return m.groupdict().get(t.group(6)) or ""
+
+    return _TEMPLATE.sub(sub, template)
+
+
+def split(pattern: Pattern[str], s: str, limit: Optional[int] = None) -> List[Optional[str]]:
+    """``String.prototype.split`` by a regex, which never splits on an empty match at the
+    position of the last split."""
+    if not s:
+        return [] if pattern.match(s) else [s]
+    r: List[Optional[str]] = []
+    p = q = 0
+    while q < len(s):
+        m = pattern.match(s, q)
+        if m is None or m.end() == p:
+            q += 1
+            continue
+        r.append(s[p:q])
+        r.extend(m.groups())
+        p = q = m.end()
+    r.append(s[p:])
+    return r if limit is None else r[:limit]
@@ -0,0 +1,157 @@
+"""``JSON.stringify`` of proxy object graphs.
+
+The graph is walked iteratively into plain lists and dicts, which the C encoder of :mod:`json`
+writes in one go. The walk has a stack of arrays and objects to fill instead of recursing; the
+encoder nests as deep as the interpreter allows, beyond which an error is raised, as
+a JS engine does. The JS rules followed:
+
+- ``toJSON`` of a value is called with its key, and its result is serialized instead.
+- ``undefined`` (``None``), functions, symbols and python objects with no JS meaning are
+  skipped in objects and written as ``null`` in arrays. At the top level, nothing is returned.
+- Keys of an object are in JS order: array indices ascending, then the others as inserted.
+  Keys starting with ``_`` are python internals and are skipped.
+- ``NaN`` and infinities are ``null``, integral numbers have no fraction. Other numbers are
+  written by python, which differs from JS only in the exponent of those below ``1e-4``.
+- A cycle raises a ``TypeError``.
+
+The separators and the escaping of non-ASCII characters are those of :func:`json.dumps`, which
+``JSON.stringify`` used to be, so that payloads do not change.
+"""
+
+from __future__ import annotations
+
+from json import JSONEncoder
+from math import isfinite
+from typing import Any, Dict, List, Optional, Tuple
+
+from .builtins import NULL, Array, Function, Number, Proxy, ProxyException, String, Symbol
+
+SKIP = object()
+"""a value which is skipped in objects and ``null`` in arrays"""
+
+_encode = JSONEncoder(check_circular=False, allow_nan=False).encode
+_vars = object.__getattribute__
+_PLAIN = frozenset((str, int, bool))
+
+Chain = Optional[Tuple[int, Any]]
+"""ids of the containers from a value up to the root, as a linked list"""
+
+
+def _index(k: str) -> bool:
+    return k.isascii() and k.isdigit() and (k == "0" or k[0] != "0")
+
+
+def _keys(d: Dict[str, Any]) -> List[str]:
+    keys = [k for k in d if type(k) is str and not k.startswith("_")]
+    if any(_index(k) for k in keys):
+        indices = sorted((k for k in keys if _index(k)), key=int)
+        keys = indices + [k for k in keys if not _index(k)]
+    return keys
+
+
+def _items(d: Dict[str, Any]) -> List[Any]:
+    """Items of an ``Array`` from its dict, with holes as ``None``."""
+    if list(d) == list(map(str, range(len(d)))):
+        # built in order, e.g. by push, with no other property
+        return list(d.values())
+    n = max(map(int, filter(_index, d)), default=-1) + 1
+    return list(map(d.get, map(str, range(n))))
+
+
+def _number(f: float):
+    if not isfinite(f):
+        return None
+    if f.is_integer() and abs(f) < 1e21:
+        return int(f)
+    return f
+
+
+class _Walk:
+    def __init__(self) -> None:
+        self.todo: List[Tuple[Any, Any, Chain]] = []
+        """containers to fill: the plain list or dict, the value, and its chain"""
+        self.seen = set()
+
+    def plain(self, v: Any, key: str, chain: Chain) -> Any:
+        """Convert `v` into a python value, or :data:`SKIP`. Arrays and objects are returned
+        empty and are filled later."""
+        t = type(v)
+        if t in _PLAIN:
+            return v
+        if t is String:
+            return _vars(v, "_s")
+        if t is float:
+            return _number(v)
+        if v is None:
+            return SKIP
+        if v is NULL.s:
+            return None
+        if t is Number:
+            return _number(_vars(v, "_i"))
+        if isinstance(v, Proxy):
+            d = _vars(v, "__dict__")
+            if "toJSON" in d:
+                return self.plain(d["toJSON"](key), key, chain)
+            if (to_json := getattr(t, "toJSON", None)) is not None:
+                return self.plain(to_json(v, key), key, chain)
+            if isinstance(v, (Function, Symbol)):
+                return SKIP
+        elif not isinstance(v, (list, tuple, dict)):
+            # functions, classes and other python objects
+            return SKIP
+
+        if (i := id(v)) in self.seen:
+            c = chain
+            while c is not None:
+                if c[0] == i:
+                    raise ProxyException(TypeError("Converting circular structure to JSON"))
+                c = c[1]
+        self.seen.add(i)
+        r = [] if isinstance(v, (Array, list, tuple)) else {}
+        self.todo.append((r, v, (i, chain)))
+        return r
+
+    def fill_array(self, r: list, v: Any, chain: Chain):
+        if isinstance(v, Array):
+            v = _items(_vars(v, "__dict__"))
+        if _PLAIN.issuperset(map(type, v)):
+            r.extend(v)
+            return
+        for i, x in enumerate(v):
+            if type(x) not in _PLAIN:
+                x = self.plain(x, str(i), chain)
+                if x is SKIP:
+                    x = None
+            r.append(x)
+
+    def fill_object(self, r: dict, v: Any, chain: Chain):
+        d = v if type(v) is dict else _vars(v, "__dict__")
+        for k in _keys(d):
+            x = d[k]
+            if type(x) not in _PLAIN:
+                x = self.plain(x, k, chain)
+                if x is SKIP:
+                    continue
+            r[k] = x
+
+
+def stringify(value: Any) -> Optional[str]:
+    """``JSON.stringify(value)``. ``None`` stands for ``undefined``.
+
+    :raises ProxyException: on a cycle, or if `value` nests too deep.
+    """
+    walk = _Walk()
+    root = walk.plain(value, "", None)
+    if root is SKIP:
+        return None
+    todo = walk.todo
+    while todo:
+        r, v, chain = todo.pop()
+        if type(r) is list:
+            walk.fill_array(r, v, chain)
+        else:
+            walk.fill_object(r, v, chain)
+    try:
+        return _encode(root)
+    except RecursionError:
+        raise ProxyException(RecursionError("Maximum call stack size exceeded"))
@@ -0,0 +1,112 @@
+"""Quickening of arithmetic and comparison sites, after PEP 659.
+
+A site is the pc of an ``add``, ``geq``, ``refeq`` or a bitwise handler. A :class:`Quickening`
+keeps the handler of every pc of a program, so the vm dispatches on ``code[pc]`` instead of
+looking the opcode up in the opmap. A site starts at the ``adaptive`` handler. Once it has run
+:attr:`Quickening.warmup` times, it is rewritten to the handler specialized for the operand
+types it sees then, e.g. ``add_int`` for two ints, which skips the type checks of ``add``. Each
+specialized handler guards its types. On a miss the site is rewritten to the generic handler,
+for good, since a site seeing several types is likely to see them again.
+
+``div`` is not specialized: it has no type dispatch to skip. Nor are ``sub``, ``mul``, ``mod``
+and ``ge``, which are a bare operator already.
+
+A frame of a vm class that overrides a specializable handler is not quickened, so that the
+override is always run.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+from chaosvm import metrics
+from chaosvm.vm import QUICK_OPS, BuiltinOps
+
+_NUMBERS = (int, float)
+
+SPECIALIZATIONS: Dict[str, Dict[Tuple[type, type], str]] = {
+    "add": {
+        (int, int): "add_int",
+        (str, str): "add_str",
+        **{(a, b): "add_num" for a in _NUMBERS for b in _NUMBERS if float in (a, b)},
+    },
+    "geq": {(a, b): "geq_num" for a in _NUMBERS for b in _NUMBERS},
+    "refeq": {(int, int): "refeq_int", (str, str): "refeq_str"},
+    "bitand": {(int, int): "bitand_int"},
+    "bitor": {(int, int): "bitor_int"},
+    "xor": {(int, int): "xor_int"},
+    "lshift": {(int, int): "lshift_int"},
+    "rshift": {(int, int): "rshift_int"},
+    "urshift": {(int, int): "urshift_int"},
+}
+"""specialized handler by the generic handler, and the types of its two operands"""
+
+
+@lru_cache(maxsize=None)
+def quickenable(vm: type) -> bool:
+    """Whether `vm` runs the specializable handlers of :class:`~chaosvm.vm.BuiltinOps`."""
+    return all(getattr(vm, name) is getattr(BuiltinOps, name) for name in SPECIALIZATIONS)
+
+
+class Quickening:
+    """Handlers of each pc of a program, rewritten as the program runs.
+
+    :param opcode: the program.
+    :param opmap: its opcode mapping.
+    :param warmup: runs of a site before it is specialized.
+    """
+
+    def __init__(self, opcode: Sequence[int], opmap: Dict[int, int], warmup: int = 2) -> None:
+        from chaosvm.disasm import op_names
+
+        self.names = op_names() + QUICK_OPS
+        """handler names by index, generic ones first"""
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.warmup = warmup
+        adaptive, unmapped = self.index["adaptive"], self.index["unmapped"]
+        generic = {
+            code: adaptive if self.names[i] in SPECIALIZATIONS else i for code, i in opmap.items()
+        }
+        self.code: List[int] = [generic.get(c, unmapped) for c in opcode]
+        """handler index of each pc"""
+        self.warm: Dict[int, int] = {}
+        """runs of the adaptive sites"""
+        self.specialized = self.deoptimized = 0
+
+    accepts = staticmethod(quickenable)
+
+    def adapt(self, vm: BuiltinOps, site: int) -> str:
+        """Count a run of `site`, and specialize it if it is warm.
+
+        :return: name of the generic handler of the site.
+        """
+        name = self.names[vm.opmap[vm.opcode[site]]]
+        if (n := self.warm.get(site, 0) + 1) < self.warmup:
+            self.warm[site] = n
+            return name
+        self.warm.pop(site, None)
+        types = type(vm.stack[-2]), type(vm.stack[-1])
+        if (special := SPECIALIZATIONS[name].get(types)) is None:
+            self.code[site] = self.index[name]
+            return name
+        self.code[site] = self.index[special]
+        self.specialized += 1
+        metrics.count("chaosvm_specializations_total")
+        return name
+
+    def deopt(self, vm: BuiltinOps, site: int) -> str:
+        """Rewrite `site` to its generic handler, after a guard of its specialized one failed.
+
+        :return: name of the generic handler.
+        """
+        name = self.names[vm.opmap[vm.opcode[site]]]
+        self.code[site] = self.index[name]
+        self.deoptimized += 1
+        metrics.count("chaosvm_deoptimizations_total")
+        return name
+
+    def sites(self) -> Dict[int, str]:
+        """Specialized sites and their handlers."""
+        first = self.index[QUICK_OPS[2]]
+        return {pc: self.names[i] for pc, i in enumerate(self.code) if i >= first}
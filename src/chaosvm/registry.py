@@ -0,0 +1,189 @@
+"""Opmaps of known ``__TENCENT_CHAOS_VM`` templates.
+
+tdc.js is rotated often, but most rotations only change the opcode payload, the order of the
+op functions and the names of the template identifiers: each op function stays the same but
+for its names. The opmap depends on nothing else, so it can be looked up by a fingerprint of
+the template source instead of hashing the syntax of every op function again.
+
+The fingerprint of a template is a hash of each of its op functions, with the vm parameters
+named as in :func:`~chaosvm.parse.parse_opcode_mapping` and other single letter identifiers
+named by their first appearance, as :func:`~chaosvm.stxhash.syntax_hash` does. The registry
+keeps the handler of each op hash, so a rotated template resolves if it only has op functions
+seen before, in any order.
+
+.. code-block:: python
+
+    registry = OpmapRegistry("opmaps.json")
+    tdc = prepare(js_vm, ip, registry=registry)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from hashlib import sha256
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+TEMPLATE = "function __TENCENT_CHAOS_VM("
+VERSION = 2
+"""format of the registry file"""
+
+
+_TOKEN = re.compile(r"""[{}]|'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`""", re.S)
+"""a brace or a string literal"""
+_LEXEME = re.compile(
+    r"""\s+|'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`"""
+    r"""|\d[\w.]*|[A-Za-z_$][\w$]*|\S""",
+    re.S,
+)
+"""a token of an op function, or white space"""
+_OPS = re.compile(r"\((\s*[\w$]+(?:\s*,\s*[\w$]+){3})\s*\)\s*\{\s*var\s+[\w$]+\s*=\s*\[")
+"""the parameters of the template, up to its list of op functions"""
+
+Fingerprint = Tuple[Optional[str], ...]
+"""hash of each op function of a template, ``None`` for a hole"""
+
+
+def template_source(js_vm: str) -> Optional[str]:
+    """Source text of the ``__TENCENT_CHAOS_VM`` declaration in `js_vm`, found by matching
+    braces outside string literals. ``None`` if it is not found."""
+    start = js_vm.find(TEMPLATE)
+    if start < 0:
+        return None
+    depth = 0
+    for m in _TOKEN.finditer(js_vm, start):
+        if m.group() == "{":
+            depth += 1
+        elif m.group() == "}":
+            depth -= 1
+            if depth == 0:
+                return js_vm[start : m.end()]
+    return None
+
+
+def op_sources(template: str) -> Optional[Tuple[List[str], List[Optional[List[str]]]]]:
+    """The parameters of a template, and the tokens of each of its op functions, ``None`` for
+    a hole. ``None`` if the template is not laid out as expected."""
+    if (m := _OPS.match(template, len(TEMPLATE) - 1)) is None:
+        return None
+    params = [i.strip() for i in m.group(1).split(",")]
+    ops: List[Optional[List[str]]] = []
+    op: List[str] = []
+    depth = 0
+    for t in _LEXEME.finditer(template, m.end()):
+        c = t.group()
+        if c.isspace():
+            continue
+        if depth == 0 and c in ",]":
+            ops.append(op or None)
+            if c == "]":
+                return params, ops
+            op = []
+            continue
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        op.append(c)
+    return None
+
+
+def _normalize(tokens: List[str], params: List[str]) -> str:
+    names = dict(zip(params, ["p", "P", "window", "S"]))
+    out: List[str] = []
+    for i, t in enumerate(tokens):
+        if len(t) == 1 and (t.isalpha() or t in "_$") and (not i or tokens[i - 1] != "."):
+            t = names.setdefault(t, f"t{len(names) - 4}")
+        if (
+            out
+            and (out[-1][-1].isalnum() or out[-1][-1] in "_$")
+            and (t[0].isalnum() or t[0] in "_$")
+        ):
+            out.append(" ")
+        out.append(t)
+    return "".join(out)
+
+
+def fingerprint(js_vm: str) -> Optional[Fingerprint]:
+    """Fingerprint of the vm template of `js_vm`, or ``None`` if it has no template."""
+    if (src := template_source(js_vm)) is None or (found := op_sources(src)) is None:
+        return None
+    params, ops = found
+    return tuple(
+        None if op is None else sha256(_normalize(op, params).encode()).hexdigest()[:32]
+        for op in ops
+    )
+
+
+class OpmapRegistry:
+    """Handlers of op functions by their hash, persisted as json if a `path` is given.
+
+    The file is read when the registry is created, and rewritten whenever an op function is
+    recorded.
+
+    :param path: the registry file. It is created on the first record if not exists.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None) -> None:
+        self.path = None if path is None else Path(path)
+        self._ops: Dict[str, int] = {}
+        self.hits = self.misses = 0
+        if self.path and self.path.exists():
+            self._load(self.path)
+
+    def _load(self, path: Path):
+        data = json.loads(path.read_text(encoding="utf8"))
+        if data.get("version") != VERSION:
+            return
+        self._ops.update(data["ops"])
+
+    def save(self):
+        """Write the registry file atomically."""
+        if self.path is None:
+            return
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(dict(version=VERSION, ops=self._ops)), encoding="utf8")
+        os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        """op functions known"""
+        return len(self._ops)
+
+    def __contains__(self, fp: Fingerprint) -> bool:
+        return all(h is None or h in self._ops for h in fp)
+
+    def get(self, fp: Fingerprint) -> Optional[Dict[int, int]]:
+        """The opmap of a template, if all of its op functions are known."""
+        try:
+            return {i: self._ops[h] for i, h in enumerate(fp) if h is not None}
+        except KeyError:
+            return None
+
+    def record(self, fp: Fingerprint, opmap: Dict[int, int]):
+        """Record the op functions of a template, and save the registry if any is new. Nothing
+        is recorded if the op functions of `fp` are not those of `opmap`."""
+        if {i for i, h in enumerate(fp) if h is not None} != opmap.keys():
+            return
+        new = {h: opmap[i] for i, h in enumerate(fp) if h is not None and h not in self._ops}
+        self._ops.update(new)
+        if new:
+            self.save()
+
+    def resolve(
+        self, fp: Optional[Fingerprint], compute: Callable[[], Dict[int, int]]
+    ) -> Dict[int, int]:
+        """The opmap of the template `fp`. On a miss, it is computed and recorded.
+
+        :param fp: template fingerprint. ``None`` is never cached.
+        :param compute: computes the opmap, i.e. :func:`~chaosvm.parse.parse_opcode_mapping`.
+        """
+        if fp is not None and (opmap := self.get(fp)) is not None:
+            self.hits += 1
+            return opmap
+        self.misses += 1
+        opmap = compute()
+        if fp is not None:
+            self.record(fp, opmap)
+        return opmap
@@ -0,0 +1,632 @@
+"""Record the interactions of a script with the emulated browser, and replay them.
+
+The host is what a script reaches through its window, except the JS builtins: document,
+navigator, screen, storages, canvas, WebGL, RTC and so on. For a fixed script and profile the
+host answers the same every time, so a :class:`Recorder` logs its answers on a :class:`Tape`,
+and a :class:`Replayer` feeds them back later to a :class:`ReplayWindow`, which creates no
+document at all.
+
+A tape holds, in order:
+
+- the vm reading, writing, deleting or testing a property of a host object, calling it,
+  ``new``-ing it, iterating it, or taking its ``typeof`` or truthiness, and the outcome;
+- the host calling back into the vm during one of the above, e.g. an event listener;
+- the host scheduling a task on the event loop, and the task running.
+
+Values from the host are kept as they are if primitive, and as handles otherwise. Values from
+the vm are checked on replay: primitives by value, objects by the order in which the vm first
+handed them to the host. So the host must not read into the objects it is given.
+
+Builtins (``Date``, ``Math``, ``JSON``...), timers and the globals written by the script stay
+live, so that time and randomness are fresh on replay. If the script does anything else than
+what was recorded, or live code touches a host handle, the replay raises :class:`Diverged`.
+A :class:`~chaosvm.session.Session` with a :class:`TapeStore` then runs the window live.
+
+.. code-block:: python
+
+    tapes = TapeStore()
+    Session(js_vm, ip, tapes=tapes).result()    # live, recorded
+    Session(js_vm, ip, tapes=tapes).result()    # replayed
+"""
+
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from hashlib import sha256
+from operator import contains, setitem
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from chaosvm import metrics
+from chaosvm.proxy.builtins import NULL, Function, Proxy, ProxyException, String
+from chaosvm.proxy.dom import Window
+from chaosvm.vm import TYPEOF, Cell, ChaosVM
+
+__all__ = ["Diverged", "Tape", "Recorder", "Replayer", "ReplayWindow", "TapeVM", "TapeStore"]
+
+LIVE_GLOBALS = frozenset(
+    {
+        "undefined",
+        "window",
+        "top",
+        "Date",
+        "Math",
+        "JSON",
+        "Array",
+        "Object",
+        "String",
+        "Number",
+        "Symbol",
+        "RegExp",
+        "Error",
+        "setTimeout",
+        "setInterval",
+        "clearTimeout",
+        "clearInterval",
+        "queueMicrotask",
+        "parseInt",
+        "btoa",
+        "encodeURIComponent",
+        "decodeURIComponent",
+    }
+)
+"""window properties that are not host: builtins, timers and pure functions"""
+
+_PRIMITIVES = frozenset({bool, int, float, str})
+_NULL = ("null",)
+
+Event = list
+"""One of
+
+- ``[op, receiver, name, args, outcome, inner]``: an operation of the vm on a host object.
+- ``["cb", function, this, args, outcome, inner]``: the host calling a vm function.
+- ``["sched", task, ms, interval]``: the host scheduling a task, a microtask if `ms` is None.
+- ``["task", task, inner]``: a task scheduled by the host running.
+
+`outcome` is ``("ret", value)`` or ``("raise", err, stack)`` of a :class:`ProxyException`.
+`inner` are the callbacks and schedules that happened meanwhile.
+"""
+
+
+class Diverged(BaseException):
+    """The script did something else than what the tape recorded. It is a
+    :class:`BaseException`, so that neither the script nor the event loop catches it."""
+
+
+class Tape:
+    """Host interactions of a session, see :data:`Event`."""
+
+    def __init__(self, events: Optional[List[Event]] = None) -> None:
+        self.events: List[Event] = [] if events is None else events
+
+    def __len__(self) -> int:
+        def count(events: List[Event]) -> int:
+            return sum(1 + count(e[-1]) for e in events if e[0] != "sched")
+
+        return count(self.events)
+
+    def __repr__(self) -> str:
+        return f"<Tape of {len(self)} events>"
+
+
+class Handle(Proxy):
+    """A host object on replay. Only a :class:`TapeVM` can use it, through the tape; any other
+    use raises :class:`Diverged`."""
+
+    __slots__ = ("_k",)
+
+    def __init__(self, k: int) -> None:
+        object.__setattr__(self, "_k", k)
+
+    def __getattribute__(self, name):
+        if name == "_k" or name == "__class__":
+            return object.__getattribute__(self, name)
+        raise Diverged(f"host object #{object.__getattribute__(self, '_k')} used outside the vm")
+
+    def _touch(self, *_):
+        raise Diverged(f"host object #{self._k} used outside the vm")
+
+    __getitem__ = __setitem__ = __delitem__ = __setattr__ = __delattr__ = _touch
+    __call__ = __iter__ = __len__ = __contains__ = __bool__ = __str__ = _touch
+
+    def __repr__(self) -> str:
+        return f"<host #{self._k}>"
+
+
+def _unbox(v):
+    return v.v if type(v) is Cell else v
+
+
+def _outcall(obj, name, args: list):
+    if (func := getattr(obj, name)) is None:
+        raise ProxyException(TypeError("undefined is not a function"))
+    return func(*args)
+
+
+def _delete(obj, name) -> bool:
+    del obj[name]
+    return name not in obj
+
+
+class Recorder:
+    """Run a window live and record its host interactions on :attr:`tape`.
+
+    :param window: a window the vm has not run in yet.
+    """
+
+    def __init__(self, window: Window) -> None:
+        self.window = window
+        self.tape = Tape()
+        self.live: Set[str] = set(LIVE_GLOBALS)
+        """window properties that are not host"""
+        self.broken: Optional[str] = None
+        """why the tape cannot be replayed, if so"""
+        window._tape = self
+
+        self._handles: Dict[int, int] = {id(window): 0}
+        self._host: List[Any] = [window]
+        self._vm: Dict[int, int] = {}
+        self._vm_objs: List[Any] = []
+        self._levels = [self.tape.events]
+        self._in_host: List[bool] = []
+        self._tasks = 0
+
+        loop = window._loop
+        call_later, queue_microtask = loop.call_later, loop.queue_microtask
+
+        def later(ms: float, callback: Callable, *args, interval: Optional[float] = None):
+            if self._in_host and self._in_host[-1]:
+                callback = self._task(ms, interval, callback)
+            return call_later(ms, callback, *args, interval=interval)
+
+        def micro(callback: Callable, *args):
+            if self._in_host and self._in_host[-1]:
+                callback = self._task(None, None, callback)
+            return queue_microtask(callback, *args)
+
+        loop.call_later, loop.queue_microtask = later, micro
+
+    def is_host(self, obj, name=None) -> bool:
+        if obj is self.window:
+            return not (type(name) is str and name in self.live)
+        return id(obj) in self._handles
+
+    def _in(self, v):
+        """Encode a value the vm hands to the host."""
+        if v is None or type(v) in _PRIMITIVES:
+            return v
+        if v is NULL.s:
+            return _NULL
+        if type(v) is String:
+            return ("S", v._s)
+        if (k := self._handles.get(id(v))) is not None:
+            return ("h", k)
+        if (k := self._vm.get(id(v))) is None:
+            k = self._vm[id(v)] = len(self._vm_objs)
+            self._vm_objs.append(v)
+        return ("v", k)
+
+    def _out(self, v):
+        """Encode a value the host hands to the vm."""
+        if v is None or type(v) in _PRIMITIVES:
+            return v
+        if v is NULL.s:
+            return _NULL
+        if type(v) is String:
+            return ("S", v._s)
+        if (k := self._vm.get(id(v))) is not None:
+            return ("v", k)
+        if (k := self._handles.get(id(v))) is None:
+            k = self._handles[id(v)] = len(self._host)
+            self._host.append(v)
+        return ("h", k)
+
+    def _enter(self, ev: Event, inner: List[Event], host: bool):
+        self._levels[-1].append(ev)
+        self._levels.append(inner)
+        self._in_host.append(host)
+
+    def _exit(self):
+        self._levels.pop()
+        self._in_host.pop()
+
+    def host(self, op: str, obj, name, args: list, perform: Callable[[], Any]):
+        """Perform `op` of the vm on a host object and record it."""
+        ev = [op, self._in(obj), self._in(name), [self._in(a) for a in args], None, []]
+        self._enter(ev, ev[5], True)
+        try:
+            r = perform()
+        except ProxyException as e:
+            ev[4] = ("raise", e.err, e.stack)
+            raise
+        except BaseException as e:
+            self.broken = f"{op} {name!r} raised {e!r}"
+            raise
+        finally:
+            self._exit()
+        ev[4] = ("ret", ("list", [self._out(i) for i in r]) if op == "iter" else self._out(r))
+        return r
+
+    def frame(self, vm: TapeVM, run: Callable[[], Any]):
+        """Run a frame of the vm, recording it if the host called it."""
+        if not (self._in_host and self._in_host[-1]):
+            self._in_host.append(False)
+            try:
+                return run()
+            finally:
+                self._in_host.pop()
+
+        func, args = _unbox(vm.stack[2]), _unbox(vm.stack[1])
+        if id(func) not in self._vm:
+            self.broken = f"the host called {func!r}, which the vm did not give it"
+        ev = ["cb", self._in(func), self._out(func.this), [self._out(a) for a in args], None, []]
+        self._enter(ev, ev[5], False)
+        try:
+            r = run()
+        except ProxyException as e:
+            ev[4] = ("raise", e.err, e.stack)
+            raise
+        except BaseException as e:
+            self.broken = f"{func!r} raised {e!r}"
+            raise
+        finally:
+            self._exit()
+        ev[4] = ("ret", self._in(r))
+        return r
+
+    def _task(self, ms: Optional[float], interval: Optional[float], callback: Callable):
+        tid = self._tasks
+        self._tasks += 1
+        self._levels[-1].append(["sched", tid, ms, interval])
+
+        def task(*args):
+            ev = ["task", tid, []]
+            self._enter(ev, ev[2], True)
+            try:
+                return callback(*args)
+            finally:
+                self._exit()
+
+        return task
+
+
+class Replayer:
+    """Feed a :class:`Tape` to a :class:`ReplayWindow` in place of the host."""
+
+    def __init__(self, tape: Tape, window: Window) -> None:
+        self.window = window
+        self.tape = tape
+        self.live: Set[str] = set(LIVE_GLOBALS)
+        """window properties that are not host"""
+        self.diverged: Optional[str] = None
+        """why the replay diverged, if so. Kept, in case the script caught :class:`Diverged`"""
+        window._tape = self
+
+        self._host: List[Any] = [window]
+        self._vm: Dict[int, int] = {}
+        self._vm_objs: List[Any] = []
+        self._levels = [[tape.events, 0]]
+
+    def is_host(self, obj, name=None) -> bool:
+        if obj is self.window:
+            return not (type(name) is str and name in self.live)
+        return type(obj) is Handle
+
+    def done(self) -> bool:
+        """Whether the whole tape was replayed without diverging."""
+        events, i = self._levels[0]
+        return self.diverged is None and len(self._levels) == 1 and i == len(events)
+
+    def _diverge(self, why: str):
+        if self.diverged is None:
+            self.diverged = why
+        raise Diverged(why)
+
+    def _in(self, v):
+        if v is None or type(v) in _PRIMITIVES:
+            return v
+        if v is NULL.s:
+            return _NULL
+        if type(v) is String:
+            return ("S", v._s)
+        if type(v) is Handle:
+            return ("h", v._k)
+        if v is self.window:
+            return ("h", 0)
+        if (k := self._vm.get(id(v))) is None:
+            k = self._vm[id(v)] = len(self._vm_objs)
+            self._vm_objs.append(v)
+        return ("v", k)
+
+    def _out(self, e):
+        if type(e) is not tuple:
+            return e
+        tag = e[0]
+        if tag == "h":
+            if (k := e[1]) == len(self._host):
+                self._host.append(Handle(k))
+            elif k > len(self._host):
+                self._diverge(f"host object #{k} out of order")
+            return self._host[k]
+        if tag == "v":
+            if e[1] >= len(self._vm_objs):
+                self._diverge(f"vm object #{e[1]} was not handed to the host")
+            return self._vm_objs[e[1]]
+        if tag == "S":
+            return String(e[1])
+        if tag == "list":
+            return [self._out(i) for i in e[1]]
+        return NULL.s
+
+    def _next(self) -> Optional[Event]:
+        level = self._levels[-1]
+        events, i = level
+        if i == len(events):
+            return None
+        level[1] = i + 1
+        return events[i]
+
+    def _outcome(self, outcome: tuple):
+        if outcome[0] == "raise":
+            e = ProxyException(outcome[1])
+            e.stack = outcome[2]
+            raise e
+        return self._out(outcome[1])
+
+    def host(self, op: str, obj, name, args: list, perform: Callable[[], Any]):
+        """Replay `op` of the vm on a host object. `perform` is not called."""
+        ev = self._next()
+        if (
+            ev is None
+            or ev[0] != op
+            or ev[1] != self._in(obj)
+            or ev[2] != self._in(name)
+            or ev[3] != [self._in(a) for a in args]
+        ):
+            self._diverge(f"vm did {op} {name!r} on {obj!r}, tape has {ev and ev[:3]}")
+        self._drive(ev[5])
+        return self._outcome(ev[4])
+
+    def frame(self, vm: TapeVM, run: Callable[[], Any]):
+        return run()
+
+    def _drive(self, events: List[Event]):
+        """Replay what the host did during an operation or a task."""
+        if not events:
+            return
+        self._levels.append(level := [events, 0])
+        try:
+            while (ev := self._next()) is not None:
+                if ev[0] == "cb":
+                    self._callback(ev)
+                elif ev[0] == "sched":
+                    self._schedule(ev)
+                else:
+                    self._diverge(f"unexpected {ev[0]} in a host operation")
+        finally:
+            self._levels.pop()
+            if level[1] != len(events) and self.diverged is None:
+                # an error ended the host operation early, and the loop may swallow it
+                self.diverged = "host operation ended early"
+
+    def _callback(self, ev: Event):
+        func = self._out(ev[1])
+        if type(func) is not Function:
+            self._diverge(f"host called {func!r}, not a vm function")
+        func.this = self._out(ev[2])
+        args = [self._out(a) for a in ev[3]]
+        self._levels.append(level := [ev[5], 0])
+        try:
+            outcome: tuple = ("ret", self._in(func(*args)))
+        except ProxyException as e:
+            outcome = ("raise", e.err, e.stack)
+        finally:
+            self._levels.pop()
+            if level[1] != len(ev[5]) and self.diverged is None:
+                self.diverged = f"{func!r} did less than recorded"
+        if self.diverged is not None:
+            raise Diverged(self.diverged)
+        if outcome != ev[4]:
+            self._diverge(f"{func!r} returned {outcome}, tape has {ev[4]}")
+
+    def _schedule(self, ev: Event):
+        _, tid, ms, interval = ev
+        loop = self.window._loop
+        if ms is None:
+            loop.queue_microtask(self._task, tid)
+        else:
+            loop.call_later(ms, self._task, tid, interval=interval)
+
+    def _task(self, tid: int):
+        if (ev := self._next()) is None or ev[0] != "task" or ev[1] != tid:
+            self._diverge(f"task {tid} ran, tape has {ev and ev[:2]}")
+        self._drive(ev[2])
+
+
+Driver = Union[Recorder, Replayer]
+
+
+class ReplayWindow(Window):
+    """A window without the emulated browser, to replay a tape in."""
+
+    _tape: Replayer
+
+    def _environment(self, dom: Optional[str]):
+        pass
+
+
+class TapeVM(ChaosVM):
+    """A vm whose operations on host objects go through the :class:`Recorder` or
+    :class:`Replayer` of its window."""
+
+    def __init__(self, *args, **kwds) -> None:
+        super().__init__(*args, **kwds)
+        self.tape: Driver = self.window._tape
+        self._live_load = self.load
+        self.load = self._tape_load
+
+    def __call__(self) -> Any:
+        return self.tape.frame(self, super().__call__)
+
+    def _tape_load(self, pc: int, obj, name):
+        if self.tape.is_host(obj, name):
+            return self.tape.host("get", obj, name, [], lambda: obj[name])
+        return self._live_load(pc, obj, name)
+
+    def _args(self, nargs: int) -> list:
+        if nargs:
+            args = self.stack[-nargs:]
+            self.stack = self.stack[:-nargs]
+            return args
+        return []
+
+    def outcall(self):
+        nargs = self.opcode[self.pc]
+        obj, name = self.stack[-1 - nargs][:2]
+        if not self.tape.is_host(obj, name):
+            return super().outcall()
+        self.pc += 1
+        args = self._args(nargs)
+        self.stack.pop()
+        self.stack.append(
+            self.tape.host("call", obj, name, args, lambda: _outcall(obj, name, args))
+        )
+
+    def wincall(self):
+        nargs = self.opcode[self.pc]
+        if not self.tape.is_host(f := self.stack[-1 - nargs]):
+            return super().wincall()
+        self.pc += 1
+        args = self._args(nargs)
+        window = self.window
+        self.stack[-1] = self.tape.host(
+            "apply",
+            f,
+            None,
+            args,
+            lambda: f.call(window, *args) if isinstance(f, Function) else f(*args),
+        )
+
+    def new(self):
+        nargs = self.opcode[self.pc]
+        if not self.tape.is_host(cls := self.stack[-1 - nargs]):
+            return super().new()
+        self.pc += 1
+        args = self._args(nargs)
+        self.stack[-1] = self.tape.host("new", cls, None, args, lambda: cls(*args))
+
+    def new_attr(self):
+        nargs = self.opcode[self.pc]
+        obj, name = self.stack[-1 - nargs][:2]
+        if not self.tape.is_host(obj, name):
+            return super().new_attr()
+        self.pc += 1
+        args = self._args(nargs)
+        self.stack[-1] = self.tape.host("new_attr", obj, name, args, lambda: obj[name](*args))
+
+    def setattr(self):
+        obj, name = self.stack[-2][:2]
+        if obj is self.window and type(name) is str:
+            # globals of the script
+            self.tape.live.add(name)
+        if not self.tape.is_host(obj, name):
+            return super().setattr()
+        v = self.stack[-1]
+        self.tape.host("set", obj, name, [v], lambda: setitem(obj, name, v))
+
+    def delattr(self):
+        obj, name = self.stack[-1][:2]
+        if not self.tape.is_host(obj, name):
+            return super().delattr()
+        self.stack.append(self.tape.host("del", obj, name, [], lambda: _delete(obj, name)))
+
+    def contains(self):
+        key = self.stack[-2]
+        if not self.tape.is_host(obj := self.stack[-1], key):
+            return super().contains()
+        self.stack.pop()
+        self.stack[-1] = self.tape.host("in", obj, key, [], lambda: contains(obj, key))
+
+    def tolist(self):
+        if not self.tape.is_host(obj := self.stack[-1]):
+            return super().tolist()
+        self.stack[-1] = self.tape.host("iter", obj, None, [], lambda: [i for i in obj])
+
+    def typeof(self):
+        if not self.tape.is_host(obj := self.stack[-1]):
+            return super().typeof()
+        self.stack[-1] = self.tape.host("typeof", obj, None, [], lambda: TYPEOF[type(obj)])
+
+    def je(self):
+        if not self.tape.is_host(obj := self.stack[-1]):
+            return super().je()
+        i = self._curcode()
+        if self.tape.host("bool", obj, None, [], lambda: bool(obj)):
+            self.pc = i
+
+    def inv(self):
+        if not self.tape.is_host(obj := self.stack[-1]):
+            return super().inv()
+        self.stack[-1] = not self.tape.host("bool", obj, None, [], lambda: bool(obj))
+
+
+class TapeStore:
+    """Tapes by script and profile, in memory. Safe to share between threads.
+
+    :param maxsize: tapes to keep, the least recently used are dropped first.
+    :param patience: stop replaying and recording a profile after so many divergences in a
+        row, e.g. if the script passes host values to live code.
+    """
+
+    def __init__(self, maxsize: int = 128, patience: int = 3) -> None:
+        self.maxsize = maxsize
+        self.patience = patience
+        self.hits = self.misses = self.divergences = 0
+        self._tapes: OrderedDict[str, Tape] = OrderedDict()
+        self._strikes: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._tapes)
+
+    @staticmethod
+    def key(js_vm: str, config: dict) -> str:
+        """Key of a script and the profile of its window, which must be JSON-serializable."""
+        h = sha256(js_vm.encode())
+        h.update(json.dumps(config, sort_keys=True).encode())
+        return h.hexdigest()
+
+    def enabled(self, key: str) -> bool:
+        """Whether tapes of `key` are still recorded and replayed."""
+        return self._strikes.get(key, 0) < self.patience
+
+    def get(self, key: str) -> Optional[Tape]:
+        with self._lock:
+            if (tape := self._tapes.get(key)) is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._tapes.move_to_end(key)
+            return tape
+
+    def put(self, key: str, tape: Tape):
+        with self._lock:
+            self._tapes[key] = tape
+            self._tapes.move_to_end(key)
+            while len(self._tapes) > self.maxsize:
+                self._tapes.popitem(last=False)
+
+    def replayed(self, key: str):
+        """A tape of `key` replayed to the end."""
+        metrics.count("chaosvm_replays_total")
+        with self._lock:
+            self._strikes.pop(key, None)
+
+    def diverged(self, key: str):
+        """A tape of `key` diverged. It is dropped, to be recorded again."""
+        metrics.count("chaosvm_replay_divergences_total")
+        with self._lock:
+            self.divergences += 1
+            self._strikes[key] = self._strikes.get(key, 0) + 1
+            self._tapes.pop(key, None)
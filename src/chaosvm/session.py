@@ -0,0 +1,300 @@
+"""A window running a tdc.js script, and the results of its :class:`TDC` object."""
+
+from __future__ import annotations
+
+import json
+import re
+from copy import copy
+from random import Random
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+from urllib.parse import unquote
+
+from chaosvm import metrics
+from chaosvm.cache import CachedTDC, ResultCache
+from chaosvm.clock import VirtualClock
+from chaosvm.image import ImageCache, ProgramImage
+from chaosvm.loop import EventLoop
+from chaosvm.parse import parse_vm
+from chaosvm.probes import Probes
+from chaosvm.proxy.builtins import NULL, Array, Function, Proxy, String
+from chaosvm.proxy.dom import TDC, Window
+from chaosvm.registry import OpmapRegistry
+from chaosvm.replay import Diverged, Recorder, Replayer, ReplayWindow, TapeStore, TapeVM
+from chaosvm.track import Track, points
+
+
+class Result(NamedTuple):
+    payload: bytes
+    """``getData`` as returned by the script, url-encoded and ready to send"""
+    collect: str
+    """the decoded ``getData``"""
+    info: Dict[str, Any]
+    """``getInfo`` as plain python objects"""
+    fields: Dict[str, Any]
+    """fields of :attr:`collect`, see :func:`parse_collect`"""
+
+
+_PARAMS = re.compile(r"(?:&[\w.-]+=[^&\"]*)*$")
+
+
+def parse_collect(collect: str) -> Dict[str, Any]:
+    """Split a decoded ``getData`` into fields: the keys of a JSON object at its head, and the
+    ``&name=value`` parameters after it. An opaque collect has no fields."""
+    m = _PARAMS.search(collect)
+    assert m
+    try:
+        head = json.loads(collect[: m.start()])
+    except ValueError:
+        head = None
+    fields = head if isinstance(head, dict) else {}
+    fields.update(p.split("=", 1) for p in m.group().split("&")[1:])
+    return fields
+
+
+def to_python(o: Any) -> Any:
+    """Convert proxies in `o` into python objects, as ``JSON.stringify`` sees them."""
+    if isinstance(o, String):
+        return o._s
+    if isinstance(o, Array):
+        return [to_python(i) for i in o]
+    if isinstance(o, Proxy):
+        return {k: to_python(v) for k, v in o.__dict__.items()}
+    if o is NULL.s:
+        return None
+    return o
+
+
+def instrument(tdc: TDC, probes: Probes, loop: EventLoop) -> TDC:
+    """Time ``getInfo`` and ``getData`` of `tdc` into :mod:`chaosvm.metrics`, count their
+    missing properties into `probes`, and run them as tasks of `loop`, so that the timers they
+    set fire as in a browser."""
+    for name in ("getInfo", "getData"):
+        f = tdc[name]
+        if isinstance(f, Function) and not hasattr(f.__f__, "__metric__"):
+            timed = metrics.timed(f"chaosvm_{name.lower()}_seconds")(f.__f__)
+            f.__f__ = loop.task(probes.wrap(timed))
+    return tdc
+
+
+class Session:
+    """Create a window and get its :class:`TDC` object as :attr:`tdc`.
+    See :func:`chaosvm.prepare` for the arguments.
+
+    With a `cache`, the window is only built when a call misses the cache.
+
+    A session holds its window until :meth:`close`, which a ``with`` block calls on exit:
+
+    .. code-block:: python
+
+        with Session(js_vm, ip) as s:
+            r = s.result()
+
+    With `tapes`, the interactions of the script with the emulated browser are recorded the
+    first time, and replayed later in a :class:`~chaosvm.replay.ReplayWindow`, which has no
+    document. A replay that diverges falls back to a live window. See :mod:`chaosvm.replay`.
+
+    With `images`, a script whose program image is published by the supervisor runs on the
+    shared image instead of being parsed. See :mod:`chaosvm.image`.
+    """
+
+    window: Optional[Window] = None
+    tdc: Union[TDC, CachedTDC]
+    closed = False
+
+    def __init__(
+        self,
+        js_vm: str,
+        ip: str,
+        ua="",
+        href="",
+        referer="",
+        mouse_track: Optional[Track] = None,
+        *,
+        seed: Optional[int] = None,
+        clock: Optional[VirtualClock] = None,
+        cache: Optional[ResultCache] = None,
+        dom: Optional[str] = None,
+        registry: Optional[OpmapRegistry] = None,
+        tapes: Optional[TapeStore] = None,
+        images: Optional[ImageCache] = None,
+    ) -> None:
+        metrics.count("chaosvm_sessions_total")
+        self._result: Optional[Result] = None
+        self._images: List[ProgramImage] = []
+        """images the windows of this session run on"""
+        self._image_cache = images
+        self._tape: Union[Recorder, Replayer, None] = None
+        self.probes = Probes()
+        """missing properties the script read, see :mod:`chaosvm.probes`"""
+        if seed is not None and clock is None:
+            clock = VirtualClock()
+        if tapes is not None:
+            if cache is not None:
+                raise ValueError("a result cache does not run the vm, so it cannot replay tapes")
+            if mouse_track is not None:
+                mouse_track = [list(p) for p in points(mouse_track)]
+            profile = dict(
+                ip=ip, ua=ua, href=href, referer=referer, mouse_track=mouse_track, dom=dom
+            )
+            self._tapes = tapes
+            self._tape_key = tapes.key(js_vm, profile)
+            # a replay that diverges is run again live from the same time
+            self._rewind = None if clock is None else (clock, copy(clock))
+
+        def run(win: Window, tape: Union[Recorder, Replayer, None]):
+            with self.probes.active():
+                before = set(win.__dict__)
+                if images is not None and (image := images.acquire(js_vm)) is not None:
+                    self._images.append(image)
+                    stack = image.load(win)
+                else:
+                    stack = parse_vm(js_vm, win, registry)
+                if tape is None:
+                    stack(win)
+                else:
+                    # globals written by the loader are not host
+                    tape.live.update(k for k in win.__dict__ if k not in before)
+                    stack(win, TapeVM)
+
+        def replay() -> Optional[TDC]:
+            assert tapes is not None
+            if not tapes.enabled(self._tape_key):
+                return None
+            if (tape := tapes.get(self._tape_key)) is None:
+                return None
+            win = ReplayWindow(top=True, rng=None if seed is None else Random(seed), clock=clock)
+            self._tape = replayer = Replayer(tape, win)
+            try:
+                run(win, replayer)
+            except (Diverged, Exception):
+                replayer.diverged = replayer.diverged or "the script raised"
+            if replayer.diverged is None:
+                self.window = win
+                return instrument(win.TDC, self.probes, win._loop)
+            self._diverged()
+            return None
+
+        def build(live=False):
+            if tapes is not None and not live and (tdc := replay()) is not None:
+                return tdc
+            win = Window(
+                top=True, rng=None if seed is None else Random(seed), clock=clock, dom=dom
+            )
+            if ip:
+                win.RTCPeerConnection = win.RTCPeerConnection.with_ip(ip)
+            if ua:
+                win.navigator.userAgent = ua
+            if href:
+                win.location.href = href
+            if referer:
+                win.location.referer = referer
+            if mouse_track is not None:
+                win.add_mouse_track(mouse_track)
+
+            if tapes is not None and tapes.enabled(self._tape_key):
+                self._tape = Recorder(win)
+            run(win, self._tape)
+            self.window = win
+            return instrument(win.TDC, self.probes, win._loop)
+
+        self._build = build
+
+        if cache is None:
+            self.tdc = build()
+            return
+        if seed is None:
+            raise ValueError("result cache requires a seed")
+
+        assert clock
+        if mouse_track is not None:
+            # an iterator can only be consumed once, and an array repr is abbreviated
+            mouse_track = [list(p) for p in points(mouse_track)]
+        # the vm may be built much later, when a shared clock has moved on
+        clock = copy(clock)
+        config = dict(
+            ip=ip,
+            ua=ua,
+            href=href,
+            referer=referer,
+            mouse_track=mouse_track,
+            clock=repr(clock),
+            dom=dom,
+        )
+        self.tdc = CachedTDC(cache, cache.entry(cache.key(js_vm, config, seed)), build)
+
+    def result(self) -> Result:
+        """Call ``getInfo`` and ``getData`` and return their results, both encoded and decoded.
+
+        The payload is decoded from the argument the script passed to ``encodeURIComponent``,
+        so it is not unquoted again. With a cache, the decoded payload is stored with the
+        results. The result is computed once; later calls return it as is.
+
+        :raises RuntimeError: if the session was closed before computing the result.
+        """
+        if self._result is None:
+            if self.closed:
+                raise RuntimeError("session is closed")
+            if not isinstance(tape := self._tape, Replayer):
+                self._result = self._call()
+            else:
+                try:
+                    self._result = self._call()
+                except (Diverged, Exception):
+                    pass
+                if self._result is None or not tape.done():
+                    self._diverged()
+                    self.tdc = self._build(live=True)
+                    self._result = self._call()
+                else:
+                    self._tapes.replayed(self._tape_key)
+            if isinstance(tape := self._tape, Recorder) and tape.broken is None:
+                self._tapes.put(self._tape_key, tape.tape)
+        return self._result
+
+    def close(self):
+        """Release the window, its document, the vm functions of the script and the program
+        images it ran on. A computed :meth:`result` and :attr:`probes` are kept. Closing again
+        does nothing."""
+        if self.window is not None:
+            self.window._release()
+        self.window = None
+        # the build closure refers to this session
+        self.__dict__.pop("tdc", None)
+        self.__dict__.pop("_build", None)
+        self._tape = None
+        while self._images:
+            self._image_cache.release(self._images.pop())  # type: ignore
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _diverged(self):
+        """Forget a replay that diverged, so that the window is built again live."""
+        self._tapes.diverged(self._tape_key)
+        self._tape = None
+        self._result = None
+        self.probes = Probes()
+        if self._rewind is not None:
+            clock, saved = self._rewind
+            clock.__dict__.update(saved.__dict__)
+
+    def _call(self) -> Result:
+        info = to_python(self.tdc.getInfo(None))
+        data = str(self.tdc.getData(None, True))
+        if isinstance(tdc := self.tdc, CachedTDC):
+            collect = tdc.derive("collect", lambda: self._decode(data))
+        else:
+            collect = self._decode(data)
+        return Result(data.encode(), collect, info, parse_collect(collect))
+
+    def _decode(self, data: str) -> str:
+        if self.window is not None and (encoded := self.window._encoded) is not None:
+            quoted, raw = encoded
+            if data.endswith(quoted):
+                return unquote(data[: len(data) - len(quoted)]) + raw
+        # not encoded by the script
+        return unquote(data)
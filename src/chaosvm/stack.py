@@ -1,26 +1,82 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, Sequence
+from typing import TYPE_CHECKING, Dict, NamedTuple, Sequence, Type
 
+from . import metrics
+from .ic import InlineCache
+from .quicken import Quickening
 from .vm import ChaosVM
 
 if TYPE_CHECKING:
     from .proxy.dom import Window
 
 
+class PoolStats(NamedTuple):
+    runs: int
+    """``zstr`` literal runs folded"""
+    bytes: int
+    """bytes of the folded runs, i.e. ``concat`` instructions no longer executed"""
+    unique: int
+    """distinct strings in the pool"""
+
+
 class ChaosStack:
     """A ``TENCENT_CHAOS_STACK``. If is associated with an operation-code mapping,
     and can be called if given a data stack.
+
+    String literals are folded into a constant pool when the stack is created, and arithmetic
+    sites are quickened as they run, see :mod:`chaosvm.quicken`.
     """
 
     pc_start = 0
     """where the pc is set when vm is started."""
 
-    def __init__(self, opmap: Dict[int, int], opcode: Sequence[int], pc=0) -> None:
+    def __init__(
+        self,
+        opmap: Dict[int, int],
+        opcode: Sequence[int],
+        pc=0,
+        fold_strings=True,
+        quicken=True,
+    ) -> None:
+        from .disasm import escapes, string_pool, walk
+
         self.opmap = opmap.copy()
-        self.opcode = tuple(opcode)
-        """stack data in bytes"""
+        self.opcode = opcode if isinstance(opcode, memoryview) else tuple(opcode)
+        """stack data in bytes, or a view of a shared image, see :mod:`chaosvm.image`"""
         self.pc_start = pc
+        program = walk(self)
+        self.strings = string_pool(self, program[0]) if fold_strings else {}
+        """folded string literals, see :func:`chaosvm.disasm.string_pool`"""
+        self.escapes = escapes(self, program)
+        """slots captured by closures, by function entry, see :func:`chaosvm.disasm.escapes`"""
+        self.ic = InlineCache()
+        """inline caches of property loads"""
+        self.quick = Quickening(self.opcode, self.opmap) if quicken else None
+        """handlers of each pc, specialized as the program runs"""
+
+    @property
+    def pool_stats(self) -> PoolStats:
+        return PoolStats(
+            len(self.strings),
+            sum((end - pc) // 2 for pc, (_, end) in self.strings.items()),
+            len({s for s, _ in self.strings.values()}),
+        )
 
-    def __call__(self, window: Window):
-        return ChaosVM(self.pc_start, self.opcode, window, self.opmap)()
+    @metrics.timed("chaosvm_execute_seconds")
+    def __call__(self, window: Window, vm: Type[ChaosVM] = ChaosVM):
+        """Run the stack in `window` with a `vm` of the given class, e.g. a
+        :class:`~chaosvm.replay.TapeVM`."""
+        return window._loop.execute(
+            vm(
+                self.pc_start,
+                self.opcode,
+                window,
+                self.opmap,
+                None,
+                self.strings,
+                self.ic,
+                self.escapes,
+                self.quick,
+            )
+        )
@@ -0,0 +1,123 @@
+"""Mouse trajectories of slide captchas.
+
+:func:`generate` makes human-like tracks in batch with NumPy, which is an optional dependency
+(``pip install pychaosvm[track]``). A track is a sequence of ``(x, y)`` or ``(x, y, t)`` points,
+where ``t`` is milliseconds since the track starts. Lists, iterators and arrays are all accepted
+by :meth:`Window.add_mouse_track <chaosvm.proxy.dom.Window.add_mouse_track>`, and the events are
+fed lazily by :func:`feed`, so the points of a track are never turned into proxies up front.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from chaosvm.loop import EventLoop
+
+Point = Union[Tuple[int, int], Tuple[int, int, int]]
+Track = Iterable[Any]
+"""an iterable of points, e.g. a list of tuples or an array of shape (n, 2) or (n, 3)"""
+
+
+def points(track: Track) -> Iterator[tuple]:
+    """Iterate over `track` as tuples of python numbers. Array rows are converted one by one."""
+    for p in track:
+        yield tuple(p.tolist()) if hasattr(p, "tolist") else tuple(p)
+
+
+def feed(
+    listener: Callable[[Any], Any],
+    track: Track,
+    event: Callable[[tuple], Any],
+    loop: Optional[EventLoop] = None,
+):
+    """Dispatch the points of `track` to `listener`, creating each event when it is due.
+
+    Points with a timestamp are delivered by `loop` at their time, one timer at a time.
+    Without a loop or timestamps, all points are delivered at once.
+
+    :param event: create an event from a point.
+    """
+    it = points(track)
+    if loop is None:
+        for p in it:
+            listener(event(p))
+        return
+
+    def step(p: tuple):
+        while True:
+            listener(event(p))
+            prev, p = p, next(it, None)
+            if p is None:
+                return
+            if len(p) > 2:
+                loop.call_later(p[2] - (prev[2] if len(prev) > 2 else 0), step, p)
+                return
+
+    if (first := next(it, None)) is None:
+        return
+    if len(first) > 2:
+        loop.call_later(first[2], step, first)
+    else:
+        step(first)
+
+
+def minimum_jerk(tau: np.ndarray) -> np.ndarray:
+    """Position profile of a minimum-jerk reach, which has the bell-shaped velocity of a hand
+    movement."""
+    return tau**3 * (10 - 15 * tau + 6 * tau**2)
+
+
+def generate(
+    count: int,
+    end: Union[Tuple[float, float], np.ndarray] = (240, 0),
+    start: Union[Tuple[float, float], np.ndarray] = (0, 0),
+    length: int = 40,
+    duration: Tuple[int, int] = (500, 1500),
+    jitter: float = 0.6,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """Generate `count` tracks from `start` to `end`.
+
+    Each track follows a cubic Bezier curve with random control points, traversed with a
+    minimum-jerk velocity profile. Sampling times and positions are jittered.
+
+    :param end: end point, or an array of shape (count, 2) of end points.
+    :param start: start point, or an array of shape (count, 2) of start points.
+    :param length: points per track.
+    :param duration: range of the track duration in ms.
+    :param jitter: std of the positional noise in px.
+    :return: an int64 array of shape (count, length, 3), whose last axis is ``x, y, t``.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    p0 = np.broadcast_to(np.asarray(start, dtype=float), (count, 2))
+    p3 = np.broadcast_to(np.asarray(end, dtype=float), (count, 2))
+    d = p3 - p0
+    normal = np.stack([-d[:, 1], d[:, 0]], axis=1)  # d rotated by 90°
+    u = rng.uniform([0.2, 0.6], [0.4, 0.9], (count, 2))
+    off = rng.normal(0, 0.08, (count, 2))
+    p1 = p0 + d * u[:, :1] + normal * off[:, :1]
+    p2 = p0 + d * u[:, 1:] + normal * off[:, 1:]
+
+    # sampling times, evenly spaced with noise, kept in order
+    tau = np.linspace(0, 1, length)[None, :] + rng.normal(0, 0.25 / length, (count, length))
+    tau[:, 0], tau[:, -1] = 0, 1
+    tau = np.maximum.accumulate(np.clip(tau, 0, 1), axis=1)
+
+    s = minimum_jerk(tau)[..., None]
+    xy = (
+        (1 - s) ** 3 * p0[:, None]
+        + 3 * (1 - s) ** 2 * s * p1[:, None]
+        + 3 * (1 - s) * s**2 * p2[:, None]
+        + s**3 * p3[:, None]
+    )
+    noise = rng.normal(0, jitter, xy.shape)
+    noise[:, [0, -1]] = 0
+    xy += noise
+
+    t = tau * rng.uniform(*duration, (count, 1))
+    return np.concatenate([np.rint(xy), np.rint(t)[..., None]], axis=2).astype(np.int64)
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from ctypes import c_int32, c_uint32
 from os.path import sep
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, overload
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Tuple, overload
 
+from chaosvm import metrics
 from chaosvm.proxy.dom import *
 
 if TYPE_CHECKING:
+    from .ic import InlineCache
     from .proxy.dom import Window
+    from .quicken import Quickening
 
 
 # If we update syntax feature extractor, we can just update md5 here.
@@ -17,11 +19,51 @@ OP_FEATS = ('5ceb04a17d2ccd243a3cd8d43d58412f','2c64a078cb8c4b856fdc70a609852c84
 
 
 def signed(n: int) -> int:
-    return c_int32(n).value
+    """Wrap `n` into int32, as ``ctypes.c_int32(n).value`` does."""
+    return ((n + 0x80000000) & 0xFFFFFFFF) - 0x80000000
 
 
 def unsigned(n: int) -> int:
-    return c_uint32(n).value
+    """Wrap `n` into uint32, as ``ctypes.c_uint32(n).value`` does."""
+    return n & 0xFFFFFFFF
+
+
+_NO_STRINGS: Dict[int, Tuple[str, int]] = {}
+
+# fmt: off
+QUICK_OPS = ("adaptive", "unmapped", "add_int", "add_str", "add_num", "geq_num", "refeq_int", "refeq_str", "bitand_int", "bitor_int", "xor_int", "lshift_int", "rshift_int", "urshift_int")
+# fmt: on
+"""handlers appended to ``ops`` of a quickened frame, see :mod:`chaosvm.quicken`"""
+
+
+TYPEOF = {
+    type: "function",
+    Symbol: "symbol",
+    int: "number",
+    float: "number",
+    type(None): "undefined",
+    str: "string",
+    String: "string",
+    NULL: "object",
+}
+"""``typeof`` of the python types a vm value can have"""
+
+
+def _load(pc: int, obj, name):
+    return obj[name]
+
+
+class Cell:
+    """A variable captured by a closure, shared by the frames that see it. Other variables
+    are kept in their stack slots unboxed, see :func:`chaosvm.disasm.escapes`."""
+
+    __slots__ = ("v",)
+
+    def __init__(self, v=None) -> None:
+        self.v = v
+
+    def __repr__(self) -> str:
+        return f"Cell({self.v!r})"
 
 
 class BuiltinOps:
@@ -35,6 +77,16 @@ class BuiltinOps:
     """call stack"""
     window: Window
     """Global object"""
+    strings: Dict[int, Tuple[str, int]]
+    """string literals folded at load time, see :func:`chaosvm.disasm.string_pool`"""
+    ic: Optional[InlineCache]
+    """inline caches of property loads"""
+    escapes: Optional[Dict[int, FrozenSet[int]]]
+    """slots captured by closures, by function entry"""
+    boxed: Optional[FrozenSet[int]]
+    """slots of this frame held in a :class:`Cell`. ``None`` boxes all variables."""
+    quick: Optional[Quickening]
+    """handlers of each pc, rewritten as the program runs"""
 
     def __init__(
         self,
@@ -43,13 +95,22 @@ class BuiltinOps:
         window: Window,
         opmap: Dict[int, int],
         stack: Optional[List] = None,
+        strings: Optional[Dict[int, Tuple[str, int]]] = None,
+        ic: Optional[InlineCache] = None,
+        escapes: Optional[Dict[int, FrozenSet[int]]] = None,
+        quick: Optional[Quickening] = None,
     ) -> None:
         self.pc = pc
         self.window = window
         self.opcode = opcodes or (0,)
         self.opmap = opmap
+        self.escapes = escapes
+        self.boxed = None if escapes is None else escapes.get(pc)
         self.empty_init = stack is None
-        self.stack = stack or [[self.window], [{}]]
+        self.stack = stack or [self._box(0, self.window), self._box(1, {})]
+        self.strings = strings or _NO_STRINGS
+        self.ic = ic
+        self.load = _load if ic is None else ic.load
         self.call_stack = []
         self.err = None
 
@@ -59,6 +120,11 @@ class BuiltinOps:
         # fmt: on
         self.__cat_idx = self.ops.index(self.concat)
         self.__req_idx = self.ops.index(self.refeq)
+        if quick is not None and not quick.accepts(type(self)):
+            quick = None
+        self.quick = quick
+        if quick is not None:
+            self.ops += [getattr(self, name) for name in QUICK_OPS]
 
     @overload
     def _curcode(self) -> int:
@@ -68,6 +134,9 @@ class BuiltinOps:
     def _curcode(self, n: int) -> Tuple[int, ...]:
         ...
 
+    def _box(self, i: int, v):
+        return Cell(v) if self.boxed is None or i in self.boxed else v
+
     def _curcode(self, n=1):
         if n == 1:
             i = self.opcode[self.pc]
@@ -102,7 +171,7 @@ class BuiltinOps:
         self.stack.append(False)
 
     def inst_arr(self):
-        self.stack.append([self._curcode()])
+        self.stack.append(Cell(self._curcode()))
 
     def drop(self):
         self.stack.pop()
@@ -179,24 +248,37 @@ class BuiltinOps:
         A = {}
         for _ in range(Alen):
             i, j = self._curcode(2)
-            A[i] = self.stack[j]
+            if type(c := self.stack[j]) is not Cell:
+                # not known to escape, or not assigned yet; box it from now on
+                c = self.stack[j] = Cell(c)
+            A[i] = c
         A = [A.get(i) for i in range(max(A) + 1)] if A else []
         U = self._curcode(Ulen)
-        if isinstance(U, int):
-            U = (U,)
+        # a slice of a shared image would keep it mapped
+        U = (U,) if isinstance(U, int) else tuple(U)
+        size = max(3, 1 + max(U or [0]))
+        boxed = None if self.escapes is None else self.escapes.get(pc)
+        # this, arguments, the function and the parameters that the new frame boxes
+        box = [i for i in dict.fromkeys((0, 1, 2, *U)) if boxed is None or i in boxed]
+        # the closure keeps what a call needs, not this frame and its stack
+        vm, window, opcode, opmap = self.__class__, self.window, self.opcode, self.opmap
+        strings, ic, escapes, quick = self.strings, self.ic, self.escapes, self.quick
 
         def vmcall(*args):
             new_stack = A.copy()
-            new_stack += [None] * (max(3, 1 + max(U or [0])) - len(new_stack))
-            new_stack[0] = [func.this or self.window]
-            new_stack[1] = [args]
-            new_stack[2] = [func]
+            new_stack += [None] * (size - len(new_stack))
+            new_stack[0] = func.this or window
+            new_stack[1] = args
+            new_stack[2] = func
             for i, a in zip(U, args):
                 if i > 0:
-                    new_stack[i] = [a]
-            return ChaosVM(pc, self.opcode, self.window, self.opmap, new_stack)()
+                    new_stack[i] = a
+            for i in box:
+                if type(c := new_stack[i]) is not Cell:
+                    new_stack[i] = Cell(c)
+            return vm(pc, opcode, window, opmap, new_stack, strings, ic, escapes, quick)()
 
-        func = Function(vmcall, self.window)
+        func = Function(vmcall, window)
         self.stack.append(func)
 
     def clear(self):
@@ -292,11 +374,120 @@ class BuiltinOps:
         """unsigned right shift `>>>`"""
         self.stack[-1] = unsigned(self.stack[-2]) >> self.stack.pop()
 
+    # =====================================================
+    #                      Quickened
+    # =====================================================
+    # Specialized handlers guard the types of their operands. On a miss, the site is rewritten
+    # to the generic handler, which runs instead. See :mod:`chaosvm.quicken`.
+
+    def adaptive(self):
+        return getattr(self, self.quick.adapt(self, self.pc - 1))()
+
+    def unmapped(self):
+        raise KeyError(self.opcode[self.pc - 1])
+
+    def _deopt(self):
+        return getattr(self, self.quick.deopt(self, self.pc - 1))()
+
+    def add_int(self):
+        if type(i := self.stack[-1]) is int and type(j := self.stack[-2]) is int:
+            self.stack.pop()
+            self.stack[-1] = j + i
+        else:
+            return self._deopt()
+
+    def add_str(self):
+        if type(i := self.stack[-1]) is str and type(j := self.stack[-2]) is str:
+            self.stack.pop()
+            self.stack[-1] = j + i
+        else:
+            return self._deopt()
+
+    def add_num(self):
+        if (
+            (type(i := self.stack[-1]) is float or type(i) is int)
+            and (type(j := self.stack[-2]) is float or type(j) is int)
+        ):
+            self.stack.pop()
+            self.stack[-1] = j + i
+        else:
+            return self._deopt()
+
+    def geq_num(self):
+        if (
+            (type(i := self.stack[-1]) is float or type(i) is int)
+            and (type(j := self.stack[-2]) is float or type(j) is int)
+        ):
+            self.stack.pop()
+            self.stack[-1] = j >= i
+        else:
+            return self._deopt()
+
+    def refeq_int(self):
+        if type(i := self.stack[-1]) is int:
+            self.stack.pop()
+            self.stack[-1] = self.stack[-1] == i
+        else:
+            return self._deopt()
+
+    def refeq_str(self):
+        if type(i := self.stack[-1]) is str:
+            self.stack.pop()
+            self.stack[-1] = self.stack[-1] == i
+        else:
+            return self._deopt()
+
+    def bitand_int(self):
+        if type(i := self.stack[-1]) is int and type(j := self.stack[-2]) is int:
+            self.stack.pop()
+            self.stack[-1] = (((j & i) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+        else:
+            return self._deopt()
+
+    def bitor_int(self):
+        if type(i := self.stack[-1]) is int and type(j := self.stack[-2]) is int:
+            self.stack.pop()
+            self.stack[-1] = (((j | i) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+        else:
+            return self._deopt()
+
+    def xor_int(self):
+        if type(i := self.stack[-1]) is int and type(j := self.stack[-2]) is int:
+            self.stack.pop()
+            self.stack[-1] = (((j ^ i) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+        else:
+            return self._deopt()
+
+    def lshift_int(self):
+        if type(i := self.stack[-1]) is int and type(j := self.stack[-2]) is int:
+            self.stack.pop()
+            self.stack[-1] = (((j << i) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+        else:
+            return self._deopt()
+
+    def rshift_int(self):
+        if type(i := self.stack[-1]) is int and type(j := self.stack[-2]) is int:
+            self.stack.pop()
+            self.stack[-1] = (((j >> i) + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+        else:
+            return self._deopt()
+
+    def urshift_int(self):
+        if type(i := self.stack[-1]) is int and type(j := self.stack[-2]) is int:
+            self.stack.pop()
+            self.stack[-1] = (j & 0xFFFFFFFF) >> i
+        else:
+            return self._deopt()
+
     # =====================================================
     #                        String
     # =====================================================
 
     def zstr(self):
+        if (c := self.strings.get(self.pc)) is not None:
+            s, self.pc = c
+            self.stack.append(s)
+            return
         s = bytearray()
         while self.opmap[self._curcode()] == self.__cat_idx:
             s.append(self._curcode())
@@ -341,7 +532,7 @@ class BuiltinOps:
 
     def grgetattr(self):
         obj, name = self.stack[-2][:2]
-        self.stack[-1] = [obj[name], self.stack.pop()]
+        self.stack[-1] = [self.load(self.pc, obj, name), self.stack.pop()]
 
     def getattr(self):
         obj, attr = self.stack.pop()[:2]
@@ -352,7 +543,7 @@ class BuiltinOps:
         if isinstance(obj, str) and attr == "length":
             self.stack.append(len(obj))
             return
-        self.stack.append(obj[attr])
+        self.stack.append(self.load(self.pc, obj, attr))
 
     def setattr(self):
         obj, name = self.stack[-2][:2]
@@ -364,44 +555,37 @@ class BuiltinOps:
         self.stack.append(name not in obj)
 
     def get_global(self):
-        self.stack[-1] = self.window[self.stack[-1]]
+        self.stack[-1] = self.load(self.pc, self.window, self.stack[-1])
 
     def grwinattr(self):
         self.stack[-1] = [self.window, self.stack[-1]]
 
     def typeof(self):
-        self.stack[-1] = {
-            type: "function",
-            Symbol: "symbol",
-            int: "number",
-            float: "number",
-            type(None): "undefined",
-            str: "string",
-            String: "string",
-            NULL: "object",
-        }[type(self.stack[-1])]
+        self.stack[-1] = TYPEOF[type(self.stack[-1])]
 
     def grobj(self):
-        if isinstance((i := self.stack[-2]), list):
-            assert len(i) == 1
-            i = i[0]
-        self.stack[-1] = [self.stack[i][0], self.stack.pop()]
+        if type(i := self.stack[-2]) is Cell:
+            i = i.v
+        if type(c := self.stack[i]) is Cell:
+            c = c.v
+        self.stack[-1] = [c, self.stack.pop()]
 
     def getobj(self):
-        i = self._curcode()
-        if ls := self.stack[i]:
-            self.stack.append(ls[0])
-        else:
-            self.stack.append(None)
+        if type(c := self.stack[self._curcode()]) is Cell:
+            c = c.v
+        self.stack.append(c)
 
     def getobj2(self):
-        self.stack[-1] = self.stack[self.stack[-1][0]][0]
+        if type(c := self.stack[self.stack[-1].v]) is Cell:
+            c = c.v
+        self.stack[-1] = c
 
     def chobj(self):
-        if ls := self.stack[self.stack[-2][0]]:
-            ls[0] = self.stack[-1]
+        i = self.stack[-2].v
+        if type(c := self.stack[i]) is Cell:
+            c.v = self.stack[-1]
         else:
-            ls.append(self.stack[-1])
+            self.stack[i] = self.stack[-1]
 
     # =====================================================
     #                       Advanced
@@ -417,9 +601,10 @@ class BuiltinOps:
         self.stack[-1] = t
 
     def n2list(self):
+        """Declare a variable. Only a captured one needs a cell, others stay ``None``."""
         i = self._curcode()
-        if self.stack[i] is None:
-            self.stack[i] = []
+        if self.stack[i] is None and (self.boxed is None or i in self.boxed):
+            self.stack[i] = Cell()
 
     def arr_popleft(self):
         if len(self.stack[-1]):
@@ -432,32 +617,59 @@ class ChaosVM(BuiltinOps):
     v = 0
 
     def __call__(self) -> Any:
-        while True:
-            try:
-                E = False
-                while not E:
-                    i = self._curcode()
-                    E = self.ops[self.opmap[i]]()
-                    pass
-                if self.err:
-                    raise self.err
-
-                if self.empty_init:
-                    self.stack.pop()
-                    return self.stack[3 + self.v :]
-                else:
-                    return self.stack.pop()
-            except ProxyException as h:
-                if not self.call_stack:
-                    raise
-                if f"{sep}chaosvm{sep}" in str(h.stack):
-                    raise
-
-                self.pc, stack_len, catch = self.call_stack.pop()[:3]
-                self.err = h
-                self.stack = self.stack[:stack_len]
-                if catch:
-                    if len(i := self.stack[catch]) > 0:
-                        i[0] = self.err
+        counted = metrics.sink is not None
+        n = 0
+        try:
+            while True:
+                try:
+                    E = False
+                    if self.quick is not None:
+                        ops, code = self.ops, self.quick.code
+                        if counted:
+                            while not E:
+                                n += 1
+                                i = self.pc
+                                self.pc = i + 1
+                                E = ops[code[i]]()
+                        else:
+                            while not E:
+                                i = self.pc
+                                self.pc = i + 1
+                                E = ops[code[i]]()
+                    elif counted:
+                        while not E:
+                            n += 1
+                            E = self.ops[self.opmap[self._curcode()]]()
+                    else:
+                        while not E:
+                            i = self._curcode()
+                            E = self.ops[self.opmap[i]]()
+                            pass
+                    if self.err:
+                        raise self.err
+
+                    if self.empty_init:
+                        self.stack.pop()
+                        return self.stack[3 + self.v :]
                     else:
-                        i.append(self.err)
+                        return self.stack.pop()
+                except ProxyException as h:
+                    if not self.call_stack:
+                        raise
+                    if f"{sep}chaosvm{sep}" in str(h.stack):
+                        raise
+
+                    metrics.count("chaosvm_exceptions_caught_total")
+                    self.pc, stack_len, catch = self.call_stack.pop()[:3]
+                    self.err = h
+                    self.stack = self.stack[:stack_len]
+                    if catch:
+                        if type(i := self.stack[catch]) is Cell:
+                            i.v = self.err
+                        else:
+                            self.stack[catch] = self.err
+        finally:
+            # bound handlers refer to the frame; without them it is freed once it returns
+            del self.ops
+            if counted:
+                metrics.count("chaosvm_instructions_total", n)
@@ -0,0 +1,11 @@
+from pathlib import Path
+
+from pytest import fixture
+
+CORPUS = sorted((Path(__file__).parent / "corpus").glob("*.js"))
+
+
+@fixture(scope="module", params=CORPUS, ids=[p.stem for p in CORPUS])
+def corpus_js(request) -> str:
+    """A recorded tdc.js from ``tests/corpus``."""
+    return request.param.read_text(encoding="utf8")
@@ -0,0 +1,452 @@
+"""Build the offline tdc.js corpus.
+
+``t.captcha.qq.com`` cannot be reached from CI, so the corpus is made of stand-in scripts
+that share the layout of the real ``tdc.js``: the three ``window`` assignments, the
+``__TENCENT_CHAOS_STACK`` closure, a ``__TENCENT_CHAOS_VM`` template whose op handlers hash
+to :obj:`chaosvm.vm.OP_FEATS`, and a base64 opcode payload. Each version shuffles the op
+order and the template identifiers, just like an upstream rotation does.
+
+The payload is a small collector program (navigator, screen, canvas, webgl, rtc, mouse
+track, timers, try/catch, a bitwise checksum) assembled by :class:`Asm`.
+
+Run ``python tests/corpus/build.py`` to regenerate the ``tdc_*.js`` files.
+"""
+
+from __future__ import annotations
+
+import random
+from base64 import b64encode
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import pyjsparser as jsparser
+
+from chaosvm.parse import parse_opcode_mapping, split_vm
+from chaosvm.vm import OP_FEATS
+
+# fmt: off
+OPS = ("getattr,inst,stepout,geq,copy,inv,arr_popleft,grwinattr,zstr,clear,eq,vm_factory,assign,"
+       "typeof,outcall,new,inst_arr,stop,swap,check_err,throw,contains,setattr,add,n2list,chobj,"
+       "getobj,refeq,stepin,group,wincall,drop,undefined,jump,mul,je,ge,rshift,mod,delattr,false,"
+       "get_global,bitor,sub,xor,grobj,new_attr,true,getobj2,bitand,urshift,realloc,tolist,div,"
+       "grgetattr,lshift,null,concat").split(",")
+# fmt: on
+assert len(OPS) == len(OP_FEATS)
+
+_BIN = "{S}[{S}.length-2]={S}[{S}.length-2]%s{S}.pop()"
+
+# Handler bodies of the template. ``p``/``P``/``w``/``S`` are the four VM parameters
+# (pc, opcodes, window, stack), ``C`` is the try stack and ``E`` the pending error.
+# Handlers missing here have no known source and are left as holes in the op table.
+HANDLERS: Dict[str, str] = dict(
+    getattr="var t={S}.pop();{S}.push(t[0][t[1]])",
+    inst="{S}.push({P}[{p}++])",
+    stepout="{C}.pop()",
+    geq=_BIN % ">=",
+    copy="{S}.push({S}[{S}.length-1])",
+    inv="{S}.push(!{S}.pop())",
+    grwinattr="{S}.push([{w},{S}.pop()])",
+    zstr='{S}.push("")',
+    clear="{E}=null",
+    eq=_BIN % "==",
+    vm_factory="for(var t={P}[{p}++],e=[],n={P}[{p}++],r={P}[{p}++],i=[],o=0;o<n;o++)"
+    "e[{P}[{p}++]]={S}[{P}[{p}++]];for(o=0;o<r;o++)i[o]={P}[{p}++];"
+    "{S}.push(function a(){{var n=e.slice(0);n[0]=[this],n[1]=[arguments],n[2]=[a];"
+    "for(var r=0;r<i.length&&r<arguments.length;r++)0<i[r]&&(n[i[r]]=[arguments[r]]);"
+    "return __TENCENT_CHAOS_VM(t,{P},{w},n)}})",
+    assign="{S}[{S}.length-1]={P}[{p}++]",
+    typeof="{S}.push(typeof {S}.pop())",
+    inst_arr="{S}.push([{P}[{p}++]])",
+    stop="return !0",
+    check_err="return !!{E}",
+    throw="throw {S}[{S}.length-1]",
+    contains=_BIN % " in ",
+    setattr="var t={S}[{S}.length-2];t[0][t[1]]={S}[{S}.length-1]",
+    add=_BIN % "+",
+    chobj="{S}[{S}[{S}.length-2][0]][0]={S}[{S}.length-1]",
+    getobj="{S}.push({S}[{P}[{p}++]][0])",
+    refeq=_BIN % "===",
+    stepin="{C}.push([{P}[{p}++],{S}.length,{P}[{p}++]])",
+    group="{S}.push([{S}.pop(),{S}.pop()].reverse())",
+    wincall="var t={P}[{p}++],e=t?{S}.slice(-t):[];{S}.length-=t,{S}.push({S}.pop().apply({w},e))",
+    drop="{S}.pop()",
+    undefined="{S}.push(undefined)",
+    jump="{p}={P}[{p}++]",
+    mul=_BIN % "*",
+    div=_BIN % "/",
+    je="var t={P}[{p}++];{S}[{S}.length-1]&&({p}=t)",
+    ge=_BIN % ">",
+    rshift=_BIN % ">>",
+    mod=_BIN % "%",
+    delattr="var t={S}.pop();{S}.push(delete t[0][t[1]])",
+    false="{S}.push(!1)",
+    get_global="{S}[{S}.length-1]={w}[{S}[{S}.length-1]]",
+    bitor=_BIN % "|",
+    sub=_BIN % "-",
+    xor=_BIN % "^",
+    grobj="var t={S}.pop();{S}.push([{S}[{S}.pop()][0],t])",
+    true="{S}.push(!0)",
+    getobj2="{S}.push({S}[{S}.pop()[0]][0])",
+    bitand=_BIN % "&",
+    urshift=_BIN % ">>>",
+    realloc="{S}.length={P}[{p}++]",
+    grgetattr="var t={S}.pop(),e={S}.pop();{S}.push([e[0][e[1]],t])",
+    lshift=_BIN % "<<",
+    null="{S}.push(null)",
+    concat="{S}[{S}.length-1]+=String.fromCharCode({P}[{p}++])",
+)
+
+# operand count of each handler, vm_factory is variable and handled by the assembler
+OPERANDS = dict(
+    inst=1, assign=1, inst_arr=1, realloc=1, jump=1, je=1, getobj=1, concat=1, wincall=1, stepin=2
+)
+
+
+CORPUS = Path(__file__).parent
+VERSIONS = {"tdc_a": 11, "tdc_b": 24, "tdc_c": 37}
+"""corpus file stem -> rotation seed"""
+
+
+class Label:
+    pc = -1
+
+
+class Asm:
+    """Emit a program as a list of ``(op name, operands)``, resolving labels on assemble."""
+
+    def __init__(self) -> None:
+        self.code: List[Tuple[str, tuple]] = []
+
+    def __getattr__(self, op: str):
+        if op not in HANDLERS:
+            raise AttributeError(op)
+
+        def emit(*operands: Union[int, Label]):
+            if op != "vm_factory":
+                assert len(operands) == OPERANDS.get(op, 0), op
+            self.code.append((op, operands))
+            return self
+
+        return emit
+
+    def label(self, lb: Label):
+        self.code.append(("", (lb,)))
+        return self
+
+    def str(self, s: str):
+        self.zstr()
+        for c in s.encode():
+            self.concat(c)
+        return self
+
+    def glob(self, name: str):
+        return self.str(name).get_global()
+
+    def prop(self, name: str):
+        """obj -> obj[name]"""
+        return self.str(name).group().getattr()
+
+    def let(self, slot: int, value: Callable[[], Any]):
+        """slot = value()"""
+        self.inst_arr(slot)
+        value()
+        return self.chobj().drop().drop()
+
+    def put(self, obj: Callable[[], Any], name: str, value: Callable[[], Any]):
+        """obj()[name] = value()"""
+        obj()
+        self.str(name).group()
+        value()
+        return self.setattr().drop().drop()
+
+    def assemble(self) -> List[Tuple[str, int]]:
+        pc = 0
+        for op, operands in self.code:
+            if op:
+                pc += 1 + len(operands)
+            else:
+                operands[0].pc = pc
+        out: List[Tuple[str, int]] = []
+        for op, operands in self.code:
+            if op:
+                out.append((op, -1))
+                out.extend(("", o.pc if isinstance(o, Label) else o) for o in operands)
+        return out
+
+
+def collector(tag: str, main_last=False) -> Tuple[Asm, Label]:
+    """The payload program and its entry. Top-level slots: 2 data, 3 track, 4 hash, 5 tdc,
+    6 err, 7 canvas, 8 gl, 9 rtc."""
+    a = Asm()
+    main = Label()
+    a.label(main)
+    L = lambda slot: lambda: a.getobj(slot)  # noqa: E731
+    fn_hash, fn_track, fn_timer, fn_ice = Label(), Label(), Label(), Label()
+    fn_info, fn_data, fn_set, fn_clear = Label(), Label(), Label(), Label()
+    for _ in range(8):
+        a.inst_arr(0)
+
+    a.let(2, lambda: a.glob("Object").wincall(0))
+    a.let(3, lambda: a.glob("Array").wincall(0))
+    a.let(4, lambda: a.vm_factory(fn_hash, 0, 1, 3))
+    nav = lambda name: lambda: a.glob("navigator").prop(name)  # noqa: E731
+    for k, v in dict(
+        ua="userAgent", pf="platform", hc="hardwareConcurrency", ck="cookieEnabled"
+    ).items():
+        a.put(L(2), k, nav(v))
+    a.put(
+        L(2),
+        "lang",
+        lambda: a.glob("navigator").prop("languages").prop("join").str(",").wincall(1),
+    )
+    a.put(
+        L(2),
+        "l0",
+        lambda: a.glob("navigator").str("languages").group().inst(0).grgetattr().getattr(),
+    )
+    a.put(L(2), "tn", lambda: a.glob("navigator").prop("userAgent").typeof())
+    a.put(L(2), "has", lambda: a.str("userAgent").glob("navigator").contains())
+    a.put(L(2), "wd", lambda: a.glob("navigator").prop("webdriver").inv())
+    for k in ("width", "height", "colorDepth"):
+        a.put(L(2), k[:2], lambda: a.glob("screen").prop(k))
+    a.put(L(2), "win", lambda: a.glob("innerWidth").inst(100).mul().glob("innerHeight").add())
+    a.put(L(2), "rat", lambda: a.glob("innerWidth").inst(3).div())
+    a.put(L(2), "mod", lambda: a.glob("innerHeight").inst(7).mod().inst(2).geq())
+    a.put(L(2), "tz", lambda: a.glob("Date").wincall(0).prop("getTimezoneOffset").wincall(0))
+    a.put(L(2), "href", lambda: a.glob("location").prop("href"))
+    a.put(L(2), "ref", lambda: a.glob("location").prop("referer"))
+    a.put(
+        L(2), "css", lambda: a.glob("CSS").prop("supports").str("display").str("grid").wincall(2)
+    )
+    a.put(L(2), "pf2", lambda: a.glob("navigator").prop("platform").str("Win32").refeq())
+    a.put(L(2), "nul", lambda: a.null())
+    a.put(L(2), "tmp", lambda: a.true())
+    a.getobj(2).str("tmp").group().delattr().drop().drop()
+
+    # canvas & webgl
+    a.let(7, lambda: a.glob("document").prop("createElement").str("canvas").wincall(1))
+    a.getobj(7).prop("getContext").str("2d").wincall(1)
+    a.prop("fillText").str(tag).inst(2).inst(2).wincall(3).drop()
+    a.put(L(2), "cv", lambda: a.getobj(4).getobj(7).prop("toDataURL").wincall(0).wincall(1))
+    a.let(8, lambda: a.getobj(7).prop("getContext").str("webgl").wincall(1))
+    a.put(
+        L(2),
+        "gpu",
+        lambda: a.getobj(8)
+        .prop("getParameter")
+        .getobj(8)
+        .prop("getExtension")
+        .str("WEBGL_debug_renderer_info")
+        .wincall(1)
+        .prop("UNMASKED_RENDERER_WEBGL")
+        .wincall(1),
+    )
+    a.put(
+        L(2), "ext", lambda: a.getobj(8).prop("getSupportedExtensions").wincall(0).prop("length")
+    )
+
+    # try { undefined.x } catch (e) { data.err = e.message }
+    catch, done = Label(), Label()
+    a.stepin(catch, 6).undefined().prop("x").drop().stepout().jump(done)
+    a.label(catch).clear().put(L(2), "err", lambda: a.getobj(6).prop("message")).label(done)
+    # try { throw Error(tag) } catch (e) { data.thr = e.message }
+    catch, done = Label(), Label()
+    a.stepin(catch, 6).glob("Error").str(tag).wincall(1).throw().stepout().jump(done)
+    a.label(catch).clear().put(L(2), "thr", lambda: a.getobj(6).prop("message")).label(done)
+
+    # events, timers, rtc
+    a.glob("document").prop("addEventListener").str("mousemove")
+    a.vm_factory(fn_track, 1, 1, 3, 3, 4).wincall(2).drop()
+    a.glob("setTimeout").vm_factory(fn_timer, 1, 0, 3, 2).inst(10).wincall(2).drop()
+    a.let(9, lambda: a.glob("RTCPeerConnection").glob("Object").wincall(0).wincall(1))
+    a.put(L(9), "onicecandidate", lambda: a.vm_factory(fn_ice, 1, 2, 3, 2, 4, 5))
+    a.put(L(2), "ua2", lambda: a.inst_arr(2).str("ua").grobj().getattr())
+
+    # window.TDC
+    a.let(5, lambda: a.glob("Object").wincall(0))
+    a.put(L(5), "getInfo", lambda: a.vm_factory(fn_info, 0, 0))
+    a.put(L(5), "getData", lambda: a.vm_factory(fn_data, 3, 2, 3, 2, 4, 3, 5, 4, 6, 7))
+    a.put(L(5), "setData", lambda: a.vm_factory(fn_set, 1, 1, 3, 2, 4))
+    a.put(L(5), "clearTc", lambda: a.vm_factory(fn_clear, 0, 0))
+    a.str("TDC").grwinattr().inst_arr(5).getobj2().setattr().drop().drop()
+    a.undefined().stop()
+    split = len(a.code)
+
+    # function hash(s): slots 3 s, 4 h, 5 i, 6 String(s)
+    top, end = Label(), Label()
+    a.label(fn_hash).inst_arr(0).inst_arr(0).inst_arr(0)
+    a.let(6, lambda: a.glob("String").getobj(3).wincall(1))
+    a.label(top).getobj(6).prop("length").getobj(5).ge().inv().je(end).drop()
+    a.let(
+        4,
+        lambda: a.getobj(4)
+        .inst(5)
+        .lshift()
+        .getobj(4)
+        .sub()
+        .getobj(6)
+        .prop("charCodeAt")
+        .getobj(5)
+        .wincall(1)
+        .add()
+        .inst(0)
+        .bitor(),
+    )
+    a.let(5, lambda: a.getobj(5).inst(1).add()).jump(top)
+    a.label(end).drop().getobj(4).inst(0).urshift().stop()
+
+    # function(ev) { track.push(ev.pageX); track.push(ev.pageY) }: slots 3 track, 4 ev
+    a.label(fn_track)
+    for k in ("pageX", "pageY"):
+        a.getobj(3).prop("push").getobj(4).prop(k).wincall(1).drop()
+    a.undefined().stop()
+
+    # function() { data.to = 1 }: slot 3 data
+    a.label(fn_timer).put(L(3), "to", lambda: a.inst(1)).undefined().stop()
+
+    # function(_, ev) { data.ip = RegExp(...).exec(ev.candidate.candidate)[0] }
+    a.label(fn_ice).put(
+        L(3),
+        "ip",
+        lambda: a.glob("RegExp")
+        .str(r"\d+\.\d+\.\d+\.\d+")
+        .wincall(1)
+        .prop("exec")
+        .getobj(5)
+        .prop("candidate")
+        .prop("candidate")
+        .wincall(1)
+        .inst(0)
+        .group()
+        .getattr(),
+    )
+    a.undefined().stop()
+
+    # function() { return {info: tag} }: slot 3 o
+    a.label(fn_info).inst_arr(0).let(3, lambda: a.glob("Object").wincall(0))
+    a.put(L(3), "info", lambda: a.str(tag)).getobj(3).stop()
+
+    # function(_, _): 3 data, 4 track, 5 hash, 6/7 args, 8 s, 9 k, 10 i, 11 acc, 12 String(s)
+    top, end = Label(), Label()
+    a.label(fn_data).inst_arr(0).inst_arr(0).inst_arr(0).inst_arr(0).inst_arr(0)
+    a.put(L(3), "ts", lambda: a.glob("Date").wincall(0).prop("getTime").wincall(0))
+    a.put(
+        L(3),
+        "rnd",
+        lambda: a.glob("Math")
+        .prop("floor")
+        .glob("Math")
+        .prop("random")
+        .wincall(0)
+        .inst(1000)
+        .mul()
+        .wincall(1),
+    )
+    a.put(L(3), "track", lambda: a.getobj(4).prop("join").str(",").wincall(1))
+    a.put(L(3), "n", lambda: a.getobj(4).prop("length").inst(1).rshift())
+    a.let(8, lambda: a.str("").glob("JSON").prop("stringify").getobj(3).wincall(1).add())
+    a.let(9, lambda: a.getobj(5).getobj(8).wincall(1))
+    a.let(11, lambda: a.str(""))
+    a.let(12, lambda: a.glob("String").getobj(8).wincall(1))
+    a.label(top).getobj(12).prop("length").getobj(10).ge().inv().je(end).drop()
+    a.let(
+        11,
+        lambda: a.getobj(11)
+        .glob("String")
+        .prop("fromCharCode")
+        .getobj(12)
+        .prop("charCodeAt")
+        .getobj(10)
+        .wincall(1)
+        .getobj(9)
+        .getobj(10)
+        .inst(24)
+        .mod()
+        .urshift()
+        .xor()
+        .inst(15)
+        .bitand()
+        .inst(65)
+        .add()
+        .wincall(1)
+        .add(),
+    )
+    a.let(9, lambda: a.getobj(9).getobj(9).inst(13).lshift().xor().inst(0).bitor())
+    a.let(10, lambda: a.getobj(10).inst(1).add()).jump(top)
+    a.label(end).drop()
+    a.str("").glob("encodeURIComponent").getobj(8).str("&sig=").add().getobj(11).add()
+    a.wincall(1).add().stop()
+
+    # function(o) { data.sd = o }: slots 3 data, 4 o
+    a.label(fn_set).put(L(3), "sd", L(4)).undefined().stop()
+    a.label(fn_clear).undefined().stop()
+    if main_last:
+        a.code = a.code[split:] + a.code[:split]
+    return a, main
+
+
+TEMPLATE = """\
+window.{n0}=function(){{return new(Function.prototype.bind.apply(Date,[null].concat([].slice.call(arguments))))}};
+window.{n1}=function(t,e){{return Date[t].apply(Date,e)}};
+window.{n2}="{tag}";
+var __TENCENT_CHAOS_STACK=function(){{
+function __TENCENT_CHAOS_VM({p},{P},{w},{S}){{var {Q}=[{ops}];var {C}=[],{E}=null;{S}={S}||[[{w}],[{{}}]];\
+for(;;)try{{for(var {G}=!1;!{G};){G}={Q}[{P}[{p}++]]();if({E})throw {E};return {S}.pop()}}\
+catch(r){{var i={C}.pop();if(!i)throw r;{E}=r,{p}=i[0],{S}.length=i[1],i[2]&&({S}[i[2]][0]=r)}}}}
+return __TENCENT_CHAOS_VM.v=0,__TENCENT_CHAOS_VM({pc},function(e){{\
+for(var t=atob(e[0]),n=e[1],r=[],i=0,o=0;i<t.length||o<n.length;)\
+o<n.length&&n[o]==r.length?(r.push(n[o+1]),o+=2):r.push(t.charCodeAt(i++));return r}}\
+(["{b64}",[{arr}]]),window)
+}}();
+"""
+
+
+def rotate(seed: int) -> Tuple[Dict[str, str], List[str]]:
+    """Pick template identifiers and a template op order (``""`` marks a hole)."""
+    rnd = random.Random(seed)
+    letters = rnd.sample("ABCDFGHIJKLMNOPQRSUVWXYZ", 8)
+    names = dict(zip("pPwSCEQG", letters))
+    names.update({f"n{i}": "".join(rnd.sample("abcdefghijklmnopqrstuvwxyz", 6)) for i in range(3)})
+    order = [op if op in HANDLERS else "" for op in OPS]
+    rnd.shuffle(order)
+    return names, order
+
+
+def encode(codes: List[int]) -> Tuple[str, List[int]]:
+    """Inverse of :func:`chaosvm.parse.parse_opcodes`."""
+    data, arr = bytearray(), []
+    for i, c in enumerate(codes):
+        if 0 <= c < 256:
+            data.append(c)
+        else:
+            arr += [i, c]
+    return b64encode(bytes(data)).decode(), arr
+
+
+def build(tag: str, seed: int) -> str:
+    names, order = rotate(seed)
+    pos = {op: i for i, op in enumerate(order) if op}
+    asm, main = collector(tag, main_last=bool(seed % 2))
+    codes = [pos[op] if op else v for op, v in asm.assemble()]
+    # keep the payload free of base64 padding
+    while len([c for c in codes if 0 <= c < 256]) % 3:
+        codes.append(pos["stop"])
+    b64, arr = encode(codes)
+    ops = ",".join("function(){%s}" % HANDLERS[op].format(**names) if op else "" for op in order)
+    return TEMPLATE.format(
+        ops=ops, pc=main.pc, b64=b64, arr=",".join(map(str, arr)), tag=tag, **names
+    )
+
+
+def check(js: str):
+    """Make sure every handler in the template hashes to a known op."""
+    parts = split_vm(jsparser.parse(js))
+    opmap = parse_opcode_mapping(parts.vm_declare)
+    assert len(opmap) == len(HANDLERS), opmap
+
+
+if __name__ == "__main__":
+    for stem, seed in VERSIONS.items():
+        js = build(stem, seed)
+        check(js)
+        (CORPUS / f"{stem}.js").write_text(js, encoding="utf8")
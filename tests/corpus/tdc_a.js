@@ -0,0 +1,7 @@
+window.zqputf=function(){return new(Function.prototype.bind.apply(Date,[null].concat([].slice.call(arguments))))};
+window.dojecr=function(t,e){return Date[t].apply(Date,e)};
+window.zwubtm="tdc_a";
+var __TENCENT_CHAOS_STACK=function(){
+function __TENCENT_CHAOS_VM(P,S,Z,X){var H=[function(){X[X.length-2]=X[X.length-2]>X.pop()},function(){for(var t=S[P++],e=[],n=S[P++],r=S[P++],i=[],o=0;o<n;o++)e[S[P++]]=X[S[P++]];for(o=0;o<r;o++)i[o]=S[P++];X.push(function a(){var n=e.slice(0);n[0]=[this],n[1]=[arguments],n[2]=[a];for(var r=0;r<i.length&&r<arguments.length;r++)0<i[r]&&(n[i[r]]=[arguments[r]]);return __TENCENT_CHAOS_VM(t,S,Z,n)})},function(){X.push(X[S[P++]][0])},function(){X[X.length-2]=X[X.length-2]^X.pop()},function(){X[X.length-2]=X[X.length-2] in X.pop()},function(){X[X.length-2]=X[X.length-2]+X.pop()},,function(){X[X.length-2]=X[X.length-2]/X.pop()},function(){return !!U},function(){X[X.length-2]=X[X.length-2]*X.pop()},function(){var t=S[P++],e=t?X.slice(-t):[];X.length-=t,X.push(X.pop().apply(Z,e))},,function(){X.push(X[X.pop()[0]][0])},function(){X[X.length-2]=X[X.length-2]===X.pop()},function(){X[X.length-2]=X[X.length-2]|X.pop()},function(){X[X.length-2]=X[X.length-2]-X.pop()},function(){X[X.length-2]=X[X.length-2]<<X.pop()},function(){X[X[X.length-2][0]][0]=X[X.length-1]},function(){X.push(undefined)},function(){U=null},function(){X.push([S[P++]])},function(){X.push([Z,X.pop()])},,function(){X.length=S[P++]},function(){var t=X[X.length-2];t[0][t[1]]=X[X.length-1]},,function(){return !0},function(){X.push(typeof X.pop())},function(){X.push("")},function(){X.push(!1)},function(){var t=S[P++];X[X.length-1]&&(P=t)},function(){X.push(!X.pop())},function(){X[X.length-2]=X[X.length-2]>>>X.pop()},function(){X.pop()},,,function(){X[X.length-2]=X[X.length-2]&X.pop()},function(){var t=X.pop();X.push([X[X.pop()][0],t])},function(){X[X.length-2]=X[X.length-2]>>X.pop()},function(){X[X.length-1]+=String.fromCharCode(S[P++])},function(){throw X[X.length-1]},function(){X.push([X.pop(),X.pop()].reverse())},function(){X.push(S[P++])},function(){X[X.length-2]=X[X.length-2]%X.pop()},,function(){X[X.length-1]=S[P++]},function(){R.pop()},function(){X[X.length-2]=X[X.length-2]>=X.pop()},function(){X.push(X[X.length-1])},function(){P=S[P++]},function(){var t=X.pop();X.push(t[0][t[1]])},function(){var t=X.pop(),e=X.pop();X.push([e[0][e[1]],t])},function(){X[X.length-2]=X[X.length-2]==X.pop()},function(){X.push(null)},function(){var t=X.pop();X.push(delete t[0][t[1]])},function(){X.push(!0)},function(){X[X.length-1]=Z[X[X.length-1]]},function(){R.push([S[P++],X.length,S[P++]])}];var R=[],U=null;X=X||[[Z],[{}]];for(;;)try{for(var G=!1;!G;)G=H[S[P++]]();if(U)throw U;return X.pop()}catch(r){var i=R.pop();if(!i)throw r;U=r,P=i[0],X.length=i[1],i[2]&&(X[i[2]][0]=r)}}
+return __TENCENT_CHAOS_VM.v=0,__TENCENT_CHAOS_VM(867,function(e){for(var t=atob(e[0]),n=e[1],r=[],i=0,o=0;i<t.length||o<n.length;)o<n.length&&n[o]==r.length?(r.push(n[o+1]),o+=2):r.push(t.charCodeAt(i++));return r}(["FAAUABQAFAYcJ1MndCdyJ2knbidnOAIDCgERISECBhwnbCdlJ24nZyd0J2gpMgIFAB8ebyEUBAIEKgUQAgQPAgYcJ2MnaCdhJ3InQydvJ2QnZSdBJ3QpMgIFCgEFKgAOESEhFAUCBSoBBREhITEdIQIEKgAgGgIDHCdwJ3UncydoKTICBBwncCdhJ2cnZSdYKTIKASECAxwncCd1J3MnaCkyAgQcJ3AnYSdnJ2UnWSkyCgEhEhoCAxwndCdvKSoBGCEhEhoCAxwnaSdwKRwnUidlJ2cnRSd4J3A4HCdcJ2QnKydcJy4nXCdkJysnXCcuJ1wnZCcrJ1wnLidcJ2QnKwoBHCdlJ3gnZSdjKTICBRwnYydhJ24nZCdpJ2QnYSd0J2UpMhwnYydhJ24nZCdpJ2QnYSd0J2UpMgoBKgApMhghIRIaFAAUAxwnTydiJ2onZSdjJ3Q4CgARISECAxwnaSduJ2YnbykcJ3QnZCdjJ18nYRghIQIDGhQAFAAUABQAFAACAxwndCdzKRwnRCdhJ3QnZTgKABwnZydlJ3QnVCdpJ20nZSkyCgAYISECAxwnciduJ2QpHCdNJ2EndCdoOBwnZidsJ28nbydyKTIcJ00nYSd0J2g4HCdyJ2EnbidkJ28nbSkyCgAqCQoBGCEhAgMcJ3QncidhJ2MnaykCBBwnaidvJ2knbikyHCcsCgEYISECAxwnbikCBBwnbCdlJ24nZyd0J2gpMioBJhghIRQIHBwnSidTJ08nTjgcJ3MndCdyJ2knbidnJ2knZid5KTICAwoBBREhIRQJAgUCCAoBESEhFAscESEhFAwcJ1MndCdyJ2knbidnOAIICgERISECDBwnbCdlJ24nZyd0J2gpMgIKAB8eIRQLAgscJ1MndCdyJ2knbidnOBwnZidyJ28nbSdDJ2gnYSdyJ0MnbydkJ2UpMgIMHCdjJ2gnYSdyJ0MnbydkJ2UnQSd0KTICCgoBAgkCCioYKyADKg8kKkEFCgEFESEhFAkCCQIJKg0QAyoADhEhIRQKAgoqAQURISExIRwcJ2UnbidjJ28nZCdlJ1UnUidJJ0MnbydtJ3AnbyduJ2Unbid0OAIIHCcmJ3MnaSdnJz0FAgsFCgEFGgIDHCdzJ2QpAgQYISESGhIaFAAUABQAFAAUABQAFAAUABQCHCdPJ2InaidlJ2MndDgKABEhIRQDHCdBJ3IncidhJ3k4CgARISEUBAEAAAEDESEhAgIcJ3UnYSkcJ24nYSd2J2knZydhJ3QnbydyOBwndSdzJ2UncidBJ2cnZSduJ3QpMhghIQICHCdwJ2YpHCduJ2EndidpJ2cnYSd0J28ncjgcJ3AnbCdhJ3QnZidvJ3InbSkyGCEhAgIcJ2gnYykcJ24nYSd2J2knZydhJ3QnbydyOBwnaCdhJ3InZCd3J2EncidlJ0MnbyduJ2MndSdyJ3InZSduJ2MneSkyGCEhAgIcJ2MnaykcJ24nYSd2J2knZydhJ3QnbydyOBwnYydvJ28naydpJ2UnRSduJ2EnYidsJ2UnZCkyGCEhAgIcJ2wnYSduJ2cpHCduJ2EndidpJ2cnYSd0J28ncjgcJ2wnYSduJ2cndSdhJ2cnZSdzKTIcJ2onbydpJ24pMhwnLAoBGCEhAgIcJ2wnMCkcJ24nYSd2J2knZydhJ3QnbydyOBwnbCdhJ24nZyd1J2EnZydlJ3MpKgAzMhghIQICHCd0J24pHCduJ2EndidpJ2cnYSd0J28ncjgcJ3UncydlJ3InQSdnJ2Unbid0KTIbGCEhAgIcJ2gnYSdzKRwndSdzJ2UncidBJ2cnZSduJ3QcJ24nYSd2J2knZydhJ3QnbydyOAQYISECAhwndydkKRwnbidhJ3YnaSdnJ2EndCdvJ3I4HCd3J2UnYidkJ3InaSd2J2UncikyHxghIQICHCd3J2kpHCdzJ2MncidlJ2UnbjgcJ3cnaSdkJ3QnaCkyGCEhAgIcJ2gnZSkcJ3MnYydyJ2UnZSduOBwnaCdlJ2knZydoJ3QpMhghIQICHCdjJ28pHCdzJ2MncidlJ2UnbjgcJ2MnbydsJ28ncidEJ2UncCd0J2gpMhghIQICHCd3J2knbikcJ2knbiduJ2UncidXJ2knZCd0J2g4KmQJHCdpJ24nbidlJ3InSCdlJ2knZydoJ3Q4BRghIQICHCdyJ2EndCkcJ2knbiduJ2UncidXJ2knZCd0J2g4KgMHGCEhAgIcJ20nbydkKRwnaSduJ24nZSdyJ0gnZSdpJ2cnaCd0OCoHKyoCLxghIQICHCd0J3opHCdEJ2EndCdlOAoAHCdnJ2UndCdUJ2knbSdlJ3onbyduJ2UnTydmJ2YncydlJ3QpMgoAGCEhAgIcJ2gncidlJ2YpHCdsJ28nYydhJ3QnaSdvJ244HCdoJ3InZSdmKTIYISECAhwncidlJ2YpHCdsJ28nYydhJ3QnaSdvJ244HCdyJ2UnZidlJ3InZSdyKTIYISECAhwnYydzJ3MpHCdDJ1MnUzgcJ3MndSdwJ3AnbydyJ3QncykyHCdkJ2kncydwJ2wnYSd5HCdnJ3InaSdkCgIYISECAhwncCdmJzIpHCduJ2EndidpJ2cnYSd0J28ncjgcJ3AnbCdhJ3QnZidvJ3InbSkyHCdXJ2knbiczJzINGCEhAgIcJ24ndSdsKTUYISECAhwndCdtJ3ApNxghIQICHCd0J20ncCk2ISEUBxwnZCdvJ2MndSdtJ2Unbid0OBwnYydyJ2UnYSd0J2UnRSdsJ2UnbSdlJ24ndCkyHCdjJ2Enbid2J2EncwoBESEhAgccJ2cnZSd0J0MnbyduJ3QnZSd4J3QpMhwnMidkCgEcJ2YnaSdsJ2wnVCdlJ3gndCkyHCd0J2QnYydfJ2EqAioCCgMhAgIcJ2MndikCBAIHHCd0J28nRCdhJ3QnYSdVJ1InTCkyCgAKARghIRQIAgccJ2cnZSd0J0MnbyduJ3QnZSd4J3QpMhwndydlJ2InZydsCgERISECAhwnZydwJ3UpAggcJ2cnZSd0J1AnYSdyJ2EnbSdlJ3QnZSdyKTICCBwnZydlJ3QnRSd4J3QnZSduJ3MnaSdvJ24pMhwnVydFJ0InRydMJ18nZCdlJ2IndSdnJ18ncidlJ24nZCdlJ3InZSdyJ18naSduJ2YnbwoBHCdVJ04nTSdBJ1MnSydFJ0QnXydSJ0UnTidEJ0UnUidFJ1InXydXJ0UnQidHJ0wpMgoBGCEhAgIcJ2UneCd0KQIIHCdnJ2UndCdTJ3UncCdwJ28ncid0J2UnZCdFJ3gndCdlJ24ncydpJ28nbidzKTIKABwnbCdlJ24nZyd0J2gpMhghITkGEhwneCkyIS4xEwICHCdlJ3IncikCBhwnbSdlJ3MncydhJ2cnZSkyGCEhOQYcJ0UncidyJ28ncjgcJ3QnZCdjJ18nYQoBKC4xEwICHCd0J2gncikCBhwnbSdlJ3MncydhJ2cnZSkyGCEhHCdkJ28nYyd1J20nZSduJ3Q4HCdhJ2QnZCdFJ3YnZSduJ3QnTCdpJ3MndCdlJ24nZSdyKTIcJ20nbyd1J3MnZSdtJ28ndidlAXYBAQMDBAoCIRwncydlJ3QnVCdpJ20nZSdvJ3UndDgBtgEAAwIqCgoCIRQJHCdSJ1QnQydQJ2UnZSdyJ0MnbyduJ24nZSdjJ3QnaSdvJ244HCdPJ2InaidlJ2MndDgKAAoBESEhAgkcJ28nbidpJ2MnZSdjJ2EnbidkJ2knZCdhJ3QnZSkBxQECAwIEBRghIQICHCd1J2EnMikUAhwndSdhJTIYISEUBRwnTydiJ2onZSdjJ3Q4CgARISECBRwnZydlJ3QnSSduJ2YnbykBAAAYISECBRwnZydlJ3QnRCdhJ3QnYSkBAwIDAgQDBQQGBxghIQIFHCdzJ2UndCdEJ2EndCdhKQEBAQMCBBghIQIFHCdjJ2wnZSdhJ3InVCdjKQEAABghIRwnVCdEJ0MVFAUMGCEhEhoa",[489,1000,664,789,788,642,2522,2534,2533,2567,2568,2599,2598,2632,2911,324,2936,376,2969,850,2997,865]]),window)
+}();
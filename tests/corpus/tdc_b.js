@@ -0,0 +1,7 @@
+window.vzcwej=function(){return new(Function.prototype.bind.apply(Date,[null].concat([].slice.call(arguments))))};
+window.xyaowu=function(t,e){return Date[t].apply(Date,e)};
+window.daqfpo="tdc_b";
+var __TENCENT_CHAOS_STACK=function(){
+function __TENCENT_CHAOS_VM(Y,N,U,G){var V=[function(){var t=G.pop(),e=G.pop();G.push([e[0][e[1]],t])},function(){var t=G.pop();G.push(t[0][t[1]])},function(){Y=N[Y++]},function(){G[G.length-2]=G[G.length-2]>G.pop()},function(){G.push(!1)},function(){G.push([G.pop(),G.pop()].reverse())},function(){G.push([U,G.pop()])},function(){G[G[G.length-2][0]][0]=G[G.length-1]},function(){G.push(N[Y++])},function(){for(var t=N[Y++],e=[],n=N[Y++],r=N[Y++],i=[],o=0;o<n;o++)e[N[Y++]]=G[N[Y++]];for(o=0;o<r;o++)i[o]=N[Y++];G.push(function a(){var n=e.slice(0);n[0]=[this],n[1]=[arguments],n[2]=[a];for(var r=0;r<i.length&&r<arguments.length;r++)0<i[r]&&(n[i[r]]=[arguments[r]]);return __TENCENT_CHAOS_VM(t,N,U,n)})},function(){G[G.length-1]=N[Y++]},function(){G[G.length-2]=G[G.length-2]>=G.pop()},,function(){G.length=N[Y++]},function(){G[G.length-2]=G[G.length-2]===G.pop()},,function(){G[G.length-2]=G[G.length-2]%G.pop()},function(){G.push(G[N[Y++]][0])},function(){H.push([N[Y++],G.length,N[Y++]])},function(){G[G.length-2]=G[G.length-2]&G.pop()},function(){var t=G[G.length-2];t[0][t[1]]=G[G.length-1]},function(){G[G.length-2]=G[G.length-2]>>>G.pop()},function(){G[G.length-2]=G[G.length-2]>>G.pop()},function(){G[G.length-2]=G[G.length-2]^G.pop()},function(){G.push(undefined)},,function(){var t=N[Y++];G[G.length-1]&&(Y=t)},function(){var t=N[Y++],e=t?G.slice(-t):[];G.length-=t,G.push(G.pop().apply(U,e))},function(){G[G.length-2]=G[G.length-2]|G.pop()},function(){return !0},function(){G.push("")},,function(){G[G.length-2]=G[G.length-2]<<G.pop()},function(){W=null},,,,function(){var t=G.pop();G.push([G[G.pop()][0],t])},function(){G[G.length-2]=G[G.length-2] in G.pop()},function(){G.push(!0)},function(){G.push(typeof G.pop())},function(){H.pop()},function(){G[G.length-2]=G[G.length-2]+G.pop()},function(){G[G.length-1]=U[G[G.length-1]]},function(){G[G.length-2]=G[G.length-2]*G.pop()},function(){G.push(G[G.length-1])},function(){G.push(null)},function(){throw G[G.length-1]},function(){G[G.length-2]=G[G.length-2]/G.pop()},function(){G[G.length-2]=G[G.length-2]==G.pop()},function(){var t=G.pop();G.push(delete t[0][t[1]])},function(){G.push([N[Y++]])},function(){G.push(G[G.pop()[0]][0])},function(){G[G.length-1]+=String.fromCharCode(N[Y++])},function(){G.push(!G.pop())},function(){G.pop()},function(){return !!W},function(){G[G.length-2]=G[G.length-2]-G.pop()}];var H=[],W=null;G=G||[[U],[{}]];for(;;)try{for(var X=!1;!X;)X=V[N[Y++]]();if(W)throw W;return G.pop()}catch(r){var i=H.pop();if(!i)throw r;W=r,Y=i[0],G.length=i[1],i[2]&&(G[i[2]][0]=r)}}
+return __TENCENT_CHAOS_VM.v=0,__TENCENT_CHAOS_VM(0,function(e){for(var t=atob(e[0]),n=e[1],r=[],i=0,o=0;i<t.length||o<n.length;)o<n.length&&n[o]==r.length?(r.push(n[o+1]),o+=2):r.push(t.charCodeAt(i++));return r}(["MwAzADMAMwAzADMAMwAzADMCHjVPNWI1ajVlNWM1dCsbAAc3NzMDHjVBNXI1cjVhNXkrGwAHNzczBAkAAQMHNzcRAh41dTVhBR41bjVhNXY1aTVnNWE1dDVvNXIrHjV1NXM1ZTVyNUE1ZzVlNW41dAUBFDc3EQIeNXA1ZgUeNW41YTV2NWk1ZzVhNXQ1bzVyKx41cDVsNWE1dDVmNW81cjVtBQEUNzcRAh41aDVjBR41bjVhNXY1aTVnNWE1dDVvNXIrHjVoNWE1cjVkNXc1YTVyNWU1QzVvNW41YzV1NXI1cjVlNW41YzV5BQEUNzcRAh41YzVrBR41bjVhNXY1aTVnNWE1dDVvNXIrHjVjNW81bzVrNWk1ZTVFNW41YTViNWw1ZTVkBQEUNzcRAh41bDVhNW41ZwUeNW41YTV2NWk1ZzVhNXQ1bzVyKx41bDVhNW41ZzV1NWE1ZzVlNXMFAR41ajVvNWk1bgUBHjUsGwEUNzcRAh41bDUwBR41bjVhNXY1aTVnNWE1dDVvNXIrHjVsNWE1bjVnNXU1YTVnNWU1cwUIAAABFDc3EQIeNXQ1bgUeNW41YTV2NWk1ZzVhNXQ1bzVyKx41dTVzNWU1cjVBNWc1ZTVuNXQFASgUNzcRAh41aDVhNXMFHjV1NXM1ZTVyNUE1ZzVlNW41dB41bjVhNXY1aTVnNWE1dDVvNXIrJhQ3NxECHjV3NWQFHjVuNWE1djVpNWc1YTV0NW81ciseNXc1ZTViNWQ1cjVpNXY1ZTVyBQE2FDc3EQIeNXc1aQUeNXM1YzVyNWU1ZTVuKx41dzVpNWQ1dDVoBQEUNzcRAh41aDVlBR41czVjNXI1ZTVlNW4rHjVoNWU1aTVnNWg1dAUBFDc3EQIeNWM1bwUeNXM1YzVyNWU1ZTVuKx41YzVvNWw1bzVyNUQ1ZTVwNXQ1aAUBFDc3EQIeNXc1aTVuBR41aTVuNW41ZTVyNVc1aTVkNXQ1aCsIZCweNWk1bjVuNWU1cjVINWU1aTVnNWg1dCsqFDc3EQIeNXI1YTV0BR41aTVuNW41ZTVyNVc1aTVkNXQ1aCsIAzAUNzcRAh41bTVvNWQFHjVpNW41bjVlNXI1SDVlNWk1ZzVoNXQrCAcQCAILFDc3EQIeNXQ1egUeNUQ1YTV0NWUrGwAeNWc1ZTV0NVQ1aTVtNWU1ejVvNW41ZTVPNWY1ZjVzNWU1dAUBGwAUNzcRAh41aDVyNWU1ZgUeNWw1bzVjNWE1dDVpNW81biseNWg1cjVlNWYFARQ3NxECHjVyNWU1ZgUeNWw1bzVjNWE1dDVpNW81biseNXI1ZTVmNWU1cjVlNXIFARQ3NxECHjVjNXM1cwUeNUM1UzVTKx41czV1NXA1cDVvNXI1dDVzBQEeNWQ1aTVzNXA1bDVhNXkeNWc1cjVpNWQbAhQ3NxECHjVwNWY1MgUeNW41YTV2NWk1ZzVhNXQ1bzVyKx41cDVsNWE1dDVmNW81cjVtBQEeNVc1aTVuNTM1Mg4UNzcRAh41bjV1NWwFLhQ3NxECHjV0NW01cAUnFDc3EQIeNXQ1bTVwBTI3NzMHHjVkNW81YzV1NW01ZTVuNXQrHjVjNXI1ZTVhNXQ1ZTVFNWw1ZTVtNWU1bjV0BQEeNWM1YTVuNXY1YTVzGwEHNzcRBx41ZzVlNXQ1QzVvNW41dDVlNXg1dAUBHjUyNWQbAR41ZjVpNWw1bDVUNWU1eDV0BQEeNXQ1ZDVjNV81YggCCAIbAzcRAh41YzV2BREEEQceNXQ1bzVENWE1dDVhNVU1UjVMBQEbABsBFDc3MwgRBx41ZzVlNXQ1QzVvNW41dDVlNXg1dAUBHjV3NWU1YjVnNWwbAQc3NxECHjVnNXA1dQURCB41ZzVlNXQ1UDVhNXI1YTVtNWU1dDVlNXIFAREIHjVnNWU1dDVFNXg1dDVlNW41czVpNW81bgUBHjVXNUU1QjVHNUw1XzVkNWU1YjV1NWc1XzVyNWU1bjVkNWU1cjVlNXI1XzVpNW41ZjVvGwEeNVU1TjVNNUE1UzVLNUU1RDVfNVI1RTVONUQ1RTVSNUU1UjVfNVc1RTVCNUc1TAUBGwEUNzcRAh41ZTV4NXQFEQgeNWc1ZTV0NVM1dTVwNXA1bzVyNXQ1ZTVkNUU1eDV0NWU1bjVzNWk1bzVuNXMFARsAHjVsNWU1bjVnNXQ1aAUBFDc3EgYYHjV4BQE3KQIhEQIeNWU1cjVyBREGHjVtNWU1czVzNWE1ZzVlBQEUNzcSBh41RTVyNXI1bzVyKx41dDVkNWM1XzViGwEvKQIhEQIeNXQ1aDVyBREGHjVtNWU1czVzNWE1ZzVlBQEUNzceNWQ1bzVjNXU1bTVlNW41dCseNWE1ZDVkNUU1djVlNW41dDVMNWk1czV0NWU1bjVlNXIFAR41bTVvNXU1czVlNW01bzV2NWUJAQEDAwQbAjceNXM1ZTV0NVQ1aTVtNWU1bzV1NXQrCQEAAwIIChsCNzMJHjVSNVQ1QzVQNWU1ZTVyNUM1bzVuNW41ZTVjNXQ1aTVvNW4rHjVPNWI1ajVlNWM1dCsbABsBBzc3EQkeNW81bjVpNWM1ZTVjNWE1bjVkNWk1ZDVhNXQ1ZQUJAQIDAgQFFDc3EQIeNXU1YTUyBTMCHjV1NWElARQ3NzMFHjVPNWI1ajVlNWM1dCsbAAc3NxEFHjVnNWU1dDVJNW41ZjVvBQkAABQ3NxEFHjVnNWU1dDVENWE1dDVhBQkDAgMCBAMFBAYHFDc3EQUeNXM1ZTV0NUQ1YTV0NWEFCQEBAwIEFDc3EQUeNWM1bDVlNWE1cjVUNWMFCQAAFDc3HjVUNUQ1QwYzBTQUNzcYHTMAMwAzADMGHjVTNXQ1cjVpNW41ZysRAxsBBzc3EQYeNWw1ZTVuNWc1dDVoBQERBQM2GjczBBEECAUgEQQ5EQYeNWM1aDVhNXI1QzVvNWQ1ZTVBNXQFAREFGwEqCAAcBzc3MwURBQgBKgc3NwI3EQQIABUdEQMeNXA1dTVzNWgFAREEHjVwNWE1ZzVlNVgFARsBNxEDHjVwNXU1czVoBQERBB41cDVhNWc1ZTVZBQEbATcYHREDHjV0NW8FCAEUNzcYHREDHjVpNXAFHjVSNWU1ZzVFNXg1cCseNVw1ZDUrNVw1LjVcNWQ1KzVcNS41XDVkNSs1XDUuNVw1ZDUrGwEeNWU1eDVlNWMFAREFHjVjNWE1bjVkNWk1ZDVhNXQ1ZQUBHjVjNWE1bjVkNWk1ZDVhNXQ1ZQUBGwEIAAUBFDc3GB0zADMDHjVPNWI1ajVlNWM1dCsbAAc3NxEDHjVpNW41ZjVvBR41dDVkNWM1XzViFDc3EQMdMwAzADMAMwAzABEDHjV0NXMFHjVENWE1dDVlKxsAHjVnNWU1dDVUNWk1bTVlBQEbABQ3NxEDHjVyNW41ZAUeNU01YTV0NWgrHjVmNWw1bzVvNXIFAR41TTVhNXQ1aCseNXI1YTVuNWQ1bzVtBQEbAAgsGwEUNzcRAx41dDVyNWE1YzVrBREEHjVqNW81aTVuBQEeNSwbARQ3NxEDHjVuBREEHjVsNWU1bjVnNXQ1aAUBCAEWFDc3MwgeHjVKNVM1TzVOKx41czV0NXI1aTVuNWc1aTVmNXkFAREDGwEqBzc3MwkRBREIGwEHNzczCx4HNzczDB41UzV0NXI1aTVuNWcrEQgbAQc3NxEMHjVsNWU1bjVnNXQ1aAUBEQoDNho3MwsRCx41UzV0NXI1aTVuNWcrHjVmNXI1bzVtNUM1aDVhNXI1QzVvNWQ1ZQUBEQweNWM1aDVhNXI1QzVvNWQ1ZTVBNXQFAREKGwERCREKCBgQFRcIDxMIQSobASoHNzczCREJEQkIDSAXCAAcBzc3MwoRCggBKgc3NwI3Hh41ZTVuNWM1bzVkNWU1VTVSNUk1QzVvNW01cDVvNW41ZTVuNXQrEQgeNSY1czVpNWc1PSoRCyobASodEQMeNXM1ZAURBBQ3NxgdGB0d",[59,2152,1655,1667,1666,1700,1701,1732,1731,1765,1838,2270,1870,2334,1972,2349,2044,2476,2069,2528,2102,3002,2130,3017,2203,2263,2262,2181,2641,1000,2816,2941,2940,2794]]),window)
+}();
@@ -0,0 +1,7 @@
+window.qdvotj=function(){return new(Function.prototype.bind.apply(Date,[null].concat([].slice.call(arguments))))};
+window.mxnoeb=function(t,e){return Date[t].apply(Date,e)};
+window.cnzrjl="tdc_c";
+var __TENCENT_CHAOS_STACK=function(){
+function __TENCENT_CHAOS_VM(X,V,C,Y){var M=[,function(){Y.push(!Y.pop())},function(){Y[Y.length-1]=V[X++]},function(){Y[Y.length-2]=Y[Y.length-2]^Y.pop()},,function(){for(var t=V[X++],e=[],n=V[X++],r=V[X++],i=[],o=0;o<n;o++)e[V[X++]]=Y[V[X++]];for(o=0;o<r;o++)i[o]=V[X++];Y.push(function a(){var n=e.slice(0);n[0]=[this],n[1]=[arguments],n[2]=[a];for(var r=0;r<i.length&&r<arguments.length;r++)0<i[r]&&(n[i[r]]=[arguments[r]]);return __TENCENT_CHAOS_VM(t,V,C,n)})},function(){Y.pop()},,function(){var t=V[X++];Y[Y.length-1]&&(X=t)},function(){var t=V[X++],e=t?Y.slice(-t):[];Y.length-=t,Y.push(Y.pop().apply(C,e))},function(){return !0},function(){Y.push(Y[Y.pop()[0]][0])},function(){Y[Y.length-2]=Y[Y.length-2]>=Y.pop()},function(){Y.push(!0)},function(){Y[Y.length-2]=Y[Y.length-2] in Y.pop()},function(){Y[Y[Y.length-2][0]][0]=Y[Y.length-1]},function(){Y.push("")},function(){return !!B},function(){Y[Y.length-2]=Y[Y.length-2]*Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]%Y.pop()},function(){Y.push([V[X++]])},function(){Y.push([C,Y.pop()])},function(){B=null},,function(){Y.push([Y.pop(),Y.pop()].reverse())},,function(){R.push([V[X++],Y.length,V[X++]])},function(){Y[Y.length-2]=Y[Y.length-2]/Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]&Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]<<Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]|Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]==Y.pop()},function(){var t=Y[Y.length-2];t[0][t[1]]=Y[Y.length-1]},function(){throw Y[Y.length-1]},function(){Y.push(V[X++])},,function(){Y[Y.length-1]+=String.fromCharCode(V[X++])},function(){Y.length=V[X++]},function(){Y[Y.length-2]=Y[Y.length-2]-Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]>>>Y.pop()},function(){var t=Y.pop();Y.push(t[0][t[1]])},function(){Y.push(Y[Y.length-1])},function(){Y.push(Y[V[X++]][0])},function(){Y.push(undefined)},function(){Y.push(typeof Y.pop())},function(){var t=Y.pop();Y.push(delete t[0][t[1]])},function(){X=V[X++]},function(){R.pop()},function(){var t=Y.pop(),e=Y.pop();Y.push([e[0][e[1]],t])},function(){Y.push(null)},function(){Y.push(!1)},function(){Y[Y.length-2]=Y[Y.length-2]+Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]>Y.pop()},function(){Y[Y.length-2]=Y[Y.length-2]>>Y.pop()},,function(){Y[Y.length-2]=Y[Y.length-2]===Y.pop()},function(){var t=Y.pop();Y.push([Y[Y.pop()][0],t])},function(){Y[Y.length-1]=C[Y[Y.length-1]]}];var R=[],B=null;Y=Y||[[C],[{}]];for(;;)try{for(var P=!1;!P;)P=M[V[X++]]();if(B)throw B;return Y.pop()}catch(r){var i=R.pop();if(!i)throw r;B=r,X=i[0],Y.length=i[1],i[2]&&(Y[i[2]][0]=r)}}
+return __TENCENT_CHAOS_VM.v=0,__TENCENT_CHAOS_VM(867,function(e){for(var t=atob(e[0]),n=e[1],r=[],i=0,o=0;i<t.length||o<n.length;)o<n.length&&n[o]==r.length?(r.push(n[o+1]),o+=2):r.push(t.charCodeAt(i++));return r}(["FAAUABQAFAYQJFMkdCRyJGkkbiRnOSoDCQEPBgYqBhAkbCRlJG4kZyR0JGgYKCoFNAEIbwYUBCoEIgUdKgQmKgYQJGMkaCRhJHIkQyRvJGQkZSRBJHQYKCoFCQEzIgAeDwYGFAUqBSIBMw8GBi4dBioEIgAnCioDECRwJHUkcyRoGCgqBBAkcCRhJGckZSRYGCgJAQYqAxAkcCR1JHMkaBgoKgQQJHAkYSRnJGUkWRgoCQEGKwoqAxAkdCRvGCIBIAYGKwoqAxAkaSRwGBAkUiRlJGckRSR4JHA5ECRcJGQkKyRcJC4kXCRkJCskXCQuJFwkZCQrJFwkLiRcJGQkKwkBECRlJHgkZSRjGCgqBRAkYyRhJG4kZCRpJGQkYSR0JGUYKBAkYyRhJG4kZCRpJGQkYSR0JGUYKAkBIgAYKCAGBisKFAAUAxAkTyRiJGokZSRjJHQ5CQAPBgYqAxAkaSRuJGYkbxgQJHQkZCRjJF8kYyAGBioDChQAFAAUABQAFAAqAxAkdCRzGBAkRCRhJHQkZTkJABAkZyRlJHQkVCRpJG0kZRgoCQAgBgYqAxAkciRuJGQYECRNJGEkdCRoORAkZiRsJG8kbyRyGCgQJE0kYSR0JGg5ECRyJGEkbiRkJG8kbRgoCQAiEgkBIAYGKgMQJHQkciRhJGMkaxgqBBAkaiRvJGkkbhgoECQsCQEgBgYqAxAkbhgqBBAkbCRlJG4kZyR0JGgYKCIBNSAGBhQIEBAkSiRTJE8kTjkQJHMkdCRyJGkkbiRnJGkkZiR5GCgqAwkBMw8GBhQJKgUqCAkBDwYGFAsQDwYGFAwQJFMkdCRyJGkkbiRnOSoICQEPBgYqDBAkbCRlJG4kZyR0JGgYKCoKNAEIBhQLKgsQJFMkdCRyJGkkbiRnORAkZiRyJG8kbSRDJGgkYSRyJEMkbyRkJGUYKCoMECRjJGgkYSRyJEMkbyRkJGUkQSR0GCgqCgkBKgkqCiIYEycDIg8cIkEzCQEzDwYGFAkqCSoJIg0dAyIAHg8GBhQKKgoiATMPBgYuBhAQJGUkbiRjJG8kZCRlJFUkUiRJJEMkbyRtJHAkbyRuJGUkbiR0OSoIECQmJHMkaSRnJD0zKgszCQEzCioDECRzJGQYKgQgBgYrCisKFAAUABQAFAAUABQAFAAUABQCECRPJGIkaiRlJGMkdDkJAA8GBhQDECRBJHIkciRhJHk5CQAPBgYUBAUAAAEDDwYGKgIQJHUkYRgQJG4kYSR2JGkkZyRhJHQkbyRyORAkdSRzJGUkciRBJGckZSRuJHQYKCAGBioCECRwJGYYECRuJGEkdiRpJGckYSR0JG8kcjkQJHAkbCRhJHQkZiRvJHIkbRgoIAYGKgIQJGgkYxgQJG4kYSR2JGkkZyRhJHQkbyRyORAkaCRhJHIkZCR3JGEkciRlJEMkbyRuJGMkdSRyJHIkZSRuJGMkeRgoIAYGKgIQJGMkaxgQJG4kYSR2JGkkZyRhJHQkbyRyORAkYyRvJG8kayRpJGUkRSRuJGEkYiRsJGUkZBgoIAYGKgIQJGwkYSRuJGcYECRuJGEkdiRpJGckYSR0JG8kcjkQJGwkYSRuJGckdSRhJGckZSRzGCgQJGokbyRpJG4YKBAkLAkBIAYGKgIQJGwkMBgQJG4kYSR2JGkkZyRhJHQkbyRyORAkbCRhJG4kZyR1JGEkZyRlJHMYIgAwKCAGBioCECR0JG4YECRuJGEkdiRpJGckYSR0JG8kcjkQJHUkcyRlJHIkQSRnJGUkbiR0GCgsIAYGKgIQJGgkYSRzGBAkdSRzJGUkciRBJGckZSRuJHQQJG4kYSR2JGkkZyRhJHQkbyRyOQ4gBgYqAhAkdyRkGBAkbiRhJHYkaSRnJGEkdCRvJHI5ECR3JGUkYiRkJHIkaSR2JGUkchgoASAGBioCECR3JGkYECRzJGMkciRlJGUkbjkQJHckaSRkJHQkaBgoIAYGKgIQJGgkZRgQJHMkYyRyJGUkZSRuORAkaCRlJGkkZyRoJHQYKCAGBioCECRjJG8YECRzJGMkciRlJGUkbjkQJGMkbyRsJG8kciREJGUkcCR0JGgYKCAGBioCECR3JGkkbhgQJGkkbiRuJGUkciRXJGkkZCR0JGg5ImQSECRpJG4kbiRlJHIkSCRlJGkkZyRoJHQ5MyAGBioCECRyJGEkdBgQJGkkbiRuJGUkciRXJGkkZCR0JGg5IgMbIAYGKgIQJG0kbyRkGBAkaSRuJG4kZSRyJEgkZSRpJGckaCR0OSIHEyICDCAGBioCECR0JHoYECREJGEkdCRlOQkAECRnJGUkdCRUJGkkbSRlJHokbyRuJGUkTyRmJGYkcyRlJHQYKAkAIAYGKgIQJGgkciRlJGYYECRsJG8kYyRhJHQkaSRvJG45ECRoJHIkZSRmGCggBgYqAhAkciRlJGYYECRsJG8kYyRhJHQkaSRvJG45ECRyJGUkZiRlJHIkZSRyGCggBgYqAhAkYyRzJHMYECRDJFMkUzkQJHMkdSRwJHAkbyRyJHQkcxgoECRkJGkkcyRwJGwkYSR5ECRnJHIkaSRkCQIgBgYqAhAkcCRmJDIYECRuJGEkdiRpJGckYSR0JG8kcjkQJHAkbCRhJHQkZiRvJHIkbRgoECRXJGkkbiQzJDI3IAYGKgIQJG4kdSRsGDEgBgYqAhAkdCRtJHAYDSAGBioCECR0JG0kcBgtBgYUBxAkZCRvJGMkdSRtJGUkbiR0ORAkYyRyJGUkYSR0JGUkRSRsJGUkbSRlJG4kdBgoECRjJGEkbiR2JGEkcwkBDwYGKgcQJGckZSR0JEMkbyRuJHQkZSR4JHQYKBAkMiRkCQEQJGYkaSRsJGwkVCRlJHgkdBgoECR0JGQkYyRfJGMiAiICCQMGKgIQJGMkdhgqBCoHECR0JG8kRCRhJHQkYSRVJFIkTBgoCQAJASAGBhQIKgcQJGckZSR0JEMkbyRuJHQkZSR4JHQYKBAkdyRlJGIkZyRsCQEPBgYqAhAkZyRwJHUYKggQJGckZSR0JFAkYSRyJGEkbSRlJHQkZSRyGCgqCBAkZyRlJHQkRSR4JHQkZSRuJHMkaSRvJG4YKBAkVyRFJEIkRyRMJF8kZCRlJGIkdSRnJF8kciRlJG4kZCRlJHIkZSRyJF8kaSRuJGYkbwkBECRVJE4kTSRBJFMkSyRFJEQkXyRSJEUkTiREJEUkUiRFJFIkXyRXJEUkQiRHJEwYKAkBIAYGKgIQJGUkeCR0GCoIECRnJGUkdCRTJHUkcCRwJG8kciR0JGUkZCRFJHgkdCRlJG4kcyRpJG8kbiRzGCgJABAkbCRlJG4kZyR0JGgYKCAGBhoGKxAkeBgoBi8uFioCECRlJHIkchgqBhAkbSRlJHMkcyRhJGckZRgoIAYGGgYQJEUkciRyJG8kcjkQJHQkZCRjJF8kYwkBIS8uFioCECR0JGgkchgqBhAkbSRlJHMkcyRhJGckZRgoIAYGECRkJG8kYyR1JG0kZSRuJHQ5ECRhJGQkZCRFJHYkZSRuJHQkTCRpJHMkdCRlJG4kZSRyGCgQJG0kbyR1JHMkZSRtJG8kdiRlBXYBAQMDBAkCBhAkcyRlJHQkVCRpJG0kZSRvJHUkdDkFtgEAAwIiCgkCBhQJECRSJFQkQyRQJGUkZSRyJEMkbyRuJG4kZSRjJHQkaSRvJG45ECRPJGIkaiRlJGMkdDkJAAkBDwYGKgkQJG8kbiRpJGMkZSRjJGEkbiRkJGkkZCRhJHQkZRgFxQECAwIEBSAGBioCECR1JGEkMhgUAhAkdSRhOCggBgYUBRAkTyRiJGokZSRjJHQ5CQAPBgYqBRAkZyRlJHQkSSRuJGYkbxgFAAAgBgYqBRAkZyRlJHQkRCRhJHQkYRgFAwIDAgQDBQQGByAGBioFECRzJGUkdCREJGEkdCRhGAUBAQMCBCAGBioFECRjJGwkZSRhJHIkVCRjGAUAACAGBhAkVCREJEMVFAULIAYGKwoK",[489,1000,664,789,788,642,2522,2534,2533,2567,2568,2599,2598,2632,2911,324,2936,376,2969,850,2997,865]]),window)
+}();
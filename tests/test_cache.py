@@ -0,0 +1,44 @@
+from chaosvm import prepare
+from chaosvm.cache import ResultCache
+from chaosvm.clock import VirtualClock
+from chaosvm.proxy.dom import Window
+
+IP = "1.2.3.4"
+TRACK = [(50, 42), (50, 55)]
+
+
+def test_deterministic(corpus_js: str):
+    a = prepare(corpus_js, IP, mouse_track=TRACK, seed=1)
+    b = prepare(corpus_js, IP, mouse_track=TRACK, seed=1)
+    assert a.getInfo(None).__dict__ == b.getInfo(None).__dict__
+    assert a.getData(None, True) == b.getData(None, True)
+
+
+def test_clock():
+    win = Window(clock=VirtualClock(1000, tick=0))
+    assert win.Date.now().getTime() == 1000
+    fired = []
+    win.setTimeout(lambda: fired.append(win.Date().getTime()), 500)
+    assert not fired
+    win._loop.run()
+    assert fired == [1500]
+
+
+def test_cache(corpus_js: str):
+    cache = ResultCache()
+    a = prepare(corpus_js, IP, mouse_track=TRACK, seed=1, cache=cache)
+    data = a.getData(None, True)
+    assert cache.misses == 1
+
+    b = prepare(corpus_js, IP, mouse_track=TRACK, seed=1, cache=cache)
+    assert b.getData(None, True) == data
+    assert b._tdc is None
+    assert cache.hits == 1
+
+    # a different history is computed by replaying on a live vm
+    b.getInfo(None)
+    assert b._tdc is not None
+    assert cache.misses == 2
+
+    prepare(corpus_js, IP, mouse_track=TRACK, seed=2, cache=cache).getData(None, True)
+    assert len(cache) == 2
@@ -0,0 +1,21 @@
+from urllib.parse import unquote
+
+
+def test_parse(corpus_js: str):
+    from chaosvm import Window, parse_vm
+
+    stack = parse_vm(corpus_js, Window())
+    assert stack.opcode
+    assert stack.opmap
+
+
+def test_execute(corpus_js: str):
+    from chaosvm import prepare
+
+    tdc = prepare(corpus_js, "1.2.3.4", mouse_track=[(50, 42), (50, 55)])
+    assert str(tdc.getInfo(None)["info"])
+
+    collect = unquote(tdc.getData(None, True))
+    assert isinstance(collect, str)
+    assert '"ip": "1.2.3.4"' in collect
+    assert '"track": "50,42,50,55"' in collect
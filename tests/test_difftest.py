@@ -0,0 +1,32 @@
+from chaosvm.difftest import diff
+from chaosvm.vm import ChaosVM, signed
+
+
+class XorVM(ChaosVM):
+    def xor(self):
+        self.stack[-1] = signed(self.stack[-2] ^ self.stack.pop() ^ 1)
+
+
+def test_same_engine(corpus_js: str):
+    assert diff(corpus_js, ChaosVM, stack_top=4) is None
+
+
+def test_optimized(corpus_js: str):
+    # unboxed slots and quickened dispatch against the plain interpreter
+    assert diff(corpus_js, ChaosVM, optimized=True) is None
+    d = diff(corpus_js, XorVM, stack_top=4, optimized=True)
+    assert d is not None and d.expected.op == "xor"
+
+
+def test_first_divergence(corpus_js: str):
+    d = diff(corpus_js, XorVM, stack_top=4)
+    assert d is not None
+    assert d.reason == "state differs"
+    assert d.expected.op == d.actual.op == "xor"
+    assert d.expected.pc == d.actual.pc
+
+
+def test_checkpoints(corpus_js: str):
+    d = diff(corpus_js, XorVM, checkpoints=[0], stack_top=1)
+    assert d is not None
+    assert d.stage == "getData"
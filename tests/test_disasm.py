@@ -0,0 +1,98 @@
+from typing import Dict
+
+from chaosvm.disasm import disassemble, op_names, walk
+from chaosvm.parse import parse_vm
+from chaosvm.proxy.dom import Window
+from chaosvm.vm import ChaosVM
+
+
+class Probe(ChaosVM):
+    """record the max stack depth of each function by its entry"""
+
+    depth: Dict[int, int] = {}
+
+    def __init__(self, pc: int, *args, **kw) -> None:
+        super().__init__(pc, *args, **kw)
+        entry = pc
+
+        def wrap(f):
+            def op():
+                r = f()
+                Probe.depth[entry] = max(Probe.depth.get(entry, 0), len(self.stack))
+                return r
+
+            return op
+
+        self.ops = [wrap(f) for f in self.ops]
+
+
+def test_disasm(corpus_js: str):
+    win = Window()
+    win.add_mouse_track([(50, 42), (50, 55)])
+    stack = parse_vm(corpus_js, win)
+    prog = disassemble(stack)
+    assert next(iter(prog.functions)) == stack.pc_start
+    assert all(
+        i.op != "?" for f in prog.functions.values() for b in f.blocks.values() for i in b.instrs
+    )
+
+    Probe.depth = {}
+    win._loop.execute(Probe(stack.pc_start, stack.opcode, win, stack.opmap))
+    win.TDC.getInfo(None)
+    win.TDC.getData(None, True)
+    win._loop.run()
+    # every function run is found, and its static depth is a bound
+    assert Probe.depth.keys() <= prog.functions.keys()
+    for entry, depth in Probe.depth.items():
+        assert depth <= prog.functions[entry].max_depth
+
+    listing = prog.listing()
+    assert "zstr        'Object'" in listing
+    dot = prog.dot()
+    assert dot.startswith("digraph") and f"cluster_{stack.pc_start}" in dot
+
+
+def test_string_pool(corpus_js: str, monkeypatch):
+    import chaosvm.disasm
+    from chaosvm import Session
+
+    stack = parse_vm(corpus_js, Window())
+    stats = stack.pool_stats
+    assert stats.runs >= stats.unique > 0 and stats.bytes > stats.runs
+    s, end = stack.strings[min(stack.strings)]
+    assert stack.opcode[end - 1] == ord(s[-1])
+
+    folded = Session(corpus_js, "1.2.3.4", seed=1).result()
+    monkeypatch.setattr(chaosvm.disasm, "string_pool", lambda stack, instrs=None: {})
+    assert Session(corpus_js, "1.2.3.4", seed=1).result() == folded
+
+
+def test_escapes(corpus_js: str, monkeypatch):
+    import chaosvm.disasm
+    from chaosvm import Session
+
+    stack = parse_vm(corpus_js, Window())
+    assert set(stack.escapes) == set(walk(stack)[1])
+    # the collector captures data and track
+    assert stack.escapes[stack.pc_start]
+
+    kw = dict(seed=1, mouse_track=[(50, 42), (50, 55)])
+    unboxed = Session(corpus_js, "1.2.3.4", **kw).result()
+    monkeypatch.setattr(chaosvm.disasm, "escapes", lambda stack, program=None: {})
+    assert Session(corpus_js, "1.2.3.4", **kw).result() == unboxed
+
+
+def test_capture_unassigned():
+    names = op_names()
+    op = {name: names.index(name) for name in names}
+    opmap = {i: i for i in range(len(names))}
+    # fmt: off
+    opcode = (
+        op["realloc"], 4,
+        op["vm_factory"], 16, 1, 0, 3, 3,  # capture slot 3, still None
+        op["inst_arr"], 3, op["inst"], 42, op["chobj"], op["drop"], op["drop"], op["stop"],
+        op["getobj"], 3, op["stop"],  # 16: the closure reads slot 3
+    )
+    # fmt: on
+    f = ChaosVM(0, opcode, None, opmap, [None, None, None])()  # type: ignore
+    assert f() == 42
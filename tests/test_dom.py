@@ -0,0 +1,26 @@
+from pytest import mark
+
+from chaosvm import prepare
+from chaosvm.proxy.dom import Window
+
+
+def test_backend_equal(corpus_js: str):
+    kw = dict(mouse_track=[(50, 42), (50, 55)], seed=1)
+    ref = prepare(corpus_js, "1.2.3.4", **kw)
+    light = prepare(corpus_js, "1.2.3.4", dom="light", **kw)
+    assert ref.getInfo(None).__dict__ == light.getInfo(None).__dict__
+    assert ref.getData(None, True) == light.getData(None, True)
+
+
+@mark.parametrize("dom", ["lxml", "light"])
+def test_markup(dom: str):
+    doc = Window(dom=dom).document
+    div = doc.createElement("div")
+    div.id = "x"
+    doc.body.appendChild(div)
+    div["innerHTML"] = 'a<b id="y">c</b>d<canvas></canvas>'
+
+    assert div.innerHTML == 'a<b id="y">c</b>d<canvas></canvas>'
+    assert doc.getElementById("y").outerHTML.startswith('<b id="y">c</b>')
+    assert div.cloneNode(True).outerHTML == '<div id="x">a<b id="y">c</b>d<canvas></canvas></div>'
+    assert doc.createElement("canvas").getContext("2d")
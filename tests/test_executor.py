@@ -0,0 +1,53 @@
+import sys
+
+from pytest import mark, raises
+
+from chaosvm.executor import SessionExecutor, has_interpreters
+from chaosvm.proxy.builtins import NULL, ProxyException, Symbol
+from chaosvm.proxy.dom import Window
+from chaosvm.session import Session
+
+TRACK = [(50, 42), (50, 55)]
+
+
+def test_windows_isolated():
+    a, b = Window(), Window(dom="light")
+    a.navigator.userAgent = "a"
+    a.location.href = "https://a.example/"
+    a.RTCPeerConnection = a.RTCPeerConnection.with_ip("1.1.1.1")
+    a.document.createElement("style").sheet.cssRules.push(1)
+    assert b.navigator.userAgent != "a"
+    assert b.location.href != "https://a.example/"
+    assert b.RTCPeerConnection._ip != "1.1.1.1"
+    assert b.document.createElement("style").sheet.cssRules.length == 0
+    assert a.top is a and b.top is b
+
+
+def test_immutable():
+    assert NULL() is NULL.s
+    with raises(ProxyException):
+        NULL.s["a"] = 1
+    f = Symbol().__getattribute__("for")
+    assert f("k") is f("k") and Symbol.keyfor(f("k")) == "k"
+
+
+def test_threads(corpus_js: str):
+    configs = [dict(seed=i, ua=f"ua{i}", mouse_track=TRACK) for i in range(4)]
+    expected = [Session(corpus_js, f"10.0.0.{i}", **kw).result() for i, kw in enumerate(configs)]
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # interleave the sessions as much as possible
+    try:
+        with SessionExecutor(4, "threads") as ex:
+            futures = [ex.submit(corpus_js, f"10.0.0.{i}", **kw) for i, kw in enumerate(configs)]
+            assert [f.result() for f in futures] == expected
+    finally:
+        sys.setswitchinterval(interval)
+
+
+@mark.skipif(not has_interpreters(), reason="requires subinterpreters")
+def test_interpreters(corpus_js: str):
+    kw = dict(seed=1, mouse_track=TRACK, dom="light")
+    expected = Session(corpus_js, "10.0.0.1", **kw).result()
+    with SessionExecutor(2, "interpreters") as ex:
+        assert ex.submit(corpus_js, "10.0.0.1", **kw).result() == expected
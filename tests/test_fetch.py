@@ -0,0 +1,123 @@
+import gzip
+import zlib
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from time import sleep, time
+
+import pytest
+
+from chaosvm.fetch import ScriptFetcher, decode
+from chaosvm.session import Session
+
+CORPUS = sorted((Path(__file__).parent / "corpus").glob("*.js"))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "Server"
+
+    def do_GET(self):
+        s = self.server
+        s.peers.add(self.client_address)
+        s.requests += 1
+        etag = '"%s"' % sha256(s.body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = gzip.compress(s.body)
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, body: bytes) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.body = body
+        self.peers = set()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/tdc.js?t=1"
+
+
+@pytest.fixture
+def server():
+    s = Server(CORPUS[0].read_bytes())
+    Thread(target=s.serve_forever, daemon=True).start()
+    yield s
+    s.shutdown()
+    s.server_close()
+
+
+def test_decode():
+    assert decode(zlib.compress(b"js"), "deflate") == b"js"
+    assert decode(zlib.compress(b"js")[2:-4], "deflate") == b"js"
+    assert decode(b"js", None) == b"js"
+
+
+def test_fetch(server: Server, tmp_path: Path):
+    with ScriptFetcher(server.url, store=tmp_path) as fetcher:
+        js = fetcher.get()
+        assert js.encode() == server.body
+        assert not fetcher.refresh()
+        assert fetcher.not_modified == 1
+        # one connection for all requests
+        assert (server.requests, len(server.peers)) == (2, 1)
+
+        # preloaded, so the session does not parse
+        with Session(js, "1.2.3.4", images=fetcher.images) as s:
+            s.result()
+        assert fetcher.images.hits == 1
+
+        old, server.body = fetcher.current, CORPUS[1].read_bytes()
+        assert fetcher.refresh()
+        assert fetcher.get().encode() == server.body
+        assert fetcher.current != old
+        assert len(fetcher.images) == 2
+
+        server.body = CORPUS[2].read_bytes()
+        assert fetcher.refresh()
+        # the oldest version is retired
+        assert len(fetcher.images) == 2
+
+    # revalidated from a persisted store in a new process
+    with ScriptFetcher(server.url, store=tmp_path) as fetcher:
+        assert fetcher.get().encode() == server.body
+        assert fetcher.not_modified == 1
+
+
+def test_offline(server: Server, tmp_path: Path):
+    with ScriptFetcher(server.url, store=tmp_path) as fetcher:
+        js = fetcher.get()
+    url = server.url
+    server.shutdown()
+    server.server_close()
+    with ScriptFetcher(url, store=tmp_path) as fetcher:
+        assert fetcher.get() == js
+
+
+def test_background(server: Server):
+    with ScriptFetcher(server.url, interval=0.05) as fetcher:
+        fetcher.get()
+        first = fetcher.current
+        fetcher.start()
+        server.body = CORPUS[1].read_bytes()
+        deadline = time() + 10
+        while fetcher.current == first and time() < deadline:
+            sleep(0.05)
+        assert fetcher.get().encode() == server.body
@@ -0,0 +1,87 @@
+import gc
+from random import Random
+from weakref import ref
+
+from chaosvm.ic import InlineCache
+from chaosvm.proxy.builtins import Compact, Math, Object, Proxy
+
+
+class Point(Object):
+    x = 1
+
+    def norm(self):
+        return abs(self.x)
+
+
+def test_instance():
+    ic, p = InlineCache(), Point()
+    assert ic.load(0, p, "x") == 1
+    assert ic.load(0, p, "x") == 1
+    assert (ic.hits, ic.misses) == (1, 1)
+    # instance writes are seen without invalidation
+    p.x = -2
+    assert ic.load(0, p, "x") == -2
+    Proxy.defineProperty(p, "x", dict(get=3))
+    assert ic.load(0, p, "x") == 3
+    assert ic.load(1, p, "norm")() == 3
+    assert ic.load(2, p, "y") is None
+    p.y = 4
+    assert ic.load(2, p, "y") == 4
+
+
+def test_class_write():
+    ic, p = InlineCache(), Point()
+    assert ic.load(0, p, "x") == 1
+    assert ic.load(1, Point, "x") == 1
+    Point.x = 5
+    try:
+        assert not ic.sites
+        assert ic.load(0, p, "x") == 5
+        assert ic.load(1, Point, "x") == 5
+    finally:
+        Point.x = 1
+
+
+def test_derived_class():
+    ic = InlineCache()
+    M = Math.with_rng(Random(1))
+    assert ic.load(0, M, "random")() == Random(1).random()
+    # the load site does not keep the class of a closed window
+    r = ref(M)
+    del M
+    gc.collect()
+    assert r() is None
+
+
+def test_compact():
+    class C(Compact):
+        __slots__ = ("a",)
+
+    ic, c = InlineCache(), C()
+    assert ic.load(0, c, "a") is None
+    c.a = 1
+    c.b = 2
+    assert ic.load(0, c, "a") == 1
+    assert ic.load(1, c, "b") == 2
+
+
+def test_megamorphic():
+    ic = InlineCache(size=2)
+    for i in range(4):
+        o = Object()
+        o[str(i)] = i
+        assert ic.load(0, o, str(i)) == i
+    assert ic.sites[0] is None
+    assert ic.misses == 3
+
+
+def test_corpus(corpus_js: str, monkeypatch):
+    import chaosvm.stack
+    from chaosvm import Session
+
+    s = Session(corpus_js, "1.2.3.4", seed=1)
+    r = s.result()
+    ic = s.window.__TENCENT_CHAOS_STACK.ic
+    assert ic.hit_rate > 0.9
+    monkeypatch.setattr(chaosvm.stack, "InlineCache", lambda: None)
+    assert Session(corpus_js, "1.2.3.4", seed=1).result() == r
@@ -0,0 +1,61 @@
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from chaosvm.image import ImageCache, ImageStore
+from chaosvm.session import Session
+from chaosvm.stack import ChaosStack
+
+MOUSE_TRACK = [(50, 42), (50, 55)]
+
+
+def run(js: str, images=None):
+    with Session(js, "1.2.3.4", mouse_track=MOUSE_TRACK, seed=1, images=images) as s:
+        return s.result()
+
+
+@pytest.mark.parametrize("shm", [True, False], ids=["shm", "file"])
+def test_image(corpus_js: str, shm: bool, tmp_path: Path):
+    directory = None if shm else tmp_path
+    expected = run(corpus_js)
+    with ImageStore(directory) as store:
+        store.publish(corpus_js)
+        images = ImageCache(directory)
+        assert run(corpus_js, images) == expected
+        assert run(corpus_js, images) == expected
+        assert (images.hits, images.misses, len(images)) == (2, 0, 1)
+
+        s = Session(corpus_js, "1.2.3.4", mouse_track=MOUSE_TRACK, seed=1, images=images)
+        assert type(s.window["__TENCENT_CHAOS_STACK"].opcode) is memoryview  # type: ignore
+        store.publish(corpus_js)
+        assert not store.retire(corpus_js)
+        assert store.retire(corpus_js)
+        # kept for the running session
+        assert len(images) == 1
+        assert s.result() == expected
+        s.close()
+        assert len(images) == 0
+
+        assert run(corpus_js, images) == expected
+        assert images.misses == 1
+    if not shm:
+        assert not list(tmp_path.iterdir())
+
+
+def retained(build) -> int:
+    """Bytes allocated by `build` and kept by what it returns."""
+    tracemalloc.start()
+    obj = build()  # noqa: F841
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def test_retained(corpus_js: str):
+    image = ImageCache().preload(corpus_js)
+    image._stack = None
+    opcode = list(image.opcode)
+    own = retained(lambda: ChaosStack(image.opmap, opcode, pc=image.pc, quicken=False))
+    # no per-pc data of its own: at least 4 bytes per opcode less than a private program
+    assert retained(image.stack) < own - 4 * len(opcode)
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest import mark
+
+import chaosvm
+
+BUDGET_MS = {"chaosvm": 50, "chaosvm.vm": 150}
+"""import-time budget, cumulative and best of 3 runs"""
+LAZY = ("pyjsparser", "lxml", "ctypes", "typing_extensions", "chaosvm.proxy.light")
+"""modules that must not be imported at startup"""
+
+
+def importtime(module: str):
+    """:return: cumulative microseconds of each imported module."""
+    env = dict(os.environ, PYTHONPATH=str(Path(chaosvm.__file__).parent.parent))
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@mark.parametrize("module", BUDGET_MS)
+def test_import_budget(module: str):
+    runs = [importtime(module) for _ in range(3)]
+    for lazy in LAZY:
+        assert not any(k == lazy or k.startswith(lazy + ".") for k in runs[0])
+    best = min(r[module] for r in runs) / 1000
+    assert best < BUDGET_MS[module], f"import {module} took {best:.1f}ms"
@@ -0,0 +1,60 @@
+from chaosvm.clock import VirtualClock
+from chaosvm.proxy.builtins import Promise
+from chaosvm.proxy.dom import Window
+
+
+def new_window():
+    return Window(clock=VirtualClock(0, tick=0))
+
+
+def test_order():
+    win, log = new_window(), []
+    win.setTimeout(lambda: log.append(("b", win.Date().getTime())), 20)
+    win.setTimeout(lambda: log.append(("a", win.Date().getTime())), 10)
+    win.setTimeout(lambda: log.append(("c", win.Date().getTime())), 20)
+    assert win._loop.run() == 3
+    assert log == [("a", 10), ("b", 20), ("c", 20)]
+
+
+def test_interval():
+    win, log = new_window(), []
+    tid = win.setInterval(lambda: log.append(win.Date().getTime()), 10)
+    win.setTimeout(lambda: win.clearInterval(tid), 35)
+    win._loop.run(until=100)
+    assert log == [10, 20, 30]
+    assert not win._loop
+
+
+def test_chain():
+    """a long chain of timers runs without recursion"""
+    win, n = new_window(), []
+
+    def tick():
+        n.append(1)
+        if len(n) < 5000:
+            win.setTimeout(tick, 1)
+
+    win._loop.max_tasks = 10**5
+    win.setTimeout(tick, 1)
+    win._loop.run()
+    assert len(n) == 5000
+    assert win.Date().getTime() == 5000
+
+
+def test_promise():
+    win, log = new_window(), []
+
+    def script():
+        win.setTimeout(lambda: log.append("timer"), 0)
+        Promise(lambda ok, _: ok(1)).then(lambda v: log.append(v) or v + 1).then(log.append)
+        log.append("sync")
+
+    win._loop.execute(script)
+    assert log == ["sync", 1, 2, "timer"]
+
+
+def test_promise_inline():
+    """without a running loop, reactions run at once"""
+    log = []
+    Promise(lambda _, err: err("e")).then(log.append).catch(log.append)
+    assert log == ["e"]
@@ -0,0 +1,57 @@
+from chaosvm.memory import measure
+from chaosvm.proxy.builtins import Function, String
+
+
+def test_report(corpus_js: str):
+    report = measure(corpus_js, "1.2.3.4", mouse_track=[(50, 42), (50, 55)])
+    assert report.peak >= report.retained > 0
+    # closures keep the cells they capture, not the frames that made them
+    assert report.vm_frames == 0
+    assert "Function" in report.proxies
+    assert report.format()
+
+
+def test_compact():
+    s = String("abc")
+    assert s._overflow is None
+    assert s.length == 3 and s.foo is None
+
+    f = Function(len, None)
+    f["prototype"] = 1
+    assert f.prototype == 1
+    assert f.__dict__ == {"prototype": 1}
+    del f["prototype"]
+    assert f.prototype is None
+
+
+def test_compact_shadow():
+    from chaosvm.ic import InlineCache
+    from chaosvm.proxy.builtins import Number
+
+    ic = InlineCache()
+    f, n = Function(len, None), Number(3)
+    assert ic.load(0, f, "call")(None, "ab") == 2
+    f["call"] = 7
+    n["toFixed"] = 7
+    assert f["call"] == 7 and ic.load(0, f, "call") == 7
+    assert n.toFixed == 7 and ic.load(1, n, "toFixed") == 7
+    del f["call"]
+    assert ic.load(0, f, "call")(None, "abc") == 3
+
+
+def test_compact_copy():
+    from copy import copy, deepcopy
+
+    from chaosvm.proxy.builtins import Date
+
+    d = Date(1000)
+    d.tag = [1]
+    c = copy(d)
+    assert type(c) is Date and c.t == 1000 and c.tag == [1]
+    c.tag = 2
+    assert d.tag == [1]
+    e = deepcopy(d)
+    assert e.t == 1000 and e.tag == [1] and e.tag is not d.tag
+
+    s = copy(String("abc"))
+    assert s._overflow is None and s.length == 3
@@ -0,0 +1,57 @@
+from urllib.request import urlopen
+
+import pytest
+
+from chaosvm import metrics
+from chaosvm.session import Session
+
+
+@pytest.fixture
+def sink():
+    sink = metrics.PrometheusSink()
+    prev = metrics.set_sink(sink)
+    yield sink
+    metrics.set_sink(prev)
+
+
+def test_session(corpus_js: str, sink: metrics.PrometheusSink):
+    Session(corpus_js, "1.2.3.4", mouse_track=[(50, 42), (50, 55)]).result()
+    assert sink.counters["chaosvm_sessions_total"] == 1
+    assert sink.counters["chaosvm_instructions_total"] > 1000
+    for name in ("parse_vm", "parse_opcode_mapping", "execute", "getinfo", "getdata"):
+        h = sink.histograms[f"chaosvm_{name}_seconds"]
+        assert h.count == 1 and h.sum > 0
+
+
+def test_exposition(sink: metrics.PrometheusSink):
+    metrics.count("a_total", 2)
+    metrics.observe("b_seconds", 0.003)
+    metrics.observe("b_seconds", 20)
+    text = sink.exposition()
+    assert "# TYPE a_total counter\na_total 2\n" in text
+    assert 'b_seconds_bucket{le="0.0025"} 0\n' in text
+    assert 'b_seconds_bucket{le="0.005"} 1\n' in text
+    assert 'b_seconds_bucket{le="10.0"} 1\n' in text
+    assert 'b_seconds_bucket{le="+Inf"} 2\n' in text
+    assert "b_seconds_count 2\n" in text
+
+    server = sink.serve(0)
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as r:
+            assert r.read().decode() == text
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_callback():
+    seen = []
+    prev = metrics.set_sink(metrics.CallbackSink(lambda *a: seen.append(a)))
+    try:
+        metrics.timed("f_seconds")(lambda: None)()
+        metrics.count("c_total")
+    finally:
+        metrics.set_sink(prev)
+    assert [a[:2] for a in seen] == [("histogram", "f_seconds"), ("counter", "c_total")]
+    metrics.count("c_total")
+    assert len(seen) == 2
@@ -1,14 +1,15 @@
-from gzip import decompress
 from urllib.parse import unquote
-from urllib.request import urlopen as get
 
 from pytest import fixture
 
+from chaosvm.fetch import ScriptFetcher
+
 
 @fixture(scope="module")
 def vmjs() -> str:
-    with get("https://t.captcha.qq.com/tdc.js?app_data=7124050803564679168&t=636313065") as r:
-        return decompress(r.read()).decode()
+    url = "https://t.captcha.qq.com/tdc.js?app_data=7124050803564679168&t=636313065"
+    with ScriptFetcher(url) as fetcher:
+        return fetcher.get()
 
 
 def test_parse(vmjs: str):
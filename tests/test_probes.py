@@ -0,0 +1,26 @@
+from chaosvm.probes import Probes
+from chaosvm.proxy.builtins import Object
+from chaosvm.session import Session
+
+
+def test_count():
+    o = Object()
+    assert o.missing is None  # not active
+    with Probes().active() as probes:
+        for _ in range(3):
+            assert o.missing is None
+        assert o["other"] is None
+    assert probes.counts == {(Object, "missing"): 3, (Object, "other"): 1}
+    first, second = probes.summary()
+    assert first == ("Object", "missing", 3, None)
+    assert probes.report().splitlines()[0] == "2 missing properties, 4 reads"
+
+
+def test_session(corpus_js: str):
+    s = Session(corpus_js, "1.2.3.4", mouse_track=[(50, 42), (50, 55)])
+    s.result()
+    probes = s.probes.summary()
+    assert probes
+    # read by the vm, so the pc is known
+    assert all(p.pc is not None for p in probes)
+    assert len(s.probes.report(3).splitlines()) == 1 + min(3, len(probes))
@@ -0,0 +1,59 @@
+import pyjsparser as jsparser
+
+from chaosvm.difftest import seeded_window
+from chaosvm.disasm import op_names
+from chaosvm.parse import load_vm, split_vm
+from chaosvm.quicken import Quickening
+from chaosvm.vm import ChaosVM
+
+OPMAP = {7: op_names().index("add"), 8: op_names().index("xor")}
+
+
+def run(quick: Quickening, pc: int, a, b):
+    vm = ChaosVM(pc, (7, 8), None, OPMAP, [None, None, a, b], quick=quick)  # type: ignore
+    vm.pc = pc + 1
+    vm.ops[quick.code[pc]]()
+    return vm.stack[-1]
+
+
+def test_specialize():
+    q = Quickening((7, 8), OPMAP)
+    assert run(q, 0, 1, 2) == 3
+    assert not q.sites()
+    assert run(q, 0, 1, 2) == 3
+    assert q.sites() == {0: "add_int"}
+    assert run(q, 0, 2, 3) == 5
+
+    # a type miss runs the generic handler, which the site keeps
+    assert run(q, 0, "a", 1) == "a1"
+    assert (q.specialized, q.deoptimized) == (1, 1)
+    assert not q.sites()
+    assert run(q, 0, 1.5, 1) == 2.5
+
+    assert run(q, 1, 0x7FFFFFFF, -1) == -0x80000000
+    assert run(q, 1, 0x7FFFFFFF, -1) == -0x80000000
+    assert q.sites() == {1: "xor_int"}
+
+
+def test_overridden():
+    class XorVM(ChaosVM):
+        def xor(self):
+            self.stack[-1] = 0
+
+    vm = XorVM(0, (7, 8), None, OPMAP, [None], quick=Quickening((7, 8), OPMAP))  # type: ignore
+    assert vm.quick is None
+
+
+def test_same_result(corpus_js: str):
+    parts = split_vm(jsparser.parse(corpus_js))
+    data = []
+    for quicken in (True, False):
+        win = seeded_window(0, [(50, 42), (50, 55)])
+        stack = load_vm(parts, win)
+        if not quicken:
+            stack.quick = None
+        stack(win)
+        data.append((str(win.TDC.getData(None, True)), win.TDC.getInfo(None).__dict__.keys()))
+        if quicken:
+            assert stack.quick and stack.quick.sites()
+    assert data[0] == data[1]
@@ -0,0 +1,109 @@
+import pytest
+
+from chaosvm.proxy import regexp
+from chaosvm.proxy.builtins import NULL, Function, ProxyException, RegExp, String
+
+EXEC = [
+    (r"\d+\.\d+", "", "Chrome/120.0.6099", ["120.0"]),
+    (r"(?<major>\d+)\.(\d+)", "", "v12.34", ["12.34", "12", "34"]),
+    (r"^ab$", "", "ab\n", None),
+    (r"^ab$", "m", "x\nab\ny", ["ab"]),
+    (r"a.c", "", "a\nc", None),
+    (r"a.c", "s", "a\nc", ["a\nc"]),
+    (r"[^]+", "", "a\nb", ["a\nb"]),
+    (r"a[]", "", "a", None),
+    (r"\bfoo\b", "", "a foo.", ["foo"]),
+    (r"\Bo\B", "", "foo", ["o"]),
+    (r"\Bo", "", "o", None),
+    (r"\d", "", "\u0663", None),
+    (r"\w+", "", "caf\u00e9", ["caf"]),
+    (r"\s", "", "\ufeff", ["\ufeff"]),
+    (r"A\x42\cJ", "", "AB\n", ["AB\n"]),
+    (r"\u{1F600}", "u", "\U0001f600", ["\U0001f600"]),
+    (r"(a)\1", "", "aa", ["aa", "a"]),
+    (r"(?<x>b)\k<x>", "", "abb", ["bb", "b"]),
+    (r"\/\-", "", "a/-", ["/-"]),
+    (r"[\b]", "", "\b", ["\b"]),
+    (r"[a-z&]+", "i", "AB&c", ["AB&c"]),
+    (r"(?<=\$)\d+", "", "$42", ["42"]),
+    (r"(a)|b", "", "b", ["b", None]),
+]
+
+
+@pytest.mark.parametrize("source,flags,s,expected", EXEC)
+def test_exec(source, flags, s, expected):
+    m = RegExp(source, flags).exec(s)
+    if expected is None:
+        assert m is NULL.s
+    else:
+        assert list(m) == expected
+        assert m.input == s
+
+
+def test_stateful():
+    r = RegExp("a", "g")
+    assert [r.exec("aba").index, r.exec("aba").index] == [0, 2]
+    assert r.exec("aba") is NULL.s and r.lastIndex == 0
+    y = RegExp("a", "y")
+    assert y.test("ab") and not y.test("ab")
+    assert RegExp("b").test("ab")
+    assert RegExp("(?<n>a)").exec("a").groups.n == "a"
+
+
+REPLACE = [
+    ("a.b.c", ".", "-", "a-b.c"),
+    ("a.b.c", RegExp(r"\.", "g"), "-", "a-b-c"),
+    ("john smith", RegExp(r"(\w+)\s(\w+)"), "$2, $1", "smith, john"),
+    ("x", RegExp("x"), "$$-$&-$`-$'", "$-x--"),
+    ("2020-01", RegExp(r"(?<y>\d+)-(?<m>\d+)"), "$<m>/$<y>", "01/2020"),
+    ("ab", RegExp("(a)"), "$10", "a0b"),
+    ("ab", "a", "$9", "$9b"),
+]
+
+
+@pytest.mark.parametrize("s,pattern,new,expected", REPLACE)
+def test_replace(s, pattern, new, expected):
+    assert String(s).replace(pattern, new) == expected
+
+
+def test_replace_function():
+    f = Function(lambda m, g, i, s: f"{g.upper()}{i}", None)
+    assert String("a-b").replace(RegExp("([a-z])", "g"), f) == "A0-B2"
+
+
+SPLIT = [
+    ("a,b,,c", ",", None, ["a", "b", "", "c"]),
+    ("abc", "", None, ["a", "b", "c"]),
+    ("abc", None, None, ["abc"]),
+    ("a1b22c", RegExp(r"\d+"), None, ["a", "b", "c"]),
+    ("a1b2c", RegExp(r"(\d)"), None, ["a", "1", "b", "2", "c"]),
+    ("abc", RegExp(""), 2, ["a", "b"]),
+    ("", RegExp(","), None, [""]),
+    ("", RegExp(""), None, []),
+]
+
+
+@pytest.mark.parametrize("s,sep,limit,expected", SPLIT)
+def test_split(s, sep, limit, expected):
+    assert list(String(s).split(sep, limit)) == expected
+
+
+def test_match():
+    assert list(String("a1b22").match(RegExp(r"\d+", "g"))) == ["1", "22"]
+    assert String("ab").match(RegExp(r"\d", "g")) is NULL.s
+    assert list(String("a1").match(r"[a-z](\d)")) == ["a1", "1"]
+
+
+@pytest.mark.parametrize("source,flags", [("a", "gg"), ("a", "x"), ("(", ""), (r"\p{L}", "u")])
+def test_syntax_error(source, flags):
+    with pytest.raises(ProxyException):
+        RegExp(source, flags)
+
+
+def test_cache():
+    regexp.compile.cache_clear()
+    RegExp(r"\d+", "g")
+    RegExp(r"\d+", "g")
+    RegExp(r"\d+", "i")
+    info = regexp.compile.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
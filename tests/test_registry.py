@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pyjsparser as jsparser
+
+from chaosvm.parse import parse_opcode_mapping, parse_vm, scan_vm, split_vm
+from chaosvm.proxy.dom import Window
+from chaosvm.registry import OpmapRegistry, fingerprint, template_source
+
+CORPUS = sorted((Path(__file__).parent / "corpus").glob("*.js"))
+
+
+def test_template_source(corpus_js: str):
+    src = template_source(corpus_js)
+    assert src and src.startswith("function __TENCENT_CHAOS_VM(") and src.endswith("}")
+    # a rotated payload keeps the template
+    rotated = corpus_js.replace('(["', '(["AAAA', 1)
+    assert rotated != corpus_js
+    assert fingerprint(rotated) == fingerprint(corpus_js)
+    assert template_source("var a = 1") is None
+
+
+def test_rotated(tmp_path):
+    a, b = (p.read_text(encoding="utf8") for p in CORPUS[:2])
+    assert template_source(a) != template_source(b)
+    registry = OpmapRegistry(tmp_path / "opmaps.json")
+    parse_vm(a, Window(), registry)
+
+    # tdc_b reorders the op functions of tdc_a and renames the template identifiers
+    registry = OpmapRegistry(tmp_path / "opmaps.json")
+    assert fingerprint(b) in registry
+    stack = parse_vm(b, Window(), registry)
+    assert (registry.hits, registry.misses) == (1, 0)
+    assert stack.opmap == parse_opcode_mapping(split_vm(jsparser.parse(b)).vm_declare)
+
+
+def test_literals():
+    js = 'function __TENCENT_CHAOS_VM(a){var b=\'}\',c="{\\"";return{}}var d={}'
+    assert template_source(js) == js[: js.index("var d")]
+
+
+def test_registry(corpus_js: str, tmp_path):
+    path = tmp_path / "opmaps.json"
+    registry = OpmapRegistry(path)
+    stack = parse_vm(corpus_js, Window(), registry)
+    assert (registry.hits, registry.misses) == (0, 1)
+    assert path.exists()
+
+    expected = parse_opcode_mapping(split_vm(jsparser.parse(corpus_js)).vm_declare)
+    assert stack.opmap == expected
+
+    registry = OpmapRegistry(path)
+    assert fingerprint(corpus_js) in registry
+    stack = parse_vm(corpus_js, Window(), registry)
+    assert (registry.hits, registry.misses) == (1, 0)
+    assert stack.opmap == expected
+
+
+def test_scan(corpus_js: str, tmp_path, monkeypatch):
+    parts = split_vm(jsparser.parse(corpus_js))
+    assert scan_vm(corpus_js) == parts._replace(vm_declare=None)
+    assert scan_vm("var a = 1") is None
+
+    registry = OpmapRegistry(tmp_path / "opmaps.json")
+    expected = parse_vm(corpus_js, Window(), registry)
+
+    # a known template is not parsed again
+    def parse(*args):
+        raise AssertionError("parsed on a registry hit")
+
+    monkeypatch.setattr(jsparser, "parse", parse)
+    win = Window()
+    stack = parse_vm(corpus_js, win, registry)
+    assert (stack.opmap, stack.opcode, stack.pc_start) == (
+        expected.opmap,
+        expected.opcode,
+        expected.pc_start,
+    )
+    assert win[parts.win_attr] == parts.win_value
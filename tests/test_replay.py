@@ -0,0 +1,50 @@
+import pytest
+
+from chaosvm.replay import Diverged, Handle, Recorder, Replayer, TapeStore
+from chaosvm.session import Session
+
+MOUSE_TRACK = [(50, 42), (50, 55)]
+
+
+def session(js: str, seed: int, tapes=None) -> Session:
+    return Session(js, "1.2.3.4", mouse_track=MOUSE_TRACK, seed=seed, tapes=tapes)
+
+
+def test_replay(corpus_js: str):
+    tapes = TapeStore()
+    s = session(corpus_js, 1, tapes)
+    assert isinstance(s._tape, Recorder)
+    assert s.result() == session(corpus_js, 1).result()
+    assert len(tapes) == 1
+
+    for seed in (1, 2):
+        s = session(corpus_js, seed, tapes)
+        assert isinstance(s._tape, Replayer)
+        assert s.window and "document" not in s.window.__dict__
+        assert s.result() == session(corpus_js, seed).result()
+        assert s._tape.done()
+    assert tapes.hits == 2 and tapes.divergences == 0
+
+
+def test_diverge(corpus_js: str):
+    tapes = TapeStore(patience=2)
+    s = session(corpus_js, 1, tapes)
+    s.result()
+    # a host answer the script does not expect
+    tape = tapes.get(s._tape_key)
+    assert tape
+    ev = next(e for e in tape.events if e[0] == "get" and e[2] == "userAgent")
+    ev[2] = "platform"
+
+    s = session(corpus_js, 1, tapes)
+    assert s.result() == session(corpus_js, 1).result()
+    assert tapes.divergences == 1 and isinstance(s._tape, Recorder)
+    assert len(tapes) == 1, "recorded again"
+
+
+def test_handle():
+    h = Handle(3)
+    for touch in (str, bool, iter, lambda h: h.foo, lambda h: h["foo"], lambda h: h()):
+        with pytest.raises(Diverged):
+            touch(h)
+    assert isinstance(h, Handle) and repr(h) == "<host #3>"
@@ -0,0 +1,93 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from chaosvm.proxy.builtins import (
+    JSON,
+    NULL,
+    Array,
+    Date,
+    Function,
+    Number,
+    Object,
+    ProxyException,
+    String,
+    Symbol,
+)
+from chaosvm.proxy.serialize import stringify
+
+
+def test_primitives():
+    assert stringify(String('a"\né')) == json.dumps('a"\né')
+    assert stringify(NULL()) == "null"
+    assert stringify(True) == "true"
+    assert stringify(Number(2)) == "2"
+    assert stringify(None) is None
+    assert stringify(Function(len, None)) is None
+    assert JSON.stringify(None) is None
+
+
+@pytest.mark.parametrize(
+    "f,s",
+    [
+        (1.0, "1"),
+        (-0.0, "0"),
+        (0.5, "0.5"),
+        (1e16, "10000000000000000"),
+        (1e21, "1e+21"),
+        (float("nan"), "null"),
+        (Number("-inf"), "null"),
+    ],
+)
+def test_number(f, s):
+    assert stringify(f) == s
+
+
+def test_object():
+    o = Object(b=1, a=String("x"), u=None, f=Function(len, None), s=Symbol("s"))
+    o["2"], o["10"], o["01"] = 2, 10, 1
+    o._internal = 0
+    assert stringify(o) == '{"2": 2, "10": 10, "b": 1, "a": "x", "01": 1}'
+
+
+def test_array():
+    a = Array(1, None, Function(len, None), Array(), Object())
+    a[6] = String("z")
+    a.extra = 1
+    assert stringify(a) == '[1, null, null, [], {}, null, "z"]'
+    assert stringify([1, (2,), {"k": NULL()}]) == '[1, [2], {"k": null}]'
+
+
+def test_threads():
+    arrays = [Array(*range(n)) for n in range(1, 200)]
+    expected = [json.dumps(list(range(n))) for n in range(1, 200)]
+    with ThreadPoolExecutor(8) as ex:
+        for _ in range(5):
+            assert list(ex.map(stringify, arrays)) == expected
+
+
+def test_to_json():
+    o = Object(d=Date(0), c=Object(toJSON=Function(lambda k: f"key {k}", None)))
+    assert stringify(o) == '{"d": "1970-01-01T00:00:00.000Z", "c": "key c"}'
+    assert stringify(Array(o.c)) == '["key 0"]'
+
+
+def test_deep_and_cyclic():
+    root = a = Array()
+    for _ in range(200):
+        a.push(b := Array())
+        a = b
+    assert stringify(root) == "[" * 201 + "]" * 201
+    for _ in range(100000):
+        a.push(b := Array())
+        a = b
+    with pytest.raises(ProxyException):
+        stringify(root)
+
+    o = Object(x=Array())
+    o.x.push(o)
+    with pytest.raises(ProxyException):
+        stringify(o)
+    shared = Object()
+    assert stringify(Array(shared, shared)) == "[{}, {}]"
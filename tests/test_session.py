@@ -0,0 +1,89 @@
+from unittest.mock import patch
+from urllib.parse import quote, unquote
+
+import pytest
+
+from chaosvm import Session, prepare
+from chaosvm.cache import ResultCache
+from chaosvm.clock import VirtualClock
+from chaosvm.probes import Probes
+from chaosvm.proxy.builtins import Function, Object
+from chaosvm.proxy.dom import TDC, Window
+from chaosvm.session import instrument, parse_collect
+
+IP = "1.2.3.4"
+TRACK = [(50, 42), (50, 55)]
+
+
+def test_result(corpus_js: str):
+    s = Session(corpus_js, IP, mouse_track=TRACK, seed=1)
+    r = s.result()
+    assert s.result() is r
+
+    tdc = prepare(corpus_js, IP, mouse_track=TRACK, seed=1)
+    info = tdc.getInfo(None)
+    data = tdc.getData(None, True)
+    assert r.info == {"info": str(info["info"])}
+    assert r.payload == data.encode()
+    assert r.collect == unquote(data)
+    assert '"ip": "1.2.3.4"' in r.collect
+    assert quote(r.collect.split("&sig=")[0]) in data
+    # decoded from the argument of encodeURIComponent
+    assert s.window._encoded[1] == r.collect
+
+
+def test_cached(corpus_js: str):
+    cache = ResultCache()
+    a = Session(corpus_js, IP, seed=1, cache=cache).result()
+    s = Session(corpus_js, IP, seed=1, cache=cache)
+    # a hit is not unquoted, but decoded as the live window decoded it
+    with patch("chaosvm.session.unquote", side_effect=AssertionError):
+        assert s.result() == a
+    assert s.window is None
+    assert Session(corpus_js, IP, seed=1).result() == a
+    assert a.fields["ip"] == IP and a.fields["sig"] == a.collect.rsplit("=", 1)[1]
+
+
+def test_parse_collect():
+    assert parse_collect('{"a": 1, "b": "x&y=z"}&sig=AB&n=') == {
+        "a": 1,
+        "b": "x&y=z",
+        "sig": "AB",
+        "n": "",
+    }
+    assert parse_collect("AbC%2Bd") == {}
+    assert parse_collect("AbC&x=1") == {"x": "1"}
+
+
+def test_close(corpus_js: str):
+    with Session(corpus_js, IP, mouse_track=TRACK, seed=1) as s:
+        win = s.window
+        r = s.result()
+    assert s.closed and s.window is None and not hasattr(s, "tdc")
+    assert win is not None and "document" not in win.__dict__ and repr(win)
+    assert s.result() is r
+    s.close()
+
+    s = Session(corpus_js, IP, seed=1)
+    s.close()
+    with pytest.raises(RuntimeError):
+        s.result()
+
+
+def test_tdc_timers():
+    """timers set by getInfo and getData fire before they return to the caller"""
+    win, data = Window(top=True, clock=VirtualClock(0, tick=0)), {}
+
+    def get_info(_):
+        win.setTimeout(lambda: data.update(tm=win.Date().getTime()), 10)
+        return Object()
+
+    def get_data(*_):
+        win.setTimeout(lambda: data.update(late=1), 10)
+        return str(sorted(data.items()))
+
+    tdc = TDC(getInfo=Function(get_info, None), getData=Function(get_data, None))
+    instrument(tdc, Probes(), win._loop)
+    tdc.getInfo(None)
+    assert tdc.getData(None, True) == "[('tm', 10)]"
+    assert data["late"] == 1 and not win._loop
@@ -0,0 +1,70 @@
+"""Soak test of a long-running process, off by default as it takes minutes.
+
+.. code-block:: sh
+
+    CHAOSVM_SOAK=2000 pytest tests/test_soak.py
+"""
+
+import gc
+import os
+from pathlib import Path
+
+import pytest
+
+from chaosvm.image import ImageCache
+from chaosvm.session import Session
+
+SESSIONS = int(os.environ.get("CHAOSVM_SOAK", "0"))
+CORPUS = sorted((Path(__file__).parent / "corpus").glob("*.js"))
+TRACK = [(50, 42), (50, 55)]
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def run(scripts, n: int, offset: int = 0, images=None):
+    for i in range(offset, offset + n):
+        js = scripts[i % len(scripts)]
+        with Session(js, "1.2.3.4", mouse_track=TRACK, seed=i, images=images) as s:
+            s.result()
+
+
+@pytest.mark.skipif(not SESSIONS, reason="set CHAOSVM_SOAK to the number of sessions")
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="reads rss from /proc")
+def test_soak():
+    scripts = [p.read_text(encoding="utf8") for p in CORPUS]
+    # warm up caches: opmaps, regexps, inline cache entries of builtin types
+    run(scripts, 3 * len(scripts))
+    gc.collect()
+    objects, memory = len(gc.get_objects()), rss()
+
+    half = SESSIONS // 2
+    run(scripts, half)
+    gc.collect()
+    mid_objects, mid_memory = len(gc.get_objects()), rss()
+    run(scripts, SESSIONS - half, half)
+    gc.collect()
+
+    # flat: no growth in the second half beyond noise
+    assert len(gc.get_objects()) - mid_objects < 1000
+    assert len(gc.get_objects()) - objects < 2000
+    assert rss() - mid_memory < 8 << 20, f"rss grew from {memory} to {rss()}"
+
+
+@pytest.mark.skipif(not SESSIONS, reason="set CHAOSVM_SOAK to the number of sessions")
+def test_soak_shared():
+    """Sessions on one image stack, whose inline caches see the classes of every window."""
+    js = CORPUS[0].read_text(encoding="utf8")
+    images = ImageCache()
+    ic = images.preload(js).stack().ic
+    run([js], 3, images=images)
+    gc.collect()
+    objects, sites = len(gc.get_objects()), len(ic.sites)
+
+    run([js], SESSIONS, images=images)
+    gc.collect()
+    assert images.hits == SESSIONS + 3
+    assert len(ic.sites) == sites
+    assert len(gc.get_objects()) - objects < 1000
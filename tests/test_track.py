@@ -0,0 +1,53 @@
+import pytest
+
+from chaosvm.clock import VirtualClock
+from chaosvm.proxy.dom import Window
+
+
+def new_window():
+    return Window(clock=VirtualClock(0, tick=0))
+
+
+def test_lazy():
+    """points are consumed only when their events are dispatched"""
+    win, log, seen = new_window(), [], []
+
+    def track():
+        for i in range(3):
+            seen.append(i)
+            yield i, 2 * i
+
+    win.add_mouse_track(track())
+    assert not seen
+    win.document.addEventListener("mousemove", lambda e: log.append((e.pageX, e.pageY)))
+    assert log == [(0, 0), (1, 2), (2, 4)]
+
+
+def test_timed():
+    win, log = new_window(), []
+    win.add_mouse_track(iter([(0, 0, 0), (5, 1, 16), (9, 2, 40)]))
+    with win._loop.active():
+        win.document.addEventListener(
+            "mousemove", lambda e: log.append((e.pageX, e.timeStamp, win.Date().getTime()))
+        )
+    assert not log
+    win._loop.run()
+    assert log == [(0, 0, 0), (5, 16, 16), (9, 40, 40)]
+
+
+def test_generate():
+    np = pytest.importorskip("numpy")
+    from chaosvm.track import generate
+
+    tracks = generate(64, end=(200, 10), length=30, seed=1)
+    assert tracks.shape == (64, 30, 3) and tracks.dtype == np.int64
+    assert (tracks[:, 0, :2] == 0).all()
+    assert (tracks[:, -1, :2] == (200, 10)).all()
+    assert (np.diff(tracks[..., 2], axis=1) >= 0).all()
+    assert ((tracks[:, -1, 2] >= 500) & (tracks[:, -1, 2] <= 1500)).all()
+    assert (generate(4, seed=2) == generate(4, seed=2)).all()
+
+    win, log = new_window(), []
+    win.add_mouse_track(tracks[0])
+    win.document.addEventListener("mousemove", lambda e: log.append(type(e.pageX)))
+    assert log == [int] * 30